@@ -0,0 +1,116 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+
+from app.api.models.request_models import BaselineRequest
+from app.api.models.response_models import BaselineResponse, BaselineListResponse, BaseResponse
+from app.services.baseline_service import baseline_store
+from app.core.errors import BaselineException
+
+router = APIRouter()
+
+@router.get("", response_model=BaselineListResponse)
+async def list_baselines():
+    """
+    List stored baselines
+    """
+    try:
+        baselines = await asyncio.to_thread(baseline_store.list_baselines)
+        
+        return {
+            "success": True,
+            "message": f"Found {len(baselines)} baselines",
+            "baselines": baselines
+        }
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error listing baselines: {str(e)}"}
+        )
+
+@router.get("/{baseline_id}", response_model=BaselineResponse)
+async def get_baseline(baseline_id: str):
+    """
+    Get a baseline and its fingerprints
+    """
+    try:
+        baseline = await asyncio.to_thread(baseline_store.get, baseline_id)
+        
+        return {
+            "success": True,
+            "message": "Baseline retrieved successfully",
+            "baseline": baseline["meta"],
+            "fingerprints": {tool: sorted(ids) for tool, ids in baseline["fingerprints"].items()}
+        }
+    
+    except BaselineException as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error getting baseline: {str(e)}"}
+        )
+
+@router.put("/{baseline_id}", response_model=BaselineResponse)
+async def save_baseline(baseline_id: str, request: BaselineRequest):
+    """
+    Create or replace a baseline
+    
+    Fingerprints are the "id" fields of the findings returned by the analyze
+    endpoints, grouped by tool. Analyses given this baseline id then only
+    return findings that are not listed.
+    """
+    try:
+        meta = await asyncio.to_thread(
+            baseline_store.save,
+            baseline_id,
+            request.fingerprints,
+            request.description
+        )
+        
+        return {
+            "success": True,
+            "message": f"Baseline saved with {sum(meta['counts'].values())} fingerprints",
+            "baseline": meta
+        }
+    
+    except BaselineException as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error saving baseline: {str(e)}"}
+        )
+
+@router.delete("/{baseline_id}", response_model=BaseResponse)
+async def delete_baseline(baseline_id: str):
+    """
+    Delete a baseline
+    """
+    try:
+        await asyncio.to_thread(baseline_store.delete, baseline_id)
+        
+        return {
+            "success": True,
+            "message": "Baseline deleted successfully"
+        }
+    
+    except BaselineException as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error deleting baseline: {str(e)}"}
+        )
\ No newline at end of file
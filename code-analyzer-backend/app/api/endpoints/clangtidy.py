@@ -1,16 +1,27 @@
-from fastapi import APIRouter, Depends, UploadFile, File, BackgroundTasks, HTTPException, Body
-from typing import List, Dict, Any, Optional
+import json
+from fastapi import APIRouter, Depends, UploadFile, File, BackgroundTasks, HTTPException, Body, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Any, Optional
 
-from app.api.models.request_models import ClangTidyConfigRequest, ClangTidyAnalyzeRequest
-from app.api.models.response_models import ClangTidyChecksResponse, ClangTidyAnalysisResponse, BaseResponse
+from app.api.models.request_models import ClangTidyChecksRequest, ClangTidyCheckSearchRequest, ClangTidyConfigRequest, ClangTidyAnalyzeRequest, ClangTidyIncrementalAnalyzeRequest, ClangTidyManifestRequest
+from app.api.models.response_models import ClangTidyChecksResponse, ClangTidyCheckSearchResponse, ClangTidyAnalysisResponse, ManifestResponse, BaseResponse
 from app.services.clangtidy_service import ClangTidyService
 from app.services.file_service import FileService
-from app.core.errors import ClangTidyException, FileException
+from app.services.incremental_service import IncrementalScanService
+from app.services.baseline_service import baseline_store
+from app.core.errors import ClangTidyException, FileException, AdmissionRejected, BaselineException
+from app.utils.admission import admission_controller
+from app.utils.http_cache import make_etag, is_not_modified, not_modified_response, set_cache_headers
+from app.utils.json_response import FastJSONResponse
 
 router = APIRouter()
 
 @router.get("/checks", response_model=ClangTidyChecksResponse)
-async def list_checks():
+async def list_checks(
+    http_request: Request,
+    response: Response,
+    request: ClangTidyChecksRequest = Depends()
+):
     """
     List available ClangTidy checks
     """
@@ -22,7 +33,17 @@ async def list_checks():
                 detail={"message": "ClangTidy is not available. Please ensure it is installed correctly."}
             )
         
-        checks = await ClangTidyService.list_checks()
+        # Answer revalidations from the catalog version alone
+        etag = make_etag("clangtidy-checks", await ClangTidyService.get_checks_version(), http_request.url.query)
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag)
+        
+        set_cache_headers(response, etag)
+        
+        checks = await ClangTidyService.list_checks(
+            category=request.category,
+            prefix=request.prefix
+        )
         
         return {
             "success": True,
@@ -45,6 +66,62 @@ async def list_checks():
             detail={"message": f"Error listing checks: {str(e)}"}
         )
 
+@router.get("/checks/search", response_model=ClangTidyCheckSearchResponse)
+async def search_checks(
+    http_request: Request,
+    response: Response,
+    request: ClangTidyCheckSearchRequest = Depends()
+):
+    """
+    Search ClangTidy checks, one page at a time
+    """
+    try:
+        # Check if ClangTidy is available
+        if not await ClangTidyService.check_availability():
+            raise HTTPException(
+                status_code=400,
+                detail={"message": "ClangTidy is not available. Please ensure it is installed correctly."}
+            )
+        
+        # Answer revalidations from the catalog version alone
+        etag = make_etag("clangtidy-checks-search", await ClangTidyService.get_checks_version(), http_request.url.query)
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag)
+        
+        set_cache_headers(response, etag)
+        
+        page = await ClangTidyService.search_checks(
+            query=request.q,
+            category=request.category,
+            limit=request.limit,
+            cursor=request.cursor
+        )
+        
+        return {
+            "success": True,
+            "message": f"Found {page['total']} checks",
+            "checks": page["items"],
+            "total": page["total"],
+            "next_cursor": page["next_cursor"],
+            "facets": page["facets"],
+            "took_ms": page["took_ms"]
+        }
+    
+    except ClangTidyException as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except HTTPException as e:
+        raise e
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error searching checks: {str(e)}"}
+        )
+
 @router.post("/config", response_model=BaseResponse)
 async def update_config(
     config: ClangTidyConfigRequest = Body(...)
@@ -88,7 +165,7 @@ async def update_config(
 async def analyze_files(
     background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
-    request: ClangTidyAnalyzeRequest = Depends()
+    request: ClangTidyAnalyzeRequest = Depends(ClangTidyAnalyzeRequest.as_form)
 ):
     """
     Analyze files using ClangTidy
@@ -104,12 +181,23 @@ async def analyze_files(
                 detail={"message": "ClangTidy is not available. Please ensure it is installed correctly."}
             )
         
+        # Reject before storing the upload if ClangTidy is saturated
+        admission_controller.check("clangtidy")
+        
+        # Fail before running the analysis if the baseline does not exist
+        if request.baseline_id:
+            baseline_store.get(request.baseline_id)
+        
         # Save uploaded files
         saved_paths, temp_dir = await FileService.save_uploaded_files(files)
         
         # Run analysis
         results = await ClangTidyService.analyze_files(saved_paths, request.config.dict())
         
+        # Drop findings recorded in the baseline
+        if request.baseline_id:
+            results = baseline_store.apply(request.baseline_id, "clangtidy", results)
+        
         # Schedule cleanup
         background_tasks.add_task(
             FileService.cleanup_analysis_files,
@@ -117,14 +205,153 @@ async def analyze_files(
             temp_dir
         )
         
-        return {
+        # Results already have the response model's shape, so skip re-validating them
+        return FastJSONResponse({
             "success": True,
             "message": f"Analysis completed with {results['stats']['total_issues']} issues",
             "issues": results["issues"],
-            "stats": results["stats"]
+            "stats": {**results["stats"], **FileService.get_upload_stats(temp_dir)}
+        })
+    
+    except AdmissionRejected as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    except (ClangTidyException, FileException, BaselineException) as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except HTTPException as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise e
+    
+    except Exception as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error running analysis: {str(e)}"}
+        )
+
+@router.post("/manifest", response_model=ManifestResponse)
+async def check_manifest(request: ClangTidyManifestRequest):
+    """
+    Find the files of a manifest that must be uploaded for an incremental analysis
+    
+    The manifest maps the relative path of every file to its SHA-256 content
+    hash. Files whose results are stored from an earlier analysis with the
+    same configuration are not listed, but every header is as soon as one
+    file needs analysis, so the includes of the analyzed files resolve.
+    """
+    try:
+        result = await IncrementalScanService.check_manifest("clangtidy", request.config.dict(), request.files)
+        
+        return {
+            "success": True,
+            "message": f"{len(result['missing'])} of {result['files']} files need to be uploaded",
+            **result
         }
     
     except (ClangTidyException, FileException) as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error checking manifest: {str(e)}"}
+        )
+
+@router.post("/analyze/incremental", response_model=ClangTidyAnalysisResponse)
+async def analyze_files_incremental(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(default=[]),
+    request: ClangTidyIncrementalAnalyzeRequest = Depends(ClangTidyIncrementalAnalyzeRequest.as_form)
+):
+    """
+    Analyze the changed files of a tree using ClangTidy
+    
+    Upload the files listed by /manifest, named by their relative path, with
+    the manifest of the whole tree. Results of the other files come from the
+    per-file result store; if some are no longer stored, the request fails
+    with 409 and lists the files to upload.
+    """
+    saved_paths = []
+    temp_dir = None
+    
+    try:
+        # Check if ClangTidy is available
+        if not await ClangTidyService.check_availability():
+            raise HTTPException(
+                status_code=400,
+                detail={"message": "ClangTidy is not available. Please ensure it is installed correctly."}
+            )
+        
+        # Reject before storing the upload if ClangTidy is saturated
+        admission_controller.check("clangtidy")
+        
+        # Fail before running the analysis if the baseline does not exist
+        if request.baseline_id:
+            baseline_store.get(request.baseline_id)
+        
+        # Save uploaded files
+        if files:
+            saved_paths, temp_dir = await FileService.save_uploaded_files(files)
+        
+        # Run analysis on the uploads and add the stored results
+        results = await IncrementalScanService.analyze_files("clangtidy", request.config.dict(), request.manifest, saved_paths)
+        
+        # Drop findings recorded in the baseline
+        if request.baseline_id:
+            results = baseline_store.apply(request.baseline_id, "clangtidy", results)
+        
+        # Schedule cleanup
+        background_tasks.add_task(
+            FileService.cleanup_analysis_files,
+            saved_paths,
+            temp_dir
+        )
+        
+        # Results already have the response model's shape, so skip re-validating them
+        return FastJSONResponse({
+            "success": True,
+            "message": f"Analysis completed with {results['stats']['total_issues']} issues",
+            "issues": results["issues"],
+            "stats": {**results["stats"], **FileService.get_upload_stats(temp_dir)}
+        })
+    
+    except AdmissionRejected as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    except (ClangTidyException, FileException, BaselineException) as e:
         # Clean up files on error
         if saved_paths or temp_dir:
             FileService.cleanup_analysis_files(saved_paths, temp_dir)
@@ -149,4 +376,115 @@ async def analyze_files(
         raise HTTPException(
             status_code=500,
             detail={"message": f"Error running analysis: {str(e)}"}
-        )
\ No newline at end of file
+        )
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Format a Server-Sent Events message
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/analyze/stream")
+async def analyze_files_stream(
+    files: List[UploadFile] = File(...),
+    request: ClangTidyAnalyzeRequest = Depends(ClangTidyAnalyzeRequest.as_form)
+):
+    """
+    Analyze files using ClangTidy and stream findings as Server-Sent Events
+    
+    Emits a "start" event, then "issue" events (ClangTidyIssue records) and a
+    "progress" event as each file finishes, and finally a "stats" event.
+    Failures during the run are reported as an "error" event. With a
+    baseline, issues recorded in it are not sent and the stats count only
+    new issues.
+    """
+    saved_paths = []
+    temp_dir = None
+    
+    try:
+        # Check if ClangTidy is available
+        if not await ClangTidyService.check_availability():
+            raise HTTPException(
+                status_code=400,
+                detail={"message": "ClangTidy is not available. Please ensure it is installed correctly."}
+            )
+        
+        # Reject before storing the upload or opening the stream if ClangTidy is saturated
+        admission_controller.check("clangtidy")
+        
+        # Fail before storing the upload if the baseline does not exist
+        if request.baseline_id:
+            baseline_store.get(request.baseline_id)
+        
+        # Save uploaded files
+        saved_paths, temp_dir = await FileService.save_uploaded_files(files)
+    
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    except (FileException, BaselineException) as e:
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except HTTPException as e:
+        raise e
+    
+    except Exception as e:
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error running analysis: {str(e)}"}
+        )
+    
+    async def event_stream() -> AsyncIterator[str]:
+        known = frozenset()
+        if request.baseline_id:
+            known = baseline_store.get(request.baseline_id)["fingerprints"].get("clangtidy", frozenset())
+        issues = []
+        
+        try:
+            async for event in ClangTidyService.analyze_files_stream(saved_paths, request.config.dict()):
+                if request.baseline_id:
+                    # Hold back issues recorded in the baseline and summarize them with the stats
+                    if event["event"] == "issue":
+                        issues.append(event["data"])
+                        if event["data"]["id"] in known:
+                            continue
+                    elif event["event"] == "stats":
+                        event = {
+                            "event": "stats",
+                            "data": baseline_store.apply(
+                                request.baseline_id,
+                                "clangtidy",
+                                {"issues": issues, "stats": event["data"]}
+                            )["stats"]
+                        }
+                
+                yield format_sse(event["event"], event["data"])
+        
+        except ClangTidyException as e:
+            yield format_sse("error", {"message": e.message, "details": e.details})
+        
+        except Exception as e:
+            yield format_sse("error", {"message": f"Error running analysis: {str(e)}"})
+        
+        finally:
+            # Clean up files once the stream ends or the client disconnects
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
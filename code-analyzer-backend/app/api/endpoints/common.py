@@ -1,12 +1,21 @@
+import os
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
 from typing import List, Dict, Any, Optional
 
-from app.api.models.response_models import HealthCheckResponse, BaseResponse
-from app.services.semgrep_service import SemgrepService
+from app.api.models.response_models import HealthCheckResponse, LivenessResponse, ReadinessResponse, MetricsResponse, BaseResponse
+from app.services.semgrep_service import SemgrepService, semgrep_batcher
+from app.services.semgrep_config_cache import semgrep_config_cache
 from app.services.snyk_service import SnykService
 from app.services.clangtidy_service import ClangTidyService
+from app.services.baseline_service import baseline_store
+from app.services.compilation_database import compilation_databases
 from app.services.file_service import FileService
+from app.services.job_service import job_manager
+from app.services.result_cache import result_cache
+from app.services.tool_registry import tool_registry
+from app.utils.admission import admission_controller
+from app.utils.singleflight import analysis_flights
 from app.core.config import settings
 
 router = APIRouter()
@@ -15,9 +24,11 @@ router = APIRouter()
 async def health_check():
     """
     Health check endpoint to verify API and tools availability
+    
+    Tool availability is served from the tool registry cache
     """
     # Check tools availability
-    semgrep_available = True  # We assume Semgrep is available by default
+    semgrep_available = await SemgrepService.check_availability()
     snyk_available = await SnykService.check_availability()
     clangtidy_available = await ClangTidyService.check_availability()
     
@@ -33,6 +44,69 @@ async def health_check():
         }
     }
 
+@router.get("/health/live", response_model=LivenessResponse)
+async def liveness_check():
+    """
+    Liveness probe
+    
+    Only confirms the process is serving requests, without checking any tools
+    """
+    return {
+        "success": True,
+        "message": "API is alive",
+        "status": "alive"
+    }
+
+@router.get("/health/ready", response_model=ReadinessResponse)
+async def readiness_check(refresh: bool = False):
+    """
+    Readiness probe
+    
+    Verifies that the tool registry has probed every tool and that the upload
+    directory is writable. Pass refresh=true to re-probe the tools first.
+    """
+    if refresh:
+        await tool_registry.refresh()
+    
+    checks = {
+        "tools_probed": tool_registry.ready,
+        "upload_dir_writable": os.path.isdir(settings.UPLOAD_DIR) and os.access(settings.UPLOAD_DIR, os.W_OK)
+    }
+    ready = all(checks.values())
+    
+    content = {
+        "success": ready,
+        "message": "API is ready" if ready else "API is not ready",
+        "status": "ready" if ready else "not_ready",
+        "checks": checks,
+        "tools": tool_registry.snapshot()
+    }
+    
+    if not ready:
+        return JSONResponse(status_code=503, content=content)
+    
+    return content
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_metrics():
+    """
+    Runtime metrics for caches and tool execution
+    """
+    return {
+        "success": True,
+        "message": "Metrics retrieved successfully",
+        "metrics": {
+            "result_cache": result_cache.stats(),
+            "jobs": job_manager.stats(),
+            "admission": admission_controller.stats(),
+            "semgrep_batcher": semgrep_batcher.stats(),
+            "semgrep_configs": semgrep_config_cache.stats(),
+            "singleflight": analysis_flights.stats(),
+            "compilation_databases": compilation_databases.stats(),
+            "baselines": baseline_store.stats()
+        }
+    }
+
 @router.post("/upload", response_model=BaseResponse)
 async def upload_files(
     background_tasks: BackgroundTasks,
@@ -63,7 +137,8 @@ async def upload_files(
             "message": f"Successfully uploaded {len(saved_paths)} files",
             "data": {
                 "file_count": len(saved_paths),
-                "file_types": file_types
+                "file_types": file_types,
+                **FileService.get_upload_stats(temp_dir)
             }
         }
     
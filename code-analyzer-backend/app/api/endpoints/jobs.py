@@ -0,0 +1,178 @@
+import time
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from typing import List, Dict, Any, Optional
+
+from app.api.models.request_models import SemgrepAnalyzeRequest, SnykAnalyzeRequest, ClangTidyAnalyzeRequest
+from app.api.models.response_models import JobResponse, JobListResponse, JobResultResponse
+from app.services.job_service import job_manager, check_callback_url, JOB_COMPLETED
+from app.services.file_service import FileService
+from app.services.tool_registry import tool_registry
+from app.services.baseline_service import baseline_store
+from app.core.errors import AppException, JobException
+
+router = APIRouter()
+
+async def submit_job(
+    tool: str,
+    files: List[UploadFile],
+    config: Dict[str, Any],
+    callback_url: Optional[str],
+    baseline_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Save uploaded files and queue an analysis job for them
+    """
+    saved_paths = []
+    temp_dir = None
+    
+    try:
+        # Check if the tool is available
+        if not await tool_registry.is_available(tool):
+            raise HTTPException(
+                status_code=400,
+                detail={"message": f"{tool} is not available. Please ensure it is installed correctly."}
+            )
+        
+        # Fail before storing the upload if the baseline does not exist
+        if baseline_id:
+            baseline_store.get(baseline_id)
+        
+        # Refuse callback URLs pointing at internal services before storing the upload
+        if callback_url:
+            await check_callback_url(callback_url)
+        
+        # Save uploaded files
+        upload_started = time.perf_counter()
+        saved_paths, temp_dir = await FileService.save_uploaded_files(files)
+        upload_seconds = time.perf_counter() - upload_started
+        
+        # Queue the job; the job cleans up the files when it finishes
+        job = await job_manager.submit(tool, saved_paths, temp_dir, config, callback_url, upload_seconds, baseline_id)
+        
+        return {
+            "success": True,
+            "message": f"Job {job.id} queued",
+            "job": job.to_dict()
+        }
+    
+    except AppException as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except HTTPException as e:
+        raise e
+    
+    except Exception as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error submitting job: {str(e)}"}
+        )
+
+@router.post("/semgrep", response_model=JobResponse, status_code=202)
+async def submit_semgrep_job(
+    files: List[UploadFile] = File(...),
+    request: SemgrepAnalyzeRequest = Depends(SemgrepAnalyzeRequest.as_form),
+    callback_url: Optional[str] = None
+):
+    """
+    Queue a Semgrep analysis job
+    
+    Returns immediately with a job ID; poll /jobs/{job_id} for status
+    """
+    return await submit_job("semgrep", files, request.config.dict(), callback_url, request.baseline_id)
+
+@router.post("/snyk", response_model=JobResponse, status_code=202)
+async def submit_snyk_job(
+    files: List[UploadFile] = File(...),
+    request: SnykAnalyzeRequest = Depends(SnykAnalyzeRequest.as_form),
+    callback_url: Optional[str] = None
+):
+    """
+    Queue a Snyk analysis job
+    
+    Returns immediately with a job ID; poll /jobs/{job_id} for status
+    """
+    return await submit_job("snyk", files, request.config.dict(), callback_url, request.baseline_id)
+
+@router.post("/clangtidy", response_model=JobResponse, status_code=202)
+async def submit_clangtidy_job(
+    files: List[UploadFile] = File(...),
+    request: ClangTidyAnalyzeRequest = Depends(ClangTidyAnalyzeRequest.as_form),
+    callback_url: Optional[str] = None
+):
+    """
+    Queue a ClangTidy analysis job
+    
+    Returns immediately with a job ID; poll /jobs/{job_id} for status
+    """
+    return await submit_job("clangtidy", files, request.config.dict(), callback_url, request.baseline_id)
+
+@router.get("", response_model=JobListResponse)
+async def list_jobs():
+    """
+    List queued, running and recently finished jobs
+    """
+    jobs = job_manager.list_jobs()
+    
+    return {
+        "success": True,
+        "message": f"Found {len(jobs)} jobs",
+        "jobs": [job.to_dict() for job in jobs]
+    }
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Get the status and timing breakdown of a job
+    """
+    try:
+        job = job_manager.get(job_id)
+        
+        return {
+            "success": True,
+            "message": f"Job is {job.status}",
+            "job": job.to_dict()
+        }
+    
+    except JobException as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+
+@router.get("/{job_id}/result", response_model=JobResultResponse)
+async def get_job_result(job_id: str):
+    """
+    Get the result of a finished job
+    """
+    try:
+        job = job_manager.get(job_id)
+        
+        if not job.finished:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": f"Job is still {job.status}", "details": {"job_id": job_id}}
+            )
+        
+        return {
+            "success": job.status == JOB_COMPLETED,
+            "message": "Job completed" if job.status == JOB_COMPLETED else "Job failed",
+            "job": job.to_dict(),
+            "result": job.result
+        }
+    
+    except JobException as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
\ No newline at end of file
@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, UploadFile, File, BackgroundTasks, HTTPException
+from typing import List, Dict, Any, Optional
+
+from app.api.models.request_models import ScanRequest
+from app.api.models.response_models import ScanResponse
+from app.services.scan_service import ScanService
+from app.services.file_service import FileService
+from app.core.errors import FileException, BaselineException
+from app.utils.json_response import FastJSONResponse
+
+router = APIRouter()
+
+@router.post("", response_model=ScanResponse)
+async def scan_files(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    request: ScanRequest = Depends(ScanRequest.as_form)
+):
+    """
+    Analyze files with Semgrep, Snyk and ClangTidy in one request
+    
+    Files are uploaded once, routed to the tools by type and the configured
+    tools run concurrently. Tools with no relevant files are skipped.
+    """
+    saved_paths = []
+    temp_dir = None
+    
+    try:
+        # Save uploaded files
+        saved_paths, temp_dir = await FileService.save_uploaded_files(files)
+        
+        # Run the tools
+        configs = {
+            tool: (config.dict() if config is not None else None)
+            for tool, config in request.config
+        }
+        results = await ScanService.scan_files(saved_paths, configs, request.baseline_id)
+        
+        # Schedule cleanup
+        background_tasks.add_task(
+            FileService.cleanup_analysis_files,
+            saved_paths,
+            temp_dir
+        )
+        
+        # Results already have the response model's shape, so skip re-validating them
+        return FastJSONResponse({
+            "success": results["stats"]["tools_failed"] == 0,
+            "message": f"Scan completed with {results['stats']['tools_run']} tools",
+            "tools": results["tools"],
+            "stats": {**results["stats"], **FileService.get_upload_stats(temp_dir)}
+        })
+    
+    except (FileException, BaselineException) as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except Exception as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error running scan: {str(e)}"}
+        )
\ No newline at end of file
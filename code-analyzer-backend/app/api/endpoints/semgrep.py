@@ -1,23 +1,41 @@
-from fastapi import APIRouter, Depends, UploadFile, File, BackgroundTasks, HTTPException, Body
+from fastapi import APIRouter, Depends, UploadFile, File, BackgroundTasks, HTTPException, Body, Request, Response
 from typing import List, Dict, Any, Optional
 
-from app.api.models.request_models import SemgrepRuleRequest, SemgrepRuleContentRequest, SemgrepConfigRequest, SemgrepAnalyzeRequest
-from app.api.models.response_models import SemgrepRulesResponse, SemgrepRuleContentResponse, SemgrepAnalysisResponse, BaseResponse
+from app.api.models.request_models import SemgrepRuleRequest, SemgrepRuleSearchRequest, SemgrepRuleContentRequest, SemgrepConfigRequest, SemgrepAnalyzeRequest, SemgrepIncrementalAnalyzeRequest, SemgrepManifestRequest
+from app.api.models.response_models import SemgrepRulesResponse, SemgrepRuleSearchResponse, SemgrepRuleContentResponse, SemgrepAnalysisResponse, ManifestResponse, BaseResponse
 from app.services.semgrep_service import SemgrepService
 from app.services.file_service import FileService
-from app.core.errors import SemgrepException, FileException
+from app.services.incremental_service import IncrementalScanService
+from app.services.baseline_service import baseline_store
+from app.core.errors import SemgrepException, FileException, AdmissionRejected, BaselineException
+from app.utils.admission import admission_controller
+from app.utils.http_cache import make_etag, is_not_modified, not_modified_response, set_cache_headers
+from app.utils.json_response import FastJSONResponse
 
 router = APIRouter()
 
 @router.get("/rules", response_model=SemgrepRulesResponse)
 async def list_rules(
+    http_request: Request,
+    response: Response,
     request: SemgrepRuleRequest = Depends()
 ):
     """
     List available Semgrep rules
     """
     try:
-        rules = await SemgrepService.list_rules(request.path)
+        # Answer revalidations from the catalog version alone
+        etag = make_etag("semgrep-rules", await SemgrepService.get_rules_version(request.path), http_request.url.query)
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag)
+        
+        set_cache_headers(response, etag)
+        
+        rules = await SemgrepService.list_rules(
+            request.path,
+            language=request.language,
+            severity=request.severity
+        )
         
         return {
             "success": True,
@@ -37,14 +55,72 @@ async def list_rules(
             detail={"message": f"Error listing rules: {str(e)}"}
         )
 
+@router.get("/rules/search", response_model=SemgrepRuleSearchResponse)
+async def search_rules(
+    http_request: Request,
+    response: Response,
+    request: SemgrepRuleSearchRequest = Depends()
+):
+    """
+    Search Semgrep rules, one page at a time
+    """
+    try:
+        # Answer revalidations from the catalog version alone
+        etag = make_etag("semgrep-rules-search", await SemgrepService.get_rules_version(request.path), http_request.url.query)
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag)
+        
+        set_cache_headers(response, etag)
+        
+        page = await SemgrepService.search_rules(
+            request.path,
+            query=request.q,
+            language=request.language,
+            severity=request.severity,
+            limit=request.limit,
+            cursor=request.cursor
+        )
+        
+        return {
+            "success": True,
+            "message": f"Found {page['total']} rules",
+            "rules": page["items"],
+            "total": page["total"],
+            "next_cursor": page["next_cursor"],
+            "facets": page["facets"],
+            "took_ms": page["took_ms"]
+        }
+    
+    except SemgrepException as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error searching rules: {str(e)}"}
+        )
+
 @router.get("/rules/content", response_model=SemgrepRuleContentResponse)
 async def get_rule_content(
+    http_request: Request,
+    response: Response,
     request: SemgrepRuleContentRequest = Depends()
 ):
     """
     Get content of a specific Semgrep rule
     """
     try:
+        # Answer revalidations from the rule file's stamp alone
+        version = SemgrepService.get_rule_file_version(request.rule_path)
+        etag = make_etag("semgrep-rule-content", version, http_request.url.query) if version else None
+        if etag and is_not_modified(http_request, etag):
+            return not_modified_response(etag)
+        
+        set_cache_headers(response, etag)
+        
         rule_data = await SemgrepService.get_rule_content(request.rule_path)
         
         return {
@@ -102,7 +178,7 @@ async def update_config(
 async def analyze_files(
     background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
-    request: SemgrepAnalyzeRequest = Depends()
+    request: SemgrepAnalyzeRequest = Depends(SemgrepAnalyzeRequest.as_form)
 ):
     """
     Analyze files using Semgrep
@@ -111,12 +187,23 @@ async def analyze_files(
     temp_dir = None
     
     try:
+        # Reject before storing the upload if Semgrep is saturated
+        admission_controller.check("semgrep")
+        
+        # Fail before running the analysis if the baseline does not exist
+        if request.baseline_id:
+            baseline_store.get(request.baseline_id)
+        
         # Save uploaded files
         saved_paths, temp_dir = await FileService.save_uploaded_files(files)
         
         # Run analysis
         results = await SemgrepService.analyze_files(saved_paths, request.config.dict())
         
+        # Drop findings recorded in the baseline
+        if request.baseline_id:
+            results = baseline_store.apply(request.baseline_id, "semgrep", results)
+        
         # Schedule cleanup
         background_tasks.add_task(
             FileService.cleanup_analysis_files,
@@ -124,14 +211,138 @@ async def analyze_files(
             temp_dir
         )
         
-        return {
+        # Results already have the response model's shape, so skip re-validating them
+        return FastJSONResponse({
             "success": True,
             "message": f"Analysis completed with {results['stats']['total_findings']} findings",
             "findings": results["findings"],
-            "stats": results["stats"]
+            "stats": {**results["stats"], **FileService.get_upload_stats(temp_dir)}
+        })
+    
+    except AdmissionRejected as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    except (SemgrepException, FileException, BaselineException) as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except Exception as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error running analysis: {str(e)}"}
+        )
+
+@router.post("/manifest", response_model=ManifestResponse)
+async def check_manifest(request: SemgrepManifestRequest):
+    """
+    Find the files of a manifest that must be uploaded for an incremental analysis
+    
+    The manifest maps the relative path of every file to its SHA-256 content
+    hash. Files whose results are stored from an earlier analysis with the
+    same configuration are not listed.
+    """
+    try:
+        result = await IncrementalScanService.check_manifest("semgrep", request.config.dict(), request.files)
+        
+        return {
+            "success": True,
+            "message": f"{len(result['missing'])} of {result['files']} files need to be uploaded",
+            **result
         }
     
     except (SemgrepException, FileException) as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details}
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Error checking manifest: {str(e)}"}
+        )
+
+@router.post("/analyze/incremental", response_model=SemgrepAnalysisResponse)
+async def analyze_files_incremental(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(default=[]),
+    request: SemgrepIncrementalAnalyzeRequest = Depends(SemgrepIncrementalAnalyzeRequest.as_form)
+):
+    """
+    Analyze the changed files of a tree using Semgrep
+    
+    Upload the files listed by /manifest, named by their relative path, with
+    the manifest of the whole tree. Results of the other files come from the
+    per-file result store; if some are no longer stored, the request fails
+    with 409 and lists the files to upload.
+    """
+    saved_paths = []
+    temp_dir = None
+    
+    try:
+        # Reject before storing the upload if Semgrep is saturated
+        admission_controller.check("semgrep")
+        
+        # Fail before running the analysis if the baseline does not exist
+        if request.baseline_id:
+            baseline_store.get(request.baseline_id)
+        
+        # Save uploaded files
+        if files:
+            saved_paths, temp_dir = await FileService.save_uploaded_files(files)
+        
+        # Run analysis on the uploads and add the stored results
+        results = await IncrementalScanService.analyze_files("semgrep", request.config.dict(), request.manifest, saved_paths)
+        
+        # Drop findings recorded in the baseline
+        if request.baseline_id:
+            results = baseline_store.apply(request.baseline_id, "semgrep", results)
+        
+        # Schedule cleanup
+        background_tasks.add_task(
+            FileService.cleanup_analysis_files,
+            saved_paths,
+            temp_dir
+        )
+        
+        # Results already have the response model's shape, so skip re-validating them
+        return FastJSONResponse({
+            "success": True,
+            "message": f"Analysis completed with {results['stats']['total_findings']} findings",
+            "findings": results["findings"],
+            "stats": {**results["stats"], **FileService.get_upload_stats(temp_dir)}
+        })
+    
+    except AdmissionRejected as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    except (SemgrepException, FileException, BaselineException) as e:
         # Clean up files on error
         if saved_paths or temp_dir:
             FileService.cleanup_analysis_files(saved_paths, temp_dir)
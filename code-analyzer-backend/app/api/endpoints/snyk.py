@@ -5,7 +5,10 @@ from app.api.models.request_models import SnykConfigRequest, SnykAnalyzeRequest
 from app.api.models.response_models import SnykAnalysisResponse, BaseResponse
 from app.services.snyk_service import SnykService
 from app.services.file_service import FileService
-from app.core.errors import SnykException, FileException
+from app.services.baseline_service import baseline_store
+from app.core.errors import SnykException, FileException, AdmissionRejected, BaselineException
+from app.utils.admission import admission_controller
+from app.utils.json_response import FastJSONResponse
 
 router = APIRouter()
 
@@ -52,7 +55,7 @@ async def update_config(
 async def analyze_files(
     background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
-    request: SnykAnalyzeRequest = Depends()
+    request: SnykAnalyzeRequest = Depends(SnykAnalyzeRequest.as_form)
 ):
     """
     Analyze files using Snyk
@@ -68,12 +71,23 @@ async def analyze_files(
                 detail={"message": "Snyk is not available. Please ensure it is installed correctly."}
             )
         
+        # Reject before storing the upload if Snyk is saturated
+        admission_controller.check("snyk")
+        
+        # Fail before running the analysis if the baseline does not exist
+        if request.baseline_id:
+            baseline_store.get(request.baseline_id)
+        
         # Save uploaded files
         saved_paths, temp_dir = await FileService.save_uploaded_files(files)
         
         # Run analysis
         results = await SnykService.analyze_files(saved_paths, request.config.dict())
         
+        # Drop findings recorded in the baseline
+        if request.baseline_id:
+            results = baseline_store.apply(request.baseline_id, "snyk", results)
+        
         # Schedule cleanup
         background_tasks.add_task(
             FileService.cleanup_analysis_files,
@@ -81,14 +95,26 @@ async def analyze_files(
             temp_dir
         )
         
-        return {
+        # Results already have the response model's shape, so skip re-validating them
+        return FastJSONResponse({
             "success": True,
             "message": f"Analysis completed with {results['stats']['total_vulnerabilities']} vulnerabilities",
             "vulnerabilities": results["vulnerabilities"],
-            "stats": results["stats"]
-        }
+            "stats": {**results["stats"], **FileService.get_upload_stats(temp_dir)}
+        })
+    
+    except AdmissionRejected as e:
+        # Clean up files on error
+        if saved_paths or temp_dir:
+            FileService.cleanup_analysis_files(saved_paths, temp_dir)
+        
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.message, "details": e.details},
+            headers={"Retry-After": str(e.retry_after)}
+        )
     
-    except (SnykException, FileException) as e:
+    except (SnykException, FileException, BaselineException) as e:
         # Clean up files on error
         if saved_paths or temp_dir:
             FileService.cleanup_analysis_files(saved_paths, temp_dir)
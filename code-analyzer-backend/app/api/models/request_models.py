@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field, validator
+import json
+from fastapi import Form, HTTPException
+from pydantic import BaseModel, Field, ValidationError, validator
 from typing import Dict, List, Optional, Any, Union
 
 # Common models
@@ -6,6 +8,68 @@ class BaseRequest(BaseModel):
     """Base model for all requests"""
     pass
 
+class AnalyzeFormMixin(BaseModel):
+    """
+    Mixin for analyze requests sent alongside file uploads
+    
+    Multipart requests carry the configuration as a JSON-encoded "config" form
+    field (as sent by the frontend), which as_form parses into the model
+    """
+    baseline_id: Optional[str] = Field(
+        default=None,
+        description="Only return findings missing from this baseline"
+    )
+    
+    @classmethod
+    def as_form(
+        cls,
+        config: str = Form(..., description="JSON-encoded tool configuration"),
+        baseline_id: Optional[str] = Form(None, description="Only return findings missing from this baseline")
+    ):
+        return cls.from_form_fields(baseline_id, config=config)
+    
+    @classmethod
+    def from_form_fields(cls, baseline_id: Optional[str], **json_fields: str):
+        """Build the model from JSON-encoded form fields"""
+        values = {}
+        for name, value in json_fields.items():
+            try:
+                values[name] = json.loads(value)
+            except json.JSONDecodeError as e:
+                raise HTTPException(
+                    status_code=422,
+                    detail={"message": f"Invalid {name} JSON: {str(e)}"}
+                )
+        
+        try:
+            return cls(baseline_id=baseline_id or None, **values)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=422,
+                detail={"message": "Invalid config", "details": e.errors(include_context=False)}
+            )
+
+class IncrementalFormMixin(AnalyzeFormMixin):
+    """
+    Mixin for incremental analyze requests
+    
+    Besides the configuration, the form carries a JSON-encoded "manifest" of
+    every file in the tree; only files without stored results are uploaded
+    """
+    manifest: Dict[str, str] = Field(
+        ...,
+        description="Relative path to SHA-256 content hash of every file"
+    )
+    
+    @classmethod
+    def as_form(
+        cls,
+        config: str = Form(..., description="JSON-encoded tool configuration"),
+        manifest: str = Form(..., description="JSON object mapping relative file paths to SHA-256 content hashes"),
+        baseline_id: Optional[str] = Form(None, description="Only return findings missing from this baseline")
+    ):
+        return cls.from_form_fields(baseline_id, config=config, manifest=manifest)
+
 # Semgrep models
 class SemgrepRuleRequest(BaseModel):
     """Request model for getting Semgrep rules"""
@@ -13,6 +77,43 @@ class SemgrepRuleRequest(BaseModel):
         default=None,
         description="Path to the rules directory"
     )
+    language: Optional[str] = Field(
+        default=None,
+        description="Only list rules targeting this language"
+    )
+    severity: Optional[str] = Field(
+        default=None,
+        description="Only list rules with this severity"
+    )
+
+class SemgrepRuleSearchRequest(BaseModel):
+    """Request model for searching Semgrep rules"""
+    path: Optional[str] = Field(
+        default=None,
+        description="Path to the rules directory"
+    )
+    q: Optional[str] = Field(
+        default=None,
+        description="Words to search for in rule id, name, message, language and severity"
+    )
+    language: Optional[str] = Field(
+        default=None,
+        description="Only include rules targeting this language"
+    )
+    severity: Optional[str] = Field(
+        default=None,
+        description="Only include rules with this severity"
+    )
+    limit: int = Field(
+        default=50,
+        ge=1,
+        le=500,
+        description="Maximum number of rules per page"
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor returned with the previous page"
+    )
 
 class SemgrepRuleContentRequest(BaseModel):
     """Request model for getting Semgrep rule content"""
@@ -32,7 +133,7 @@ class SemgrepConfigRequest(BaseModel):
         description="List of selected rule IDs"
     )
 
-class SemgrepAnalyzeRequest(BaseModel):
+class SemgrepAnalyzeRequest(AnalyzeFormMixin, BaseModel):
     """Request model for Semgrep analysis"""
     config: SemgrepConfigRequest = Field(
         ...,
@@ -45,6 +146,21 @@ class SemgrepAnalyzeRequest(BaseModel):
             raise ValueError("At least one rule must be selected")
         return v
 
+class SemgrepIncrementalAnalyzeRequest(IncrementalFormMixin, SemgrepAnalyzeRequest):
+    """Request model for incremental Semgrep analysis"""
+    pass
+
+class SemgrepManifestRequest(BaseModel):
+    """Request model for checking which files of a manifest need Semgrep analysis"""
+    config: SemgrepConfigRequest = Field(
+        ...,
+        description="Semgrep configuration"
+    )
+    files: Dict[str, str] = Field(
+        ...,
+        description="Relative path to SHA-256 content hash of every file"
+    )
+
 # Snyk models
 class SnykOptions(BaseModel):
     """Options for Snyk configuration"""
@@ -79,7 +195,7 @@ class SnykConfigRequest(BaseModel):
         description="Snyk options"
     )
 
-class SnykAnalyzeRequest(BaseModel):
+class SnykAnalyzeRequest(AnalyzeFormMixin, BaseModel):
     """Request model for Snyk analysis"""
     config: SnykConfigRequest = Field(
         ...,
@@ -87,6 +203,38 @@ class SnykAnalyzeRequest(BaseModel):
     )
 
 # ClangTidy models
+class ClangTidyChecksRequest(BaseModel):
+    """Request model for listing ClangTidy checks"""
+    category: Optional[str] = Field(
+        default=None,
+        description="Only list checks of this category"
+    )
+    prefix: Optional[str] = Field(
+        default=None,
+        description="Only list checks whose name starts with this prefix (e.g. bugprone-use)"
+    )
+
+class ClangTidyCheckSearchRequest(BaseModel):
+    """Request model for searching ClangTidy checks"""
+    q: Optional[str] = Field(
+        default=None,
+        description="Words to search for in check name, category and description"
+    )
+    category: Optional[str] = Field(
+        default=None,
+        description="Only include checks of this category"
+    )
+    limit: int = Field(
+        default=50,
+        ge=1,
+        le=500,
+        description="Maximum number of checks per page"
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor returned with the previous page"
+    )
+
 class ClangTidyOptions(BaseModel):
     """Options for ClangTidy configuration"""
     command_args: Optional[str] = Field(
@@ -97,6 +245,16 @@ class ClangTidyOptions(BaseModel):
         default=None,
         description="Compiler options to use during analysis"
     )
+    max_workers: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Maximum number of files analyzed in parallel (capped by the server limit)"
+    )
+    batch_size: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Files per clang-tidy process (0 spreads files evenly over the workers, 1 runs one process per file)"
+    )
 
 class ClangTidyConfigRequest(BaseModel):
     """Request model for ClangTidy configuration"""
@@ -115,9 +273,59 @@ class ClangTidyConfigRequest(BaseModel):
             raise ValueError("At least one check must be selected")
         return v
 
-class ClangTidyAnalyzeRequest(BaseModel):
+class ClangTidyAnalyzeRequest(AnalyzeFormMixin, BaseModel):
     """Request model for ClangTidy analysis"""
     config: ClangTidyConfigRequest = Field(
         ...,
         description="ClangTidy configuration"
+    )
+
+class ClangTidyIncrementalAnalyzeRequest(IncrementalFormMixin, ClangTidyAnalyzeRequest):
+    """Request model for incremental ClangTidy analysis"""
+    pass
+
+class ClangTidyManifestRequest(BaseModel):
+    """Request model for checking which files of a manifest need ClangTidy analysis"""
+    config: ClangTidyConfigRequest = Field(
+        ...,
+        description="ClangTidy configuration"
+    )
+    files: Dict[str, str] = Field(
+        ...,
+        description="Relative path to SHA-256 content hash of every file"
+    )
+
+# Baseline models
+class BaselineRequest(BaseModel):
+    """Request model for creating or replacing a baseline"""
+    description: Optional[str] = Field(
+        default=None,
+        description="Baseline description"
+    )
+    fingerprints: Dict[str, List[str]] = Field(
+        ...,
+        description="Finding ids to suppress by tool (semgrep, snyk or clangtidy), as returned by the analyze endpoints"
+    )
+
+# Scan models
+class ScanConfigRequest(BaseModel):
+    """Per-tool configuration for a multi-tool scan; omitted tools are skipped"""
+    semgrep: Optional[SemgrepConfigRequest] = Field(
+        default=None,
+        description="Semgrep configuration"
+    )
+    snyk: Optional[SnykConfigRequest] = Field(
+        default=None,
+        description="Snyk configuration"
+    )
+    clangtidy: Optional[ClangTidyConfigRequest] = Field(
+        default=None,
+        description="ClangTidy configuration"
+    )
+
+class ScanRequest(AnalyzeFormMixin, BaseModel):
+    """Request model for a multi-tool scan"""
+    config: ScanConfigRequest = Field(
+        ...,
+        description="Configuration of the tools to run"
     )
\ No newline at end of file
@@ -56,6 +56,29 @@ class SemgrepRulesResponse(BaseResponse):
         description="List of available rules"
     )
 
+class SemgrepRuleSearchResponse(BaseResponse):
+    """Response model for one page of a Semgrep rule search"""
+    rules: List[SemgrepRule] = Field(
+        default=[],
+        description="Matching rules on this page"
+    )
+    total: int = Field(
+        ...,
+        description="Number of matching rules"
+    )
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor for the next page, absent on the last page"
+    )
+    facets: Dict[str, Dict[str, int]] = Field(
+        default={},
+        description="Number of matching rules per language and severity"
+    )
+    took_ms: float = Field(
+        ...,
+        description="Search time in milliseconds"
+    )
+
 class SemgrepRuleContentResponse(BaseResponse):
     """Response model for Semgrep rule content"""
     content: str = Field(
@@ -171,6 +194,10 @@ class ClangTidyCheck(BaseModel):
         ...,
         description="Check name"
     )
+    category: Optional[str] = Field(
+        default=None,
+        description="Check category (e.g. bugprone, modernize)"
+    )
     description: Optional[str] = Field(
         default=None,
         description="Check description"
@@ -183,6 +210,29 @@ class ClangTidyChecksResponse(BaseResponse):
         description="List of available checks"
     )
 
+class ClangTidyCheckSearchResponse(BaseResponse):
+    """Response model for one page of a ClangTidy check search"""
+    checks: List[ClangTidyCheck] = Field(
+        default=[],
+        description="Matching checks on this page"
+    )
+    total: int = Field(
+        ...,
+        description="Number of matching checks"
+    )
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor for the next page, absent on the last page"
+    )
+    facets: Dict[str, Dict[str, int]] = Field(
+        default={},
+        description="Number of matching checks per category"
+    )
+    took_ms: float = Field(
+        ...,
+        description="Search time in milliseconds"
+    )
+
 class ClangTidyIssue(BaseModel):
     """Model for a ClangTidy issue"""
     id: str = Field(
@@ -229,6 +279,26 @@ class ClangTidyAnalysisResponse(BaseResponse):
         description="Analysis statistics"
     )
 
+# Incremental scan models
+class ManifestResponse(BaseResponse):
+    """Response model for a manifest check"""
+    missing: List[str] = Field(
+        default=[],
+        description="Relative paths of the files to upload"
+    )
+    missing_hashes: List[str] = Field(
+        default=[],
+        description="Content hashes of the files to upload"
+    )
+    files: int = Field(
+        ...,
+        description="Number of manifest files the tool analyzes"
+    )
+    cached: int = Field(
+        ...,
+        description="Number of those files with stored results"
+    )
+
 # Common models
 class HealthCheckResponse(BaseResponse):
     """Response model for health check"""
@@ -243,4 +313,218 @@ class HealthCheckResponse(BaseResponse):
     tools: Dict[str, bool] = Field(
         ...,
         description="Tool availability status"
+    )
+
+class ToolInfo(BaseModel):
+    """Model for the cached status of an analysis tool"""
+    name: str = Field(
+        ...,
+        description="Tool name"
+    )
+    available: bool = Field(
+        ...,
+        description="Whether the tool is available"
+    )
+    version: Optional[str] = Field(
+        default=None,
+        description="Tool version reported by --version"
+    )
+    path: Optional[str] = Field(
+        default=None,
+        description="Resolved path to the tool binary"
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Error from the last probe, if any"
+    )
+    checked_at: Optional[float] = Field(
+        default=None,
+        description="Unix timestamp of the last probe"
+    )
+
+class LivenessResponse(BaseResponse):
+    """Response model for liveness probe"""
+    status: str = Field(
+        default="alive",
+        description="API status"
+    )
+
+class ReadinessResponse(BaseResponse):
+    """Response model for readiness probe"""
+    status: str = Field(
+        ...,
+        description="Readiness status"
+    )
+    checks: Dict[str, bool] = Field(
+        default={},
+        description="Result of each readiness check"
+    )
+    tools: Dict[str, ToolInfo] = Field(
+        default={},
+        description="Cached status of each tool"
+    )
+
+class MetricsResponse(BaseResponse):
+    """Response model for runtime metrics"""
+    metrics: Dict[str, Any] = Field(
+        default={},
+        description="Metrics grouped by component"
+    )
+
+# Job models
+class JobInfo(BaseModel):
+    """Model for the state of an analysis job"""
+    id: str = Field(
+        ...,
+        description="Job ID"
+    )
+    tool: str = Field(
+        ...,
+        description="Tool running the analysis"
+    )
+    status: str = Field(
+        ...,
+        description="Job status (queued, running, completed or failed)"
+    )
+    file_count: int = Field(
+        ...,
+        description="Number of files submitted"
+    )
+    created_at: float = Field(
+        ...,
+        description="Unix timestamp when the job was submitted"
+    )
+    started_at: Optional[float] = Field(
+        default=None,
+        description="Unix timestamp when a worker started the job"
+    )
+    finished_at: Optional[float] = Field(
+        default=None,
+        description="Unix timestamp when the job finished"
+    )
+    timings: Dict[str, Optional[float]] = Field(
+        default={},
+        description="Seconds spent uploading, queued, running and in total"
+    )
+    error: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Error details if the job failed"
+    )
+    callback_url: Optional[str] = Field(
+        default=None,
+        description="URL notified when the job finishes"
+    )
+    callback_status: Optional[str] = Field(
+        default=None,
+        description="Outcome of the callback delivery"
+    )
+    attempts: int = Field(
+        default=0,
+        description="Times a worker started the job, including requeues after the tool was busy"
+    )
+
+class JobResponse(BaseResponse):
+    """Response model for a single job"""
+    job: JobInfo = Field(
+        ...,
+        description="Job state"
+    )
+
+class JobListResponse(BaseResponse):
+    """Response model for job listing"""
+    jobs: List[JobInfo] = Field(
+        default=[],
+        description="List of jobs"
+    )
+
+class JobResultResponse(BaseResponse):
+    """Response model for a finished job's result"""
+    job: JobInfo = Field(
+        ...,
+        description="Job state"
+    )
+    result: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Analysis results, in the same format as the tool's analyze endpoint"
+    )
+
+# Baseline models
+class BaselineInfo(BaseModel):
+    """Model for the metadata of a baseline"""
+    id: str = Field(
+        ...,
+        description="Baseline ID"
+    )
+    description: Optional[str] = Field(
+        default=None,
+        description="Baseline description"
+    )
+    created_at: float = Field(
+        ...,
+        description="Unix timestamp when the baseline was created"
+    )
+    updated_at: float = Field(
+        ...,
+        description="Unix timestamp when the baseline was last replaced"
+    )
+    counts: Dict[str, int] = Field(
+        default={},
+        description="Number of fingerprints per tool"
+    )
+
+class BaselineResponse(BaseResponse):
+    """Response model for a single baseline"""
+    baseline: BaselineInfo = Field(
+        ...,
+        description="Baseline metadata"
+    )
+    fingerprints: Optional[Dict[str, List[str]]] = Field(
+        default=None,
+        description="Fingerprints per tool"
+    )
+
+class BaselineListResponse(BaseResponse):
+    """Response model for baseline listing"""
+    baselines: List[BaselineInfo] = Field(
+        default=[],
+        description="List of baselines"
+    )
+
+# Scan models
+class ToolScanSection(BaseModel):
+    """Model for one tool's part of a multi-tool scan"""
+    status: str = Field(
+        ...,
+        description="Tool status (completed, failed or skipped)"
+    )
+    reason: Optional[str] = Field(
+        default=None,
+        description="Why the tool was skipped"
+    )
+    files: int = Field(
+        default=0,
+        description="Number of files routed to the tool"
+    )
+    duration_seconds: float = Field(
+        default=0.0,
+        description="Time the tool took"
+    )
+    results: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Tool results, in the same format as the tool's analyze endpoint"
+    )
+    error: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Error details if the tool failed"
+    )
+
+class ScanResponse(BaseResponse):
+    """Response model for a multi-tool scan"""
+    tools: Dict[str, ToolScanSection] = Field(
+        default={},
+        description="Per-tool results"
+    )
+    stats: Dict[str, Any] = Field(
+        default={},
+        description="Scan statistics"
     )
\ No newline at end of file
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import semgrep, snyk, clangtidy, common
+from app.api.endpoints import semgrep, snyk, clangtidy, common, jobs, scan, baselines
 
 # Create main API router
 api_router = APIRouter()
@@ -8,4 +8,7 @@ api_router = APIRouter()
 api_router.include_router(common.router, tags=["Common"])
 api_router.include_router(semgrep.router, prefix="/semgrep", tags=["Semgrep"])
 api_router.include_router(snyk.router, prefix="/snyk", tags=["Snyk"])
-api_router.include_router(clangtidy.router, prefix="/clangtidy", tags=["ClangTidy"])
\ No newline at end of file
+api_router.include_router(clangtidy.router, prefix="/clangtidy", tags=["ClangTidy"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+api_router.include_router(scan.router, prefix="/scan", tags=["Scan"])
+api_router.include_router(baselines.router, prefix="/baselines", tags=["Baselines"])
\ No newline at end of file
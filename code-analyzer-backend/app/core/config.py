@@ -30,25 +30,104 @@ class Settings(BaseSettings):
     # File handling
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "/tmp/code-analysis-uploads")
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50 MB
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # 1 MB read per chunk
+    ARCHIVE_MAX_UPLOAD_SIZE: int = int(os.getenv("ARCHIVE_MAX_UPLOAD_SIZE", str(100 * 1024 * 1024)))  # 100 MB compressed archive upload
+    ARCHIVE_MAX_FILES: int = int(os.getenv("ARCHIVE_MAX_FILES", "10000"))  # Entries read from one uploaded archive
+    ARCHIVE_MAX_BYTES: int = int(os.getenv("ARCHIVE_MAX_BYTES", str(512 * 1024 * 1024)))  # 512 MB extracted from one archive
+    MAX_MANIFEST_FILES: int = int(os.getenv("MAX_MANIFEST_FILES", "100000"))  # Files listed in one incremental scan manifest
     
     # Tool paths
+    SEMGREP_PATH: str = os.getenv("SEMGREP_PATH", "semgrep")
     SEMGREP_RULES_PATH: str = os.getenv("SEMGREP_RULES_PATH", "/home/kali/Desktop/Semgrep/semgrep-rules/c/lang/security/")
     SNYK_PATH: str = os.getenv("SNYK_PATH", "/home/kali/Desktop/synk")
+    SNYK_BINARY: str = os.getenv("SNYK_BINARY", "snyk")
     CLANGTIDY_PATH: str = os.getenv("CLANGTIDY_PATH", "clang-tidy")
+    CLANGTIDY_DOCS_PATH: str = os.getenv("CLANGTIDY_DOCS_PATH", "")  # clang-tidy "checks" documentation directory (.rst files); empty probes standard install locations
+    
+    # Caches
+    CACHE_DIR: str = os.getenv("CACHE_DIR", "/tmp/code-analysis-cache")
+    SEMGREP_RULES_REFRESH_INTERVAL: int = int(os.getenv("SEMGREP_RULES_REFRESH_INTERVAL", "30"))  # Seconds between rule directory rescans
+    SEMGREP_MAX_RULE_CATALOGS: int = int(os.getenv("SEMGREP_MAX_RULE_CATALOGS", "16"))  # Rule directories kept cataloged; the least recently used is dropped
+    CATALOG_CACHE_MAX_AGE: int = int(os.getenv("CATALOG_CACHE_MAX_AGE", "0"))  # Seconds clients may reuse rule/check listings without revalidating
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+    RESULT_CACHE_MEMORY_BYTES: int = int(os.getenv("RESULT_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))  # 64 MB
+    RESULT_CACHE_DISK_BYTES: int = int(os.getenv("RESULT_CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))  # 1 GB
+    
+    # Analysis jobs
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))  # In-process workers running queued jobs
+    JOB_QUEUE_SIZE: int = int(os.getenv("JOB_QUEUE_SIZE", "100"))  # Maximum number of queued jobs
+    JOB_RESULT_TTL: int = int(os.getenv("JOB_RESULT_TTL", "3600"))  # Seconds finished jobs stay queryable
+    JOB_CALLBACK_TIMEOUT: float = float(os.getenv("JOB_CALLBACK_TIMEOUT", "10"))  # Callback request timeout in seconds
+    JOB_CALLBACK_ALLOWED_SCHEMES: str = os.getenv("JOB_CALLBACK_ALLOWED_SCHEMES", "http,https")  # Comma-separated URL schemes callbacks may use
+    JOB_CALLBACK_ALLOWED_HOSTS: str = os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "")  # Comma-separated hosts (".example.com" for subdomains); empty allows any public host
+    JOB_CALLBACK_ALLOW_PRIVATE: bool = os.getenv("JOB_CALLBACK_ALLOW_PRIVATE", "False").lower() in ("true", "1", "t")  # Allow callbacks to private, loopback and link-local addresses
+    JOB_MAX_RETRIES: int = int(os.getenv("JOB_MAX_RETRIES", "5"))  # Times a job rejected by admission control is requeued
+    JOB_RETRY_BACKOFF: float = float(os.getenv("JOB_RETRY_BACKOFF", "2"))  # Seconds before the first requeue, doubled on each retry
+    
+    # Command output capture
+    COMMAND_OUTPUT_SPILL_THRESHOLD: int = int(os.getenv("COMMAND_OUTPUT_SPILL_THRESHOLD", str(8 * 1024 * 1024)))  # Stdout kept in memory before spilling to a temp file
+    COMMAND_STDERR_LIMIT: int = int(os.getenv("COMMAND_STDERR_LIMIT", str(64 * 1024)))  # Stderr bytes retained per command
+    COMMAND_READ_CHUNK_SIZE: int = 64 * 1024  # Bytes read from a pipe at a time
+    RESOURCE_SAMPLE_INTERVAL: float = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", "1.0"))  # Seconds between memory/CPU samples of tool processes
+    
+    # Adaptive concurrency (adjusts each tool's limit between its min/max_concurrent)
+    ADAPTIVE_CONCURRENCY_ENABLED: bool = os.getenv("ADAPTIVE_CONCURRENCY_ENABLED", "True").lower() in ("true", "1", "t")
+    ADAPTIVE_INTERVAL: float = float(os.getenv("ADAPTIVE_INTERVAL", "5"))  # Minimum seconds between limit changes
+    ADAPTIVE_MAX_LOAD_PER_CPU: float = float(os.getenv("ADAPTIVE_MAX_LOAD_PER_CPU", "1.5"))  # Back off above this 1-minute load per CPU
+    ADAPTIVE_MIN_MEMORY_FRACTION: float = float(os.getenv("ADAPTIVE_MIN_MEMORY_FRACTION", "0.1"))  # Back off below this fraction of available memory
+    ADAPTIVE_LATENCY_TOLERANCE: float = float(os.getenv("ADAPTIVE_LATENCY_TOLERANCE", "2.0"))  # Back off when runs get this much slower than baseline
+    ADAPTIVE_BACKOFF: float = float(os.getenv("ADAPTIVE_BACKOFF", "0.75"))  # Multiplier applied to the limit when backing off
+    
+    # Tool registry
+    TOOL_REFRESH_INTERVAL: int = int(os.getenv("TOOL_REFRESH_INTERVAL", "60"))  # Seconds between tool re-probes
     
     # Tool configurations
+    # Resource profiles: max_memory is an address-space limit per process,
+    # max_rss a resident memory limit for the whole process tree, nice a
+    # scheduling priority offset (0 or more; negative values are ignored)
+    # and cpu_affinity a CPU list such as "0-3,6"
     SEMGREP_CONFIG: Dict[str, Any] = {
         "timeout": 300,  # Semgrep timeout in seconds
-        "max_memory": "4G",  # Maximum memory for Semgrep
+        "max_memory": os.getenv("SEMGREP_MAX_MEMORY", "4G"),  # Maximum memory for Semgrep
+        "max_rss": os.getenv("SEMGREP_MAX_RSS", ""),
+        "nice": int(os.getenv("SEMGREP_NICE", "0")),
+        "cpu_affinity": os.getenv("SEMGREP_CPU_AFFINITY", ""),
+        "max_concurrent": int(os.getenv("SEMGREP_MAX_CONCURRENT", "4")),  # Server-wide concurrent runs (ceiling for the adaptive limit)
+        "min_concurrent": int(os.getenv("SEMGREP_MIN_CONCURRENT", "1")),  # Floor for the adaptive limit
+        "queue_size": int(os.getenv("SEMGREP_QUEUE_SIZE", "16")),  # Runs allowed to wait for a slot
+        "queue_timeout": float(os.getenv("SEMGREP_QUEUE_TIMEOUT", "120")),  # Seconds a run may wait before being rejected
+        "batch_window": float(os.getenv("SEMGREP_BATCH_WINDOW", "0.05")),  # Seconds to collect requests sharing a ruleset (0 disables batching)
+        "batch_max_files": int(os.getenv("SEMGREP_BATCH_MAX_FILES", "1000")),  # Files that close a batch early
     }
     
     SNYK_CONFIG: Dict[str, Any] = {
         "api_key": os.getenv("SNYK_API_KEY", ""),
         "timeout": 300,  # Snyk timeout in seconds
+        "max_memory": os.getenv("SNYK_MAX_MEMORY", ""),
+        "max_rss": os.getenv("SNYK_MAX_RSS", ""),
+        "nice": int(os.getenv("SNYK_NICE", "0")),
+        "cpu_affinity": os.getenv("SNYK_CPU_AFFINITY", ""),
+        "max_concurrent": int(os.getenv("SNYK_MAX_CONCURRENT", "2")),  # Server-wide concurrent runs (ceiling for the adaptive limit)
+        "min_concurrent": int(os.getenv("SNYK_MIN_CONCURRENT", "1")),  # Floor for the adaptive limit
+        "queue_size": int(os.getenv("SNYK_QUEUE_SIZE", "8")),  # Runs allowed to wait for a slot
+        "queue_timeout": float(os.getenv("SNYK_QUEUE_TIMEOUT", "120")),  # Seconds a run may wait before being rejected
     }
     
     CLANGTIDY_CONFIG: Dict[str, Any] = {
         "timeout": 300,  # ClangTidy timeout in seconds
+        "max_workers": int(os.getenv("CLANGTIDY_MAX_WORKERS", str(os.cpu_count() or 1))),  # Parallel clang-tidy processes
+        "batch_size": int(os.getenv("CLANGTIDY_BATCH_SIZE", "0")),  # Files per process (0 spreads files evenly over the workers)
+        "stream_batch_size": int(os.getenv("CLANGTIDY_STREAM_BATCH_SIZE", "1")),  # Files per process when streaming results, so issues arrive per file
+        "c_standard": os.getenv("CLANGTIDY_C_STANDARD", ""),  # -std= for C files (empty keeps the compiler default)
+        "cxx_standard": os.getenv("CLANGTIDY_CXX_STANDARD", ""),  # -std= for C++ files (empty keeps the compiler default)
+        "max_memory": os.getenv("CLANGTIDY_MAX_MEMORY", ""),
+        "max_rss": os.getenv("CLANGTIDY_MAX_RSS", ""),
+        "nice": int(os.getenv("CLANGTIDY_NICE", "0")),
+        "cpu_affinity": os.getenv("CLANGTIDY_CPU_AFFINITY", ""),
+        "max_concurrent": int(os.getenv("CLANGTIDY_MAX_CONCURRENT", str(os.cpu_count() or 1))),  # Server-wide concurrent processes (ceiling for the adaptive limit)
+        "min_concurrent": int(os.getenv("CLANGTIDY_MIN_CONCURRENT", "1")),  # Floor for the adaptive limit
+        "queue_size": int(os.getenv("CLANGTIDY_QUEUE_SIZE", "64")),  # Processes allowed to wait for a slot
+        "queue_timeout": float(os.getenv("CLANGTIDY_QUEUE_TIMEOUT", "120")),  # Seconds a run may wait before being rejected
     }
     
     class Config:
@@ -67,9 +67,45 @@ class ConfigException(AppException):
     ):
         super().__init__(status_code, message, details)
 
+class JobException(AppException):
+    """Exception raised when analysis job operations fail"""
+    def __init__(
+        self,
+        message: str = "Job operation failed",
+        details: Optional[Union[Dict[str, Any], List[Any]]] = None,
+        status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
+    ):
+        super().__init__(status_code, message, details)
+
+class BaselineException(AppException):
+    """Exception raised when baseline operations fail"""
+    def __init__(
+        self,
+        message: str = "Baseline operation failed",
+        details: Optional[Union[Dict[str, Any], List[Any]]] = None,
+        status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
+    ):
+        super().__init__(status_code, message, details)
+
+class AdmissionRejected(AppException):
+    """Exception raised when a tool is too busy to accept another run"""
+    def __init__(
+        self,
+        message: str = "Too many analyses in progress",
+        retry_after: int = 1,
+        details: Optional[Union[Dict[str, Any], List[Any]]] = None,
+        status_code: int = status.HTTP_429_TOO_MANY_REQUESTS,
+    ):
+        self.retry_after = retry_after
+        super().__init__(status_code, message, details)
+
 # Exception handlers
 def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
     """Handler for application-specific exceptions"""
+    headers = None
+    if isinstance(exc, AdmissionRejected):
+        headers = {"Retry-After": str(exc.retry_after)}
+    
     return JSONResponse(
         status_code=exc.status_code,
         content={
@@ -77,6 +113,7 @@ def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
             "message": exc.message,
             "details": exc.details,
         },
+        headers=headers,
     )
 
 def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
@@ -87,6 +124,7 @@ def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse
             "error": True,
             "message": exc.detail,
         },
+        headers=getattr(exc, "headers", None),
     )
 
 def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
@@ -1,14 +1,28 @@
+import asyncio
+import hashlib
 import os
 import re
 import shutil
+import stat
+import tarfile
 import tempfile
+import time
+import zipfile
 from pathlib import Path
-from typing import List, Optional
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
 
 from fastapi import UploadFile
 
 from app.core.config import settings
 from app.core.errors import FileException
+from app.utils.content_scanner import PatternSet, ScanMatch
+from app.utils.file_utils import (
+    forget_file_hash,
+    forget_file_name,
+    normalize_upload_name,
+    remember_file_hash,
+    remember_file_name,
+)
 
 # Allowed file extensions for security
 ALLOWED_EXTENSIONS = {
@@ -18,40 +32,68 @@ ALLOWED_EXTENSIONS = {
     '.txt', '.md',  # Text files
 }
 
+# Archive uploads extracted into the request workspace
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+# Longest gap a dangerous pattern spans; uploads are scanned in chunks, so
+# every pattern must match at most PATTERN_MAX_MATCH_LENGTH bytes
+PATTERN_MAX_GAP = 1024
+PATTERN_MAX_MATCH_LENGTH = 4096
+
 # Potentially dangerous patterns in files
 DANGEROUS_PATTERNS = [
-    r'`.*`',  # Command injection attempt
-    r'system\s*\(',  # System calls
-    r'exec\s*\(',  # Execution calls
-    r'eval\s*\(',  # Eval calls
+    rf'`[^`\n]{{0,{PATTERN_MAX_GAP}}}`',  # Command injection attempt (backtick pair on one line)
+    rf'system\s{{0,{PATTERN_MAX_GAP}}}\(',  # System calls
+    rf'exec\s{{0,{PATTERN_MAX_GAP}}}\(',  # Execution calls
+    rf'eval\s{{0,{PATTERN_MAX_GAP}}}\(',  # Eval calls
 ]
 
+# All dangerous patterns compiled into one alternation
+DANGEROUS_PATTERN_SET = PatternSet(DANGEROUS_PATTERNS, max_match_length=PATTERN_MAX_MATCH_LENGTH)
+
 def is_file_allowed(filename: str) -> bool:
     """Check if a file is allowed based on its extension"""
     ext = Path(filename).suffix.lower()
     return ext in ALLOWED_EXTENSIONS
 
+def is_archive(filename: Optional[str]) -> bool:
+    """Check if an uploaded file is an archive to extract"""
+    return (filename or "").lower().endswith(ARCHIVE_EXTENSIONS)
+
 def is_file_safe(file_content: bytes) -> bool:
     """
     Check if file content appears safe
     This is a basic check and should be enhanced in production
     """
-    try:
-        content = file_content.decode('utf-8')
-        for pattern in DANGEROUS_PATTERNS:
-            if re.search(pattern, content):
-                return False
-        return True
-    except UnicodeDecodeError:
-        # If it's not a text file, we don't check content
-        return True
+    return scan_content(file_content) is None
 
-async def save_upload_file(upload_file: UploadFile) -> str:
+def scan_content(file_content: bytes) -> Optional[ScanMatch]:
+    """
+    Scan file content for dangerous patterns
+    
+    Returns:
+        The first dangerous match, or None if the content appears safe
+    """
+    scanner = DANGEROUS_PATTERN_SET.scanner()
+    scanner.feed(file_content)
+    return scanner.finish()
+
+async def save_upload_file(upload_file: UploadFile, directory: Optional[str] = None) -> str:
     """
     Save an uploaded file safely and return the path
+    
+    The upload is streamed to disk in chunks of UPLOAD_CHUNK_SIZE bytes, so memory
+    use per upload is bounded by the chunk size. The size limit is enforced as bytes
+    arrive and the content hash is computed on the fly and remembered for hash_file.
+    
+    Args:
+        upload_file: Uploaded file
+        directory: Directory to save the file in (optional, uses UPLOAD_DIR if not provided)
     """
+    target_dir = directory or settings.UPLOAD_DIR
+    
     # Ensure upload directory exists
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    os.makedirs(target_dir, exist_ok=True)
     
     # Check file extension
     if not is_file_allowed(upload_file.filename):
@@ -61,37 +103,65 @@ async def save_upload_file(upload_file: UploadFile) -> str:
             details={"filename": upload_file.filename}
         )
     
-    # Generate a safe temporary filename
-    temp_file = tempfile.NamedTemporaryFile(delete=False, dir=settings.UPLOAD_DIR)
+    # Generate a safe temporary filename, keeping the extension so tools can detect the language
+    temp_file = tempfile.NamedTemporaryFile(
+        delete=False,
+        dir=target_dir,
+        suffix=Path(upload_file.filename).suffix.lower()
+    )
     
     try:
-        # Read and check file content
-        file_content = await upload_file.read()
+        digest = hashlib.sha256()
+        scanner = DANGEROUS_PATTERN_SET.scanner()
+        size = 0
         
-        # Check file size
-        if len(file_content) > settings.MAX_UPLOAD_SIZE:
-            os.unlink(temp_file.name)
-            raise FileException(
-                message="File size exceeds the maximum allowed size",
-                status_code=400,
-                details={"max_size_mb": settings.MAX_UPLOAD_SIZE / (1024 * 1024)}
-            )
+        while True:
+            chunk = await upload_file.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            
+            # Check file size
+            size += len(chunk)
+            if size > settings.MAX_UPLOAD_SIZE:
+                raise FileException(
+                    message="File size exceeds the maximum allowed size",
+                    status_code=400,
+                    details={"max_size_mb": settings.MAX_UPLOAD_SIZE / (1024 * 1024)}
+                )
+            
+            digest.update(chunk)
+            scanner.feed(chunk)
+            
+            # Write file content
+            temp_file.write(chunk)
+        
+        temp_file.close()
         
         # Basic content safety check
-        if not is_file_safe(file_content):
-            os.unlink(temp_file.name)
+        match = scanner.finish()
+        if match is not None:
             raise FileException(
                 message="File content appears unsafe",
-                status_code=400
+                status_code=400,
+                details={"filename": upload_file.filename, **match.to_dict()}
             )
         
-        # Write file content
-        temp_file.write(file_content)
-        temp_file.close()
+        remember_file_hash(temp_file.name, digest.hexdigest())
+        
+        # Findings are fingerprinted on the client's file name, not the random one on disk
+        upload_name = normalize_upload_name(upload_file.filename)
+        if upload_name:
+            remember_file_name(temp_file.name, upload_name)
         
         return temp_file.name
+    except FileException:
+        temp_file.close()
+        if os.path.exists(temp_file.name):
+            os.unlink(temp_file.name)
+        raise
     except Exception as e:
         # Clean up on error
+        temp_file.close()
         if os.path.exists(temp_file.name):
             os.unlink(temp_file.name)
         raise FileException(
@@ -99,7 +169,7 @@ async def save_upload_file(upload_file: UploadFile) -> str:
             status_code=500
         )
 
-async def save_upload_files(files: List[UploadFile]) -> List[str]:
+async def save_upload_files(files: List[UploadFile], directory: Optional[str] = None) -> List[str]:
     """
     Save multiple uploaded files and return their paths
     """
@@ -107,22 +177,219 @@ async def save_upload_files(files: List[UploadFile]) -> List[str]:
     
     for file in files:
         try:
-            path = await save_upload_file(file)
+            path = await save_upload_file(file, directory)
             saved_paths.append(path)
         except Exception as e:
             # Clean up any files that were already saved
-            for saved_path in saved_paths:
-                if os.path.exists(saved_path):
-                    os.unlink(saved_path)
+            cleanup_files(saved_paths)
             raise e
     
     return saved_paths
 
+async def save_upload_archive(upload_file: UploadFile, directory: str) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Extract an uploaded .zip, .tar or .tar.gz archive into a directory
+    
+    Entries keep their relative paths, so include directives and path-based
+    rules see the original layout. Tar archives are read as a stream and zip
+    entries one at a time; each file is copied in chunks of UPLOAD_CHUNK_SIZE
+    with its hash and content scan computed on the way. Only regular files
+    with an allowed extension are written: directories are created as
+    needed, while links, devices and other files are skipped. Absolute paths
+    and ".." segments are rejected, as are archives larger than
+    ARCHIVE_MAX_UPLOAD_SIZE and archives with more than ARCHIVE_MAX_FILES
+    entries or more than ARCHIVE_MAX_BYTES of content.
+    
+    Args:
+        upload_file: Uploaded archive
+        directory: Workspace to extract into
+    
+    Returns:
+        Tuple of (paths of the extracted files, extraction report)
+    
+    Raises:
+        FileException: If the archive is invalid, unsafe or over a limit
+    """
+    return await asyncio.to_thread(_extract_archive, upload_file.file, upload_file.filename, directory)
+
+def _extract_archive(archive_file: IO[bytes], filename: str, directory: str) -> Tuple[List[str], Dict[str, Any]]:
+    """Extract an archive synchronously; see save_upload_archive"""
+    started = time.perf_counter()
+    extracted: List[str] = []
+    report = {
+        "archives": 1,
+        "files_extracted": 0,
+        "files_skipped": 0,
+        "bytes_extracted": 0,
+        "extract_seconds": 0.0
+    }
+    
+    try:
+        # The archive itself is capped before anything is extracted
+        archive_size = archive_file.seek(0, os.SEEK_END)
+        if archive_size > settings.ARCHIVE_MAX_UPLOAD_SIZE:
+            raise FileException(
+                message="Archive size exceeds the maximum allowed size",
+                status_code=400,
+                details={"filename": filename, "max_size_mb": settings.ARCHIVE_MAX_UPLOAD_SIZE / (1024 * 1024)}
+            )
+        
+        archive_file.seek(0)
+        entries = 0
+        
+        for name, is_file, reader in _iter_archive(archive_file, filename):
+            entries += 1
+            if entries > settings.ARCHIVE_MAX_FILES:
+                raise FileException(
+                    message="Archive has too many entries",
+                    status_code=400,
+                    details={"filename": filename, "max_files": settings.ARCHIVE_MAX_FILES}
+                )
+            
+            relative_path = _archive_member_path(filename, name)
+            if not is_file or not is_file_allowed(relative_path):
+                report["files_skipped"] += 1
+                continue
+            
+            path = os.path.join(directory, *relative_path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            
+            size = _copy_archive_member(reader(), path, filename, relative_path, report)
+            extracted.append(path)
+            remember_file_name(path, relative_path)
+            report["files_extracted"] += 1
+            report["bytes_extracted"] += size
+        
+        report["extract_seconds"] = round(time.perf_counter() - started, 4)
+        return extracted, report
+    
+    except FileException:
+        cleanup_files(extracted)
+        raise
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError, RuntimeError) as e:
+        cleanup_files(extracted)
+        raise FileException(
+            message=f"Invalid archive: {str(e)}",
+            status_code=400,
+            details={"filename": filename}
+        )
+
+def _iter_archive(archive_file: IO[bytes], filename: str) -> Iterator[Tuple[str, bool, Any]]:
+    """
+    Iterate over the entries of an archive
+    
+    Yields:
+        Tuples of (entry name, whether it is a regular file, function opening its content)
+    """
+    if filename.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_file) as archive:
+            for info in archive.infolist():
+                # Zip files made on Unix keep the file mode in the high bits of external_attr
+                mode = info.external_attr >> 16
+                is_file = not info.is_dir() and stat.S_IFMT(mode) in (0, stat.S_IFREG)
+                yield info.filename, is_file, lambda info=info: archive.open(info)
+    else:
+        # Stream mode reads the upload front to back, whatever the compression
+        with tarfile.open(fileobj=archive_file, mode="r|*") as archive:
+            for member in archive:
+                yield member.name, member.isfile(), lambda member=member: archive.extractfile(member)
+
+def _archive_member_path(filename: str, name: str) -> str:
+    """
+    Get the relative path of an archive entry
+    
+    Raises:
+        FileException: If the entry is absolute or leaves the workspace
+    """
+    name = name.replace("\\", "/")
+    segments = [segment for segment in name.split("/") if segment not in ("", ".")]
+    
+    if name.startswith("/") or re.match(r'^[A-Za-z]:', name) or ".." in segments:
+        raise FileException(
+            message="Archive entry points outside the upload",
+            status_code=400,
+            details={"filename": filename, "entry": name}
+        )
+    
+    return "/".join(segments)
+
+def _copy_archive_member(
+    source: IO[bytes],
+    path: str,
+    filename: str,
+    relative_path: str,
+    report: Dict[str, Any]
+) -> int:
+    """
+    Copy one archive entry to disk, enforcing the size limits and scanning its content
+    
+    The partly written file is removed if the entry is rejected or cannot be read
+    """
+    digest = hashlib.sha256()
+    scanner = DANGEROUS_PATTERN_SET.scanner()
+    size = 0
+    created = False
+    
+    try:
+        # Exclusive creation rejects entries that appear twice
+        with source, open(path, 'xb') as target:
+            created = True
+            while True:
+                chunk = source.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise FileException(
+                        message="Archive entry exceeds the maximum allowed size",
+                        status_code=400,
+                        details={"filename": filename, "entry": relative_path, "max_size_mb": settings.MAX_UPLOAD_SIZE / (1024 * 1024)}
+                    )
+                if report["bytes_extracted"] + size > settings.ARCHIVE_MAX_BYTES:
+                    raise FileException(
+                        message="Archive content exceeds the maximum allowed size",
+                        status_code=400,
+                        details={"filename": filename, "max_bytes": settings.ARCHIVE_MAX_BYTES}
+                    )
+                
+                digest.update(chunk)
+                scanner.feed(chunk)
+                target.write(chunk)
+        
+        match = scanner.finish()
+        if match is not None:
+            raise FileException(
+                message="File content appears unsafe",
+                status_code=400,
+                details={"filename": filename, "entry": relative_path, **match.to_dict()}
+            )
+    
+    except FileExistsError:
+        raise FileException(
+            message="Archive contains the same file more than once",
+            status_code=400,
+            details={"filename": filename, "entry": relative_path}
+        )
+    
+    except BaseException:
+        if created:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        raise
+    
+    remember_file_hash(path, digest.hexdigest())
+    return size
+
 def cleanup_files(file_paths: List[str]) -> None:
     """
     Clean up temporary files
     """
     for path in file_paths:
+        forget_file_hash(path)
+        forget_file_name(path)
         try:
             if os.path.exists(path):
                 os.unlink(path)
@@ -0,0 +1,277 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+
+from app.core.config import settings
+from app.core.errors import BaselineException
+from app.utils.file_utils import ensure_directory_exists
+from app.utils.result_formatter import FINGERPRINTED_ITEMS
+
+logger = logging.getLogger(__name__)
+
+# Bump when the baseline file layout changes so old files are rejected
+BASELINE_FORMAT = 1
+
+# Baseline ids become file names, so they are restricted to a safe alphabet
+BASELINE_ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$')
+
+# Key of the item list and the stats counting items and files, by tool
+TOOL_ITEMS = {
+    tool: (items_key, f"total_{items_key}", f"files_with_{items_key}")
+    for items_key, (tool, _) in FINGERPRINTED_ITEMS.items()
+}
+
+class BaselineStore:
+    """
+    Named sets of finding fingerprints
+    
+    A baseline records the ids (fingerprints) of the findings each tool
+    reported for a known state of the code, e.g. the main branch. Analyses
+    run against a baseline only return findings whose id is not in it,
+    together with the number of suppressed findings and of baseline findings
+    that no longer occur. Each baseline is a JSON file under the cache
+    directory; baselines in use are held in memory as frozensets, so
+    filtering costs one lookup per finding.
+    """
+    
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._baselines: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "applied": 0,
+            "suppressed": 0,
+        }
+    
+    def save(
+        self,
+        baseline_id: str,
+        fingerprints: Dict[str, List[str]],
+        description: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Create or replace a baseline
+        
+        Args:
+            baseline_id: Name of the baseline
+            fingerprints: Finding ids to suppress, by tool
+            description: Free-form description (optional)
+        
+        Returns:
+            Baseline metadata
+        
+        Raises:
+            BaselineException: If the id or a tool name is invalid
+        """
+        self._validate_id(baseline_id)
+        
+        unknown = sorted(set(fingerprints) - set(TOOL_ITEMS))
+        if unknown:
+            raise BaselineException(
+                message="Unknown tools in baseline",
+                status_code=400,
+                details={"tools": unknown, "valid_tools": sorted(TOOL_ITEMS)}
+            )
+        
+        with self._lock:
+            existing = self._load(baseline_id)
+            now = time.time()
+            
+            meta = {
+                "id": baseline_id,
+                "description": description,
+                "created_at": existing["meta"]["created_at"] if existing else now,
+                "updated_at": now,
+                "counts": {tool: len(set(ids)) for tool, ids in fingerprints.items()}
+            }
+            sets = {tool: frozenset(ids) for tool, ids in fingerprints.items()}
+            
+            self._write(baseline_id, meta, sets)
+            self._baselines[baseline_id] = {"meta": meta, "fingerprints": sets}
+        
+        logger.info(f"Saved baseline {baseline_id} with {sum(meta['counts'].values())} fingerprints")
+        return meta
+    
+    def get(self, baseline_id: str) -> Dict[str, Any]:
+        """
+        Get a baseline
+        
+        Returns:
+            Dictionary with "meta" and "fingerprints" (frozensets by tool)
+        
+        Raises:
+            BaselineException: If the baseline does not exist
+        """
+        self._validate_id(baseline_id)
+        
+        with self._lock:
+            baseline = self._load(baseline_id)
+        
+        if baseline is None:
+            raise BaselineException(
+                message="Baseline not found",
+                status_code=404,
+                details={"baseline_id": baseline_id}
+            )
+        return baseline
+    
+    def list_baselines(self) -> List[Dict[str, Any]]:
+        """List the metadata of every stored baseline, sorted by id"""
+        if not os.path.isdir(self.base_dir):
+            return []
+        
+        baselines = []
+        for name in sorted(os.listdir(self.base_dir)):
+            baseline_id, ext = os.path.splitext(name)
+            if ext != ".json" or not BASELINE_ID_PATTERN.match(baseline_id):
+                continue
+            
+            with self._lock:
+                baseline = self._load(baseline_id)
+            if baseline is not None:
+                baselines.append(baseline["meta"])
+        
+        return baselines
+    
+    def delete(self, baseline_id: str) -> None:
+        """
+        Delete a baseline
+        
+        Raises:
+            BaselineException: If the baseline does not exist
+        """
+        self.get(baseline_id)
+        
+        with self._lock:
+            self._baselines.pop(baseline_id, None)
+            try:
+                os.unlink(self._path(baseline_id))
+            except FileNotFoundError:
+                pass
+        
+        logger.info(f"Deleted baseline {baseline_id}")
+    
+    def apply(self, baseline_id: str, tool: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Remove the findings recorded in a baseline from formatted results
+        
+        The stats are recomputed over the remaining findings and gain a
+        "baseline" entry with the number of new and suppressed findings and
+        of baseline findings that were not reported ("fixed"). Only files
+        that were analyzed can be checked, so analyzing part of the code
+        counts the baseline findings of the other files as fixed.
+        
+        Args:
+            baseline_id: Name of the baseline
+            tool: Tool that produced the results
+            results: Formatted results (not modified)
+        
+        Returns:
+            New results containing only the findings missing from the baseline
+        
+        Raises:
+            BaselineException: If the baseline does not exist
+        """
+        baseline = self.get(baseline_id)
+        items_key, total_key, files_key = TOOL_ITEMS[tool]
+        known = baseline["fingerprints"].get(tool, frozenset())
+        
+        items = results.get(items_key, [])
+        new_items = [item for item in items if item["id"] not in known]
+        suppressed = len(items) - len(new_items)
+        fixed = len(known.difference(item["id"] for item in items))
+        
+        stats = dict(results.get("stats", {}))
+        stats[total_key] = len(new_items)
+        stats[files_key] = len({item.get("file") for item in new_items})
+        
+        by_severity = {severity: 0 for severity in stats.get("by_severity", {})}
+        for item in new_items:
+            by_severity[item["severity"]] = by_severity.get(item["severity"], 0) + 1
+        stats["by_severity"] = by_severity
+        
+        stats["baseline"] = {
+            "id": baseline_id,
+            "new": len(new_items),
+            "suppressed": suppressed,
+            "fixed": fixed
+        }
+        
+        self._counters["applied"] += 1
+        self._counters["suppressed"] += suppressed
+        
+        return {**results, items_key: new_items, "stats": stats}
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of baselines held in memory and counters"""
+        return {
+            "loaded": len(self._baselines),
+            **self._counters,
+        }
+    
+    @staticmethod
+    def _validate_id(baseline_id: str) -> None:
+        """Reject ids that are not safe file names"""
+        if not BASELINE_ID_PATTERN.match(baseline_id or ""):
+            raise BaselineException(
+                message="Invalid baseline id",
+                status_code=400,
+                details={
+                    "baseline_id": baseline_id,
+                    "pattern": BASELINE_ID_PATTERN.pattern
+                }
+            )
+    
+    def _path(self, baseline_id: str) -> str:
+        """Get the file of a baseline"""
+        return os.path.join(self.base_dir, f"{baseline_id}.json")
+    
+    def _load(self, baseline_id: str) -> Optional[Dict[str, Any]]:
+        """Get a baseline from memory or its file; the caller holds the lock"""
+        baseline = self._baselines.get(baseline_id)
+        if baseline is not None:
+            return baseline
+        
+        path = self._path(baseline_id)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable baseline {path}: {str(e)}")
+            return None
+        
+        if data.get("format") != BASELINE_FORMAT:
+            logger.warning(f"Ignoring baseline {path} with unsupported format {data.get('format')}")
+            return None
+        
+        baseline = {
+            "meta": data["meta"],
+            "fingerprints": {tool: frozenset(ids) for tool, ids in data["fingerprints"].items()}
+        }
+        self._baselines[baseline_id] = baseline
+        return baseline
+    
+    def _write(self, baseline_id: str, meta: Dict[str, Any], fingerprints: Dict[str, frozenset]) -> None:
+        """Write a baseline file atomically"""
+        ensure_directory_exists(self.base_dir)
+        path = self._path(baseline_id)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "format": BASELINE_FORMAT,
+                "meta": meta,
+                "fingerprints": {tool: sorted(ids) for tool, ids in fingerprints.items()}
+            }, f)
+        
+        os.replace(temp_path, path)
+
+# Create baseline store instance
+baseline_store = BaselineStore(os.path.join(settings.CACHE_DIR, "baselines"))
\ No newline at end of file
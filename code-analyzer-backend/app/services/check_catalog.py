@@ -0,0 +1,374 @@
+import os
+import re
+import glob
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+
+from app.core.config import settings
+from app.utils.file_utils import ensure_directory_exists
+from app.utils.search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout changes so stale snapshots are ignored
+SNAPSHOT_FORMAT = 1
+
+# Descriptions for checks without documentation, by category
+CATEGORY_DESCRIPTIONS = {
+    "abseil": "Checks related to the Abseil library",
+    "altera": "Checks related to OpenCL programming for FPGAs",
+    "android": "Checks related to Android",
+    "boost": "Checks related to the Boost library",
+    "bugprone": "Checks that target bug-prone code constructs",
+    "cert": "Checks related to CERT Secure Coding Guidelines",
+    "clang-analyzer": "Clang Static Analyzer checks",
+    "concurrency": "Checks related to concurrent programming",
+    "cppcoreguidelines": "Checks related to C++ Core Guidelines",
+    "darwin": "Checks related to Darwin coding conventions",
+    "fuchsia": "Checks related to Fuchsia coding conventions",
+    "google": "Checks related to Google coding conventions",
+    "hicpp": "Checks related to High Integrity C++ Coding Standard",
+    "linuxkernel": "Checks related to the Linux kernel coding conventions",
+    "llvm": "Checks related to the LLVM coding conventions",
+    "llvmlibc": "Checks related to the LLVM-libc coding standards",
+    "misc": "Checks that we didn't have a better category for",
+    "modernize": "Checks that modernize code to C++11/14/17",
+    "mpi": "Checks related to MPI (Message Passing Interface)",
+    "objc": "Checks related to Objective-C coding conventions",
+    "openmp": "Checks related to OpenMP API",
+    "performance": "Checks that target performance-related issues",
+    "portability": "Checks that target portability-related issues",
+    "readability": "Checks that target readability-related issues",
+    "security": "Checks that target security-related issues",
+    "zircon": "Checks related to Zircon kernel coding conventions",
+}
+
+# Documentation directories probed when CLANGTIDY_DOCS_PATH is not set, after
+# the ones under the clang-tidy binary's install prefix (see find_docs_path)
+PREFIX_DOCS_DIRS = [
+    os.path.join("share", "doc", "clang-tidy", "checks"),
+    os.path.join("share", "doc", "clang-tools", "clang-tidy", "checks"),
+]
+SYSTEM_DOCS_PATTERNS = [
+    "/usr/local/share/doc/clang-tidy*/checks",
+    "/usr/share/doc/clang-tidy*/checks",
+    "/usr/share/doc/clang-tools*/clang-tidy/checks",
+]
+
+# Inline reStructuredText markup reduced to its text
+RST_ROLE_PATTERN = re.compile(r':[\w:-]+:`([^`<]*?)(?:\s*<[^>]*>)?`')
+RST_LITERAL_PATTERN = re.compile(r'``([^`]*)``')
+RST_LINK_PATTERN = re.compile(r'`([^`<]*?)\s*<[^>]*>`_+')
+RST_EMPHASIS_PATTERN = re.compile(r'\*{1,2}([^*]+)\*{1,2}|`([^`]+)`')
+
+class ClangTidyCheckCatalog:
+    """
+    Catalog of the checks of one clang-tidy version
+    
+    The catalog is built once per clang-tidy version from the check names
+    reported by the tool. Descriptions come from the first paragraph of each
+    check's documentation (the .rst files shipped with clang-tidy, found
+    under CLANGTIDY_DOCS_PATH or a standard install location), falling back
+    to a category description. The
+    catalog is persisted to a JSON snapshot so a restart with the same
+    version needs neither a subprocess nor the documentation. Lookups by id,
+    category and name prefix are served from in-memory indexes.
+    """
+    
+    def __init__(self, snapshot_dir: str, docs_path: Optional[str] = None):
+        self.snapshot_dir = snapshot_dir
+        self.docs_path = docs_path or ""
+        self.version: Optional[str] = None
+        self._checks: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_prefix: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_category: Dict[str, List[Dict[str, Any]]] = {}
+        self._search_index: Optional[SearchIndex] = None
+        self._lock = threading.Lock()
+    
+    def locate_docs(self, binary: Optional[str] = None) -> str:
+        """
+        Find the documentation directory if none was configured
+        
+        Args:
+            binary: clang-tidy command or path, whose install prefix is searched first
+        
+        Returns:
+            Documentation directory, or an empty string if none was found
+        """
+        if not self.docs_path:
+            self.docs_path = find_docs_path(binary)
+            if self.docs_path:
+                logger.info(f"Using ClangTidy documentation from {self.docs_path}")
+        
+        return self.docs_path
+    
+    def load_snapshot(self, version: str) -> bool:
+        """
+        Load the catalog of a version from its on-disk snapshot
+        
+        Args:
+            version: clang-tidy version
+        
+        Returns:
+            True if a snapshot for this version was loaded
+        """
+        snapshot_path = self._snapshot_path(version)
+        if not os.path.exists(snapshot_path):
+            return False
+        
+        try:
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            
+            if snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("version") != version:
+                logger.info(f"Ignoring incompatible ClangTidy check snapshot {snapshot_path}")
+                return False
+            
+            with self._lock:
+                self._set_checks(version, snapshot.get("checks", []))
+            
+            logger.debug(f"Loaded {len(self._checks)} ClangTidy checks from snapshot {snapshot_path}")
+            return True
+        
+        except Exception as e:
+            logger.warning(f"Error loading ClangTidy check snapshot {snapshot_path}: {str(e)}")
+            return False
+    
+    def build(self, version: str, check_names: List[str]) -> None:
+        """
+        Build the catalog of a version from its check names and persist it
+        
+        Args:
+            version: clang-tidy version
+            check_names: Names reported by clang-tidy --list-checks
+        """
+        checks = []
+        documented = 0
+        
+        for check_name in sorted(set(check_names)):
+            category = self.get_category(check_name)
+            description = self._read_description(check_name, category)
+            
+            if description:
+                documented += 1
+            else:
+                description = CATEGORY_DESCRIPTIONS.get(category, "ClangTidy check")
+            
+            checks.append({
+                "id": check_name,
+                "name": check_name,
+                "category": category,
+                "description": description
+            })
+        
+        with self._lock:
+            self._set_checks(version, checks)
+        
+        logger.info(f"Built ClangTidy check catalog for version {version}: {len(checks)} checks, {documented} documented")
+        self._save_snapshot()
+    
+    def list_checks(self, category: Optional[str] = None, prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List checks, optionally restricted to a category or name prefix
+        
+        A prefix matches whole dash-separated segments, e.g. "bugprone" or
+        "bugprone-use", and may end in "*" like a -checks pattern.
+        
+        Args:
+            category: Only include checks of this category
+            prefix: Only include checks whose name starts with these segments
+        
+        Returns:
+            List of check metadata, sorted by name
+        """
+        if prefix:
+            candidates = self._by_prefix.get(prefix.rstrip("*").rstrip("-"), [])
+        elif category:
+            candidates = self._by_category.get(category, [])
+        else:
+            return list(self._checks)
+        
+        if prefix and category:
+            candidates = [check for check in candidates if check["category"] == category]
+        
+        return list(candidates)
+    
+    def get_check(self, check_id: str) -> Optional[Dict[str, Any]]:
+        """Get the metadata of a check by id"""
+        return self._by_id.get(check_id)
+    
+    def get_search_index(self) -> SearchIndex:
+        """Get the full-text index of the checks, building it on first use after a change"""
+        index = self._search_index
+        if index is None or index.version != self.version:
+            index = SearchIndex(
+                self._checks,
+                text_fields=["id", "category", "description"],
+                facet_fields={"category": lambda value: value},
+                version=self.version
+            )
+            self._search_index = index
+        return index
+    
+    def categories(self) -> Dict[str, int]:
+        """Get the number of checks in each category"""
+        return {category: len(checks) for category, checks in self._by_category.items()}
+    
+    @staticmethod
+    def get_category(check_name: str) -> str:
+        """Get the category of a check (the part before the first '-', or clang-analyzer)"""
+        if check_name.startswith("clang-analyzer-"):
+            return "clang-analyzer"
+        return check_name.split('-', 1)[0]
+    
+    def _set_checks(self, version: str, checks: List[Dict[str, Any]]) -> None:
+        """Replace the checks and rebuild the lookup indexes"""
+        by_id = {}
+        by_prefix: Dict[str, List[Dict[str, Any]]] = {}
+        by_category: Dict[str, List[Dict[str, Any]]] = {}
+        
+        for check in checks:
+            by_id[check["id"]] = check
+            by_category.setdefault(check["category"], []).append(check)
+            
+            # Index every dash-separated prefix, including the full name
+            segments = check["id"].split('-')
+            for end in range(1, len(segments) + 1):
+                by_prefix.setdefault('-'.join(segments[:end]), []).append(check)
+        
+        self._checks = checks
+        self._by_id = by_id
+        self._by_prefix = by_prefix
+        self._by_category = by_category
+        self.version = version
+    
+    def _read_description(self, check_name: str, category: str) -> Optional[str]:
+        """
+        Read the first paragraph of a check's documentation, if it is available
+        
+        Both documentation layouts are supported: checks/<category>/<name>.rst
+        (LLVM 15 and later) and checks/<check>.rst (earlier releases).
+        """
+        if not self.docs_path:
+            return None
+        
+        name = check_name[len(category) + 1:]
+        candidates = [
+            os.path.join(self.docs_path, category, f"{name}.rst"),
+            os.path.join(self.docs_path, f"{check_name}.rst"),
+            os.path.join(self.docs_path, "checks", category, f"{name}.rst"),
+            os.path.join(self.docs_path, "checks", f"{check_name}.rst"),
+        ]
+        
+        for doc_path in candidates:
+            if os.path.exists(doc_path):
+                try:
+                    with open(doc_path, 'r', encoding='utf-8', errors='replace') as f:
+                        return self._first_paragraph(f.read())
+                except OSError as e:
+                    logger.debug(f"Could not read ClangTidy documentation {doc_path}: {str(e)}")
+                    return None
+        
+        return None
+    
+    @staticmethod
+    def _first_paragraph(content: str) -> Optional[str]:
+        """Extract the first prose paragraph after the title of an .rst document"""
+        paragraph: List[str] = []
+        after_title = False
+        
+        for line in content.splitlines():
+            stripped = line.strip()
+            
+            if not after_title:
+                # The title is underlined with a row of = characters
+                if stripped and set(stripped) == {"="}:
+                    after_title = True
+                continue
+            
+            if not stripped:
+                if paragraph:
+                    break
+                continue
+            
+            # Skip directives (e.g. "..meta::", "..note::") and their indented bodies
+            if stripped.startswith("..") or (line[:1].isspace() and not paragraph):
+                continue
+            
+            paragraph.append(stripped)
+        
+        if not paragraph:
+            return None
+        
+        text = " ".join(paragraph)
+        text = RST_ROLE_PATTERN.sub(r'\1', text)
+        text = RST_LINK_PATTERN.sub(r'\1', text)
+        text = RST_LITERAL_PATTERN.sub(r'\1', text)
+        text = RST_EMPHASIS_PATTERN.sub(lambda match: match.group(1) or match.group(2), text)
+        
+        return text
+    
+    def _snapshot_path(self, version: str) -> str:
+        """Get the snapshot file of a version and documentation directory"""
+        name = hashlib.sha256(f"{version}\0{self.docs_path}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.snapshot_dir, f"{name}.json")
+    
+    def _save_snapshot(self) -> None:
+        """Persist the checks to the on-disk snapshot"""
+        snapshot_path = self._snapshot_path(self.version)
+        
+        try:
+            ensure_directory_exists(self.snapshot_dir)
+            temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+            
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "format": SNAPSHOT_FORMAT,
+                    "version": self.version,
+                    "checks": self._checks
+                }, f)
+            
+            os.replace(temp_path, snapshot_path)
+        
+        except Exception as e:
+            logger.warning(f"Error saving ClangTidy check snapshot {snapshot_path}: {str(e)}")
+
+def find_docs_path(binary: Optional[str] = None) -> str:
+    """
+    Find an installed clang-tidy "checks" documentation directory
+    
+    Directories under the install prefix of the binary come first, then the
+    system locations, newest versioned directory first.
+    
+    Args:
+        binary: clang-tidy command or path (optional)
+    
+    Returns:
+        Documentation directory, or an empty string if none exists
+    """
+    candidates = []
+    
+    resolved = shutil.which(binary) if binary else None
+    if resolved:
+        prefix = os.path.dirname(os.path.dirname(os.path.realpath(resolved)))
+        candidates.extend(os.path.join(prefix, docs_dir) for docs_dir in PREFIX_DOCS_DIRS)
+    
+    for pattern in SYSTEM_DOCS_PATTERNS:
+        candidates.extend(sorted(glob.glob(pattern), reverse=True))
+    
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            return candidate
+    
+    return ""
+
+# Create check catalog instance
+check_catalog = ClangTidyCheckCatalog(
+    os.path.join(settings.CACHE_DIR, "clangtidy-checks"),
+    settings.CLANGTIDY_DOCS_PATH
+)
\ No newline at end of file
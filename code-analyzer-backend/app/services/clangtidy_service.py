@@ -1,25 +1,87 @@
+import asyncio
 import os
-import json
 import logging
-import tempfile
 import re
-from typing import Dict, List, Any, Optional, Set
+import math
+from typing import AsyncIterator, Dict, List, Any, Optional, Set, Tuple
 
 from app.core.config import settings
-from app.core.errors import ClangTidyException
+from app.core.errors import ClangTidyException, AdmissionRejected
+from app.services.check_catalog import ClangTidyCheckCatalog, check_catalog
+from app.services.compilation_database import compilation_databases
+from app.services.result_cache import ResultCache, result_cache
+from app.services.tool_registry import tool_registry
+from app.utils.admission import admission_controller
 from app.utils.command_executor import run_command_async
-from app.utils.result_formatter import format_clangtidy_results
+from app.utils.resource_limits import ResourceProfile, summarize_usage
+from app.utils.file_utils import get_content_keys
+from app.utils.result_formatter import format_clangtidy_results, relocate_results
+from app.utils.singleflight import analysis_flights
 
 logger = logging.getLogger(__name__)
 
+# Extensions of the files ClangTidy analyzes
+CPP_EXTENSIONS = ['.c', '.cpp', '.cc', '.cxx', '.h', '.hpp', '.hxx']
+
+# Serializes building the check catalog when the clang-tidy version changes
+_catalog_lock = asyncio.Lock()
+
 class ClangTidyService:
     """Service for ClangTidy operations"""
     
     @staticmethod
-    async def list_checks() -> List[Dict[str, Any]]:
+    async def get_catalog() -> ClangTidyCheckCatalog:
+        """
+        Get the check catalog of the installed clang-tidy version
+        
+        The catalog is built on first use of a version, or loaded from its
+        snapshot; after that no process is spawned. Without CLANGTIDY_DOCS_PATH
+        the documentation is looked up in the standard install locations.
+        
+        Returns:
+            Check catalog
+        
+        Raises:
+            ClangTidyException: If the checks cannot be listed
+        """
+        version = await tool_registry.get_version("clangtidy") or "unknown"
+        if check_catalog.version == version:
+            return check_catalog
+        
+        async with _catalog_lock:
+            if check_catalog.version == version:
+                return check_catalog
+            
+            await asyncio.to_thread(check_catalog.locate_docs, tool_registry.get_binary("clangtidy"))
+            if not await asyncio.to_thread(check_catalog.load_snapshot, version):
+                check_names = await ClangTidyService._read_check_names()
+                await asyncio.to_thread(check_catalog.build, version, check_names)
+        
+        return check_catalog
+    
+    @staticmethod
+    async def get_checks_version() -> str:
+        """
+        Get a version string that changes whenever the check catalog changes
+        
+        Returns:
+            clang-tidy version and documentation directory of the catalog
+        
+        Raises:
+            ClangTidyException: If the checks cannot be listed
+        """
+        catalog = await ClangTidyService.get_catalog()
+        return f"{catalog.version}:{catalog.docs_path}"
+    
+    @staticmethod
+    async def list_checks(category: Optional[str] = None, prefix: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         List available ClangTidy checks
         
+        Args:
+            category: Only list checks of this category (optional)
+            prefix: Only list checks whose name starts with this prefix, e.g. "bugprone-use" (optional)
+        
         Returns:
             List of check metadata
         
@@ -27,67 +89,8 @@ class ClangTidyService:
             ClangTidyException: If checks cannot be listed
         """
         try:
-            # Run clang-tidy to list checks
-            result = await run_command_async(
-                ["clang-tidy", "--list-checks", "-checks=*"],
-                timeout=30
-            )
-            
-            if result.returncode != 0:
-                logger.error(f"ClangTidy exited with error code {result.returncode} when listing checks: {result.stderr}")
-                raise ClangTidyException(
-                    message=f"Failed to list ClangTidy checks",
-                    details={"stderr": result.stderr}
-                )
-            
-            # Extract checks from output
-            # Output format is like:
-            # Enabled checks:
-            # abseil-duration-addition
-            # abseil-duration-comparison
-            # ...
-            checks = []
-            in_checks_section = False
-            
-            for line in result.stdout.splitlines():
-                line = line.strip()
-                
-                if line == "Enabled checks:":
-                    in_checks_section = True
-                    continue
-                
-                if in_checks_section and line:
-                    # Extract check name
-                    check_name = line
-                    
-                    # Create check object
-                    check = {
-                        "id": check_name,
-                        "name": check_name,
-                        "description": ClangTidyService._get_check_description(check_name)
-                    }
-                    
-                    checks.append(check)
-            
-            # Group checks by category
-            checks_by_category = {}
-            for check in checks:
-                # Extract category (part before '-')
-                parts = check["id"].split('-', 1)
-                if len(parts) > 1:
-                    category = parts[0]
-                    if category not in checks_by_category:
-                        checks_by_category[category] = []
-                    checks_by_category[category].append(check)
-            
-            # Flatten back to list but with category groupings
-            categorized_checks = []
-            for category, category_checks in checks_by_category.items():
-                for check in category_checks:
-                    check["category"] = category
-                    categorized_checks.append(check)
-            
-            return categorized_checks
+            catalog = await ClangTidyService.get_catalog()
+            return catalog.list_checks(category=category, prefix=prefix)
         
         except ClangTidyException as e:
             raise e
@@ -99,37 +102,117 @@ class ClangTidyService:
             )
     
     @staticmethod
-    def _get_check_description(check_name: str) -> str:
+    async def search_checks(
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Get a description for a ClangTidy check
-        
-        This is a helper method that provides descriptions for common checks
-        In a production environment, these descriptions would come from ClangTidy docs
+        Search ClangTidy checks by name, category and description
         
         Args:
-            check_name: Name of the check
+            query: Words that must all appear in the check (optional)
+            category: Only include checks of this category (optional)
+            limit: Maximum number of checks to return
+            cursor: Cursor from the previous page (optional)
         
         Returns:
-            Description of the check
-        """
-        # Map of common check prefixes to descriptions
-        check_descriptions = {
-            "bugprone": "Checks that target bug-prone code constructs",
-            "clang-analyzer": "Clang Static Analyzer checks",
-            "cppcoreguidelines": "Checks related to C++ Core Guidelines",
-            "modernize": "Checks that modernize code to C++11/14/17",
-            "performance": "Checks that target performance-related issues",
-            "portability": "Checks that target portability-related issues",
-            "readability": "Checks that target readability-related issues",
-            "security": "Checks that target security-related issues",
-        }
+            Page of checks with the total, next cursor and facet counts
+        
+        Raises:
+            ClangTidyException: If the cursor is invalid or checks cannot be searched
+        """
+        try:
+            catalog = await ClangTidyService.get_catalog()
+            return catalog.get_search_index().search(
+                query=query,
+                filters={"category": category},
+                limit=limit,
+                cursor=cursor
+            )
+        
+        except ClangTidyException as e:
+            raise e
+        
+        except ValueError as e:
+            raise ClangTidyException(
+                message=str(e),
+                details={"cursor": cursor},
+                status_code=400
+            )
+        
+        except Exception as e:
+            logger.error(f"Error searching ClangTidy checks: {str(e)}")
+            raise ClangTidyException(
+                message=f"Error searching ClangTidy checks: {str(e)}"
+            )
+    
+    @staticmethod
+    async def _read_check_names() -> List[str]:
+        """
+        Run clang-tidy to list the names of all checks
+        
+        Returns:
+            Check names
+        
+        Raises:
+            ClangTidyException: If clang-tidy fails
+        """
+        # Extract checks from output as it is read
+        # Output format is like:
+        # Enabled checks:
+        # abseil-duration-addition
+        # abseil-duration-comparison
+        # ...
+        check_names = []
+        in_checks_section = False
+        
+        def read_line(line: str) -> None:
+            nonlocal in_checks_section
+            line = line.strip()
+            
+            if line == "Enabled checks:":
+                in_checks_section = True
+                return
+            
+            if in_checks_section and line:
+                check_names.append(line)
+        
+        # Run clang-tidy to list checks
+        result = await run_command_async(
+            [tool_registry.get_binary("clangtidy"), "--list-checks", "-checks=*"],
+            timeout=30,
+            on_stdout_line=read_line,
+            keep_stdout=False
+        )
+        
+        if result.returncode != 0:
+            logger.error(f"ClangTidy exited with error code {result.returncode} when listing checks: {result.stderr}")
+            raise ClangTidyException(
+                message=f"Failed to list ClangTidy checks",
+                details={"stderr": result.stderr}
+            )
         
-        # Try to match the check prefix
-        for prefix, description in check_descriptions.items():
-            if check_name.startswith(prefix):
-                return description
+        return check_names
+    
+    @staticmethod
+    def get_cache_config(config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the normalized configuration identifying ClangTidy results in the result cache
+        
+        Args:
+            config: ClangTidy configuration including selected checks
         
-        return "ClangTidy check"
+        Returns:
+            Configuration that changes whenever the checks or arguments change
+        """
+        options = config.get("options") or {}
+        return {
+            "checks": sorted(set(config.get("checks", []))),
+            "command_args": (options.get("command_args") or "").split(),
+            "compiler_options": (options.get("compiler_options") or "").split()
+        }
     
     @staticmethod
     async def analyze_files(file_paths: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
@@ -146,109 +229,419 @@ class ClangTidyService:
         Raises:
             ClangTidyException: If analysis fails
         """
+        plan = await ClangTidyService._prepare_analysis(file_paths, config)
+        if "result" in plan:
+            return plan["result"]
+        
+        try:
+            # Join an identical analysis that is already running, or start one
+            (run_paths, formatted_results), shared = await analysis_flights.do(
+                plan["analysis_key"],
+                lambda: ClangTidyService._run_plan(plan)
+            )
+            
+            if shared:
+                relocate_results(formatted_results, "issues", run_paths, plan["cpp_files"])
+                formatted_results["stats"]["coalesced"] = True
+            
+            return formatted_results
+        
+        except (ClangTidyException, AdmissionRejected) as e:
+            raise e
+        
+        except Exception as e:
+            logger.error(f"Error during ClangTidy analysis: {str(e)}")
+            raise ClangTidyException(
+                message=f"Error during ClangTidy analysis: {str(e)}"
+            )
+    
+    @staticmethod
+    async def _run_plan(plan: Dict[str, Any]) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        Run the commands of an analysis plan
+        
+        Args:
+            plan: Plan from _prepare_analysis
+        
+        Returns:
+            Tuple of (file paths the results refer to, formatted results)
+        """
+        # Run ClangTidy on the batches in parallel, bounded by the worker limit
+        outputs = await ClangTidyService._run_commands(plan["commands"], plan["max_workers"], plan["resources"])
+        
+        return plan["cpp_files"], await ClangTidyService._finish_analysis(plan, outputs)
+    
+    @staticmethod
+    async def analyze_files_stream(file_paths: List[str], config: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze files using ClangTidy, yielding events as each batch of files finishes
+        
+        Events are dictionaries with an "event" name and "data" payload:
+        "start" (files to analyze), "issue" (one ClangTidyIssue record),
+        "progress" (a file finished) and finally "stats" (totals for the run).
+        Unless the request sets batch_size, batches hold CLANGTIDY_STREAM_BATCH_SIZE
+        files (one by default), so issues arrive per translation unit at the
+        cost of starting more clang-tidy processes than analyze_files does.
+        Batches run concurrently but their events are released in input
+        order, with fingerprints numbered across the whole run, so the issues
+        and their ids are the same as analyze_files returns.
+        
+        Args:
+            file_paths: List of file paths to analyze
+            config: ClangTidy configuration including selected checks
+        
+        Yields:
+            Analysis events
+        
+        Raises:
+            ClangTidyException: If analysis fails
+        """
+        plan = await ClangTidyService._prepare_analysis(file_paths, config, stream=True)
+        
+        if "result" in plan:
+            # Nothing to run (no checks, no C/C++ files or a cache hit)
+            result = plan["result"]
+            yield {"event": "start", "data": {"total_files": result["stats"].get("files_analyzed", 0)}}
+            for issue in result["issues"]:
+                yield {"event": "issue", "data": issue}
+            yield {"event": "stats", "data": result["stats"]}
+            return
+        
+        try:
+            cpp_files = plan["cpp_files"]
+            batches = plan["batches"]
+            outputs: List[Optional[str]] = [None] * len(batches)
+            released = 0
+            completed = 0
+            seen: Dict[str, int] = {}
+            
+            yield {"event": "start", "data": {"total_files": len(cpp_files)}}
+            
+            async for index, output in ClangTidyService._iter_commands(plan["commands"], plan["max_workers"], plan["resources"]):
+                outputs[index] = output
+                
+                # Release finished batches in input order, as analyze_files formats them
+                while released < len(batches) and outputs[released] is not None:
+                    batch = batches[released]
+                    batch_results = format_clangtidy_results(outputs[released], cpp_files, seen)
+                    released += 1
+                    
+                    for issue in batch_results["issues"]:
+                        yield {"event": "issue", "data": issue}
+                    
+                    # Every file of the batch finished together
+                    for cpp_file in batch:
+                        completed += 1
+                        names = {cpp_file, os.path.abspath(cpp_file)}
+                        
+                        yield {
+                            "event": "progress",
+                            "data": {
+                                "file": cpp_file,
+                                "issues": sum(1 for issue in batch_results["issues"] if issue["file"] in names),
+                                "completed": completed,
+                                "total": len(cpp_files)
+                            }
+                        }
+            
+            results = await ClangTidyService._finish_analysis(plan, outputs)
+            yield {"event": "stats", "data": results["stats"]}
+        
+        except (ClangTidyException, AdmissionRejected) as e:
+            raise e
+        
+        except Exception as e:
+            logger.error(f"Error during ClangTidy analysis: {str(e)}")
+            raise ClangTidyException(
+                message=f"Error during ClangTidy analysis: {str(e)}"
+            )
+    
+    @staticmethod
+    async def _prepare_analysis(file_paths: List[str], config: Dict[str, Any], stream: bool = False) -> Dict[str, Any]:
+        """
+        Work out what a ClangTidy analysis has to run
+        
+        Args:
+            file_paths: List of file paths to analyze
+            config: ClangTidy configuration including selected checks
+            stream: Whether results are streamed as batches finish, which favors small batches
+        
+        Returns:
+            Analysis plan. Contains "result" when no process needs to run
+            (nothing to analyze or a cache hit); otherwise the C/C++ files,
+            the batches of files with one command per batch, the worker limit,
+            the analysis and cache keys and a list collecting the resource
+            usage of each command.
+        
+        Raises:
+            ClangTidyException: If the analysis cannot be prepared
+        """
         if not file_paths:
             logger.warning("No files provided for ClangTidy analysis")
-            return {"issues": [], "stats": {"total_issues": 0, "files_analyzed": 0}}
+            return {"result": {"issues": [], "stats": {"total_issues": 0, "files_analyzed": 0}}}
         
         try:
             # Extract configuration
             checks = config.get("checks", [])
-            options = config.get("options", {})
+            options = config.get("options") or {}
             
             if not checks:
                 logger.warning("No checks selected for ClangTidy analysis")
-                return {"issues": [], "stats": {"total_issues": 0, "files_analyzed": len(file_paths)}}
+                return {"result": {"issues": [], "stats": {"total_issues": 0, "files_analyzed": len(file_paths)}}}
             
             # Filter only C/C++ files
-            cpp_extensions = ['.c', '.cpp', '.cc', '.cxx', '.h', '.hpp', '.hxx']
-            cpp_files = [f for f in file_paths if os.path.splitext(f)[1].lower() in cpp_extensions]
+            cpp_files = [f for f in file_paths if os.path.splitext(f)[1].lower() in CPP_EXTENSIONS]
             
             if not cpp_files:
                 logger.warning("No C/C++ files found for ClangTidy analysis")
-                return {"issues": [], "stats": {"total_issues": 0, "files_analyzed": len(file_paths)}}
+                return {"result": {"issues": [], "stats": {"total_issues": 0, "files_analyzed": len(file_paths)}}}
             
             # Join checks with comma
             checks_arg = ','.join(checks)
             
             # Extract additional arguments
-            command_args = options.get("command_args", "")
-            compiler_options = options.get("compiler_options", "")
-            
-            # Create a compilation database if needed
-            compile_commands_path = None
-            if not os.path.exists("compile_commands.json"):
-                fd, compile_commands_path = tempfile.mkstemp(suffix='.json')
-                os.close(fd)
-                
-                # Write a basic compilation database
-                with open(compile_commands_path, 'w') as f:
-                    compile_commands = []
-                    for cpp_file in cpp_files:
-                        entry = {
-                            "directory": os.path.dirname(os.path.abspath(cpp_file)),
-                            "command": f"clang++ -std=c++11 {compiler_options} {os.path.basename(cpp_file)}",
-                            "file": cpp_file
-                        }
-                        compile_commands.append(entry)
-                    
-                    json.dump(compile_commands, f)
+            command_args = options.get("command_args") or ""
+            compiler_options = options.get("compiler_options") or ""
             
-            try:
-                # Build command for each file
-                all_output = ""
-                
-                for cpp_file in cpp_files:
-                    # Build command
-                    command = [
-                        "clang-tidy",
-                        f"-checks={checks_arg}",
-                        cpp_file
-                    ]
-                    
-                    # Add compilation database if we created one
-                    if compile_commands_path:
-                        command.extend(["-p", os.path.dirname(compile_commands_path)])
-                    
-                    # Add additional arguments if provided
-                    if command_args:
-                        command.extend(command_args.split())
-                    
-                    # Run ClangTidy
-                    result = await run_command_async(command, timeout=settings.CLANGTIDY_CONFIG["timeout"])
-                    
-                    # Collect output
-                    all_output += result.stdout + "\n"
+            # Identify the analysis by tool version, normalized config and file contents
+            analysis_key = ResultCache.make_key(
+                "clangtidy",
+                await tool_registry.get_version("clangtidy"),
+                ClangTidyService.get_cache_config(config),
+                await asyncio.to_thread(get_content_keys, cpp_files)
+            )
+            
+            # Serve identical analyses from the result cache
+            cache_key = None
+            if settings.RESULT_CACHE_ENABLED:
+                cache_key = analysis_key
+                cached_results = await asyncio.to_thread(result_cache.get_results, cache_key, "issues", cpp_files)
+                if cached_results is not None:
+                    logger.info(f"ClangTidy results for {len(cpp_files)} files served from cache")
+                    return {"result": cached_results}
+            
+            # Describe every file in the workspace's compilation database
+            database_dir = await asyncio.to_thread(compilation_databases.get_database_dir, cpp_files, compiler_options.split())
+            
+            # Build one command per batch of files
+            max_workers = ClangTidyService._get_max_workers(options)
+            batches = ClangTidyService._make_batches(cpp_files, ClangTidyService._get_batch_size(options, stream), max_workers)
+            commands = []
+            
+            for batch in batches:
+                # Build command
+                command = [
+                    tool_registry.get_binary("clangtidy"),
+                    f"-checks={checks_arg}",
+                    "-p", database_dir,
+                    *batch
+                ]
                 
-                # Format results
-                formatted_results = format_clangtidy_results(all_output, cpp_files)
+                # Add additional arguments if provided
+                if command_args:
+                    command.extend(command_args.split())
                 
-                return formatted_results
+                commands.append(command)
             
-            finally:
-                # Clean up temp file
-                if compile_commands_path and os.path.exists(compile_commands_path):
-                    os.unlink(compile_commands_path)
+            return {
+                "cpp_files": cpp_files,
+                "batches": batches,
+                "commands": commands,
+                "max_workers": max_workers,
+                "analysis_key": analysis_key,
+                "cache_key": cache_key,
+                "resources": []
+            }
         
         except ClangTidyException as e:
             raise e
         
         except Exception as e:
-            logger.error(f"Error during ClangTidy analysis: {str(e)}")
+            logger.error(f"Error preparing ClangTidy analysis: {str(e)}")
             raise ClangTidyException(
                 message=f"Error during ClangTidy analysis: {str(e)}"
             )
     
+    @staticmethod
+    async def _finish_analysis(plan: Dict[str, Any], outputs: List[str]) -> Dict[str, Any]:
+        """
+        Format the outputs of an analysis plan and store them in the result cache
+        
+        Args:
+            plan: Plan from _prepare_analysis
+            outputs: Stdout of each command, in the same order as the commands
+        
+        Returns:
+            Formatted results
+        """
+        # Collect output in input order so results are deterministic
+        all_output = "\n".join(outputs) + "\n"
+        
+        # Format results
+        formatted_results = format_clangtidy_results(all_output, plan["cpp_files"])
+        formatted_results["stats"]["max_workers"] = plan["max_workers"]
+        formatted_results["stats"]["batches"] = len(plan["batches"])
+        
+        if plan["cache_key"]:
+            await asyncio.to_thread(result_cache.put_results, plan["cache_key"], "clangtidy", plan["cpp_files"], formatted_results)
+        
+        # Usage describes this run only, so it is not cached
+        formatted_results["stats"]["resources"] = summarize_usage(plan["resources"])
+        
+        return formatted_results
+    
+    @staticmethod
+    def _get_max_workers(options: Dict[str, Any]) -> int:
+        """
+        Resolve the number of clang-tidy processes allowed to run at once
+        
+        Args:
+            options: ClangTidy options from the request
+        
+        Returns:
+            Worker limit, never above the server-wide limit
+        """
+        server_limit = max(1, int(settings.CLANGTIDY_CONFIG.get("max_workers") or os.cpu_count() or 1))
+        requested = options.get("max_workers") if options else None
+        
+        if requested:
+            return max(1, min(int(requested), server_limit))
+        
+        return server_limit
+    
+    @staticmethod
+    def _get_batch_size(options: Dict[str, Any], stream: bool = False) -> int:
+        """
+        Resolve the number of files given to each clang-tidy process
+        
+        Args:
+            options: ClangTidy options from the request
+            stream: Whether results are streamed, where the first issues can
+                only be sent once a whole batch has finished
+        
+        Returns:
+            Files per process, or 0 to spread the files evenly over the workers
+        """
+        requested = options.get("batch_size") if options else None
+        
+        if requested is not None:
+            return max(0, int(requested))
+        
+        if stream:
+            return max(1, int(settings.CLANGTIDY_CONFIG.get("stream_batch_size") or 1))
+        
+        return max(0, int(settings.CLANGTIDY_CONFIG.get("batch_size") or 0))
+    
+    @staticmethod
+    def _make_batches(cpp_files: List[str], batch_size: int, max_workers: int) -> List[List[str]]:
+        """
+        Split files into the batches run by one clang-tidy process each
+        
+        Larger batches pay process start-up and check registration once for
+        more files; smaller ones let more processes run in parallel.
+        
+        Args:
+            cpp_files: Files to analyze
+            batch_size: Files per process, or 0 to spread the files evenly over the workers
+            max_workers: Maximum number of processes running at once
+        
+        Returns:
+            Batches of files, in input order
+        """
+        if batch_size <= 0:
+            batch_size = math.ceil(len(cpp_files) / max_workers)
+        
+        return [cpp_files[start:start + batch_size] for start in range(0, len(cpp_files), batch_size)]
+    
+    @staticmethod
+    async def _run_commands(
+        commands: List[List[str]],
+        max_workers: int,
+        resources: Optional[List[Dict[str, Any]]] = None
+    ) -> List[str]:
+        """
+        Run clang-tidy commands concurrently with a bounded number of processes
+        
+        Args:
+            commands: Commands to run, one per batch of files
+            max_workers: Maximum number of processes running at once
+            resources: List that receives the resource usage of each command (optional)
+        
+        Returns:
+            Stdout of each command, in the same order as the commands
+        """
+        outputs = [""] * len(commands)
+        
+        async for index, output in ClangTidyService._iter_commands(commands, max_workers, resources):
+            outputs[index] = output
+        
+        return outputs
+    
+    @staticmethod
+    async def _iter_commands(
+        commands: List[List[str]],
+        max_workers: int,
+        resources: Optional[List[Dict[str, Any]]] = None
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Run clang-tidy commands concurrently and yield each output as it completes
+        
+        Args:
+            commands: Commands to run, one per batch of files
+            max_workers: Maximum number of processes running at once
+            resources: List that receives the resource usage of each command (optional)
+        
+        Yields:
+            Tuples of (command index, stdout) in completion order
+        
+        Raises:
+            AdmissionRejected: If the first command cannot get a server-wide
+                slot; once it has one, the other commands wait for theirs
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+        profile = ResourceProfile.from_config("clangtidy", settings.CLANGTIDY_CONFIG)
+        admitted = asyncio.Event()
+        
+        async def run_one(index: int, command: List[str]) -> Tuple[int, str]:
+            # The request is admitted once, by the first command's slot, so it
+            # is never refused after part of its work has run
+            if index:
+                await admitted.wait()
+            
+            # The request's own worker limit first, then the server-wide process limit
+            async with semaphore, admission_controller.slot("clangtidy", admitted=index > 0):
+                admitted.set()
+                result = await run_command_async(
+                    command,
+                    timeout=settings.CLANGTIDY_CONFIG["timeout"],
+                    resource_profile=profile
+                )
+                if resources is not None and result.resource_usage:
+                    resources.append(result.resource_usage)
+                try:
+                    return index, result.stdout
+                finally:
+                    result.cleanup()
+        
+        tasks = [asyncio.ensure_future(run_one(index, command)) for index, command in enumerate(commands)]
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop remaining processes if the consumer goes away or a command fails
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     @staticmethod
     async def check_availability() -> bool:
         """
         Check if ClangTidy is available
         
+        The result comes from the tool registry cache and does not spawn a process
+        
         Returns:
             True if ClangTidy is available, False otherwise
         """
-        try:
-            result = await run_command_async(["clang-tidy", "--version"], timeout=10)
-            return result.returncode == 0
-        except Exception as e:
-            logger.warning(f"ClangTidy is not available: {str(e)}")
-            return False
\ No newline at end of file
+        return await tool_registry.is_available("clangtidy")
\ No newline at end of file
@@ -0,0 +1,223 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+
+from app.core.config import settings
+from app.utils.file_utils import ensure_directory_exists
+
+logger = logging.getLogger(__name__)
+
+# Extensions compiled as C; everything else ClangTidy analyzes is C++
+C_SOURCE_EXTENSIONS = {'.c'}
+CXX_SOURCE_EXTENSIONS = {'.cpp', '.cc', '.cxx'}
+CXX_HEADER_EXTENSIONS = {'.hpp', '.hxx'}
+
+class CompilationDatabaseStore:
+    """
+    Per-workspace compile_commands.json files for ClangTidy
+    
+    A workspace is the directory holding the files of one analysis (the
+    common parent of the files, usually an upload directory). Each workspace
+    and set of compiler options gets one database directory under the cache,
+    so clang-tidy can be pointed at it with -p. Entries are only added when a
+    file is not in the database yet, so later analyses of the same workspace
+    reuse it without rewriting; .h entries are rebuilt when the first C++
+    source arrives, since that changes how headers are compiled. A database
+    is dropped when its workspace is removed (see remove_workspace), and
+    databases of workspaces that no longer exist are also removed whenever
+    a new database is created.
+    """
+    
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._workspaces: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "reused": 0,
+            "written": 0,
+            "pruned": 0,
+        }
+    
+    def get_database_dir(self, file_paths: List[str], compiler_options: List[str]) -> str:
+        """
+        Get the directory of the database covering a set of files, writing it if needed
+        
+        Args:
+            file_paths: C/C++ files to analyze
+            compiler_options: Extra compiler options for every file
+        
+        Returns:
+            Directory containing compile_commands.json, to pass to clang-tidy with -p
+        """
+        file_paths = [os.path.abspath(path) for path in file_paths]
+        workspace = self.get_workspace(file_paths)
+        key = hashlib.sha256(json.dumps([workspace, compiler_options]).encode("utf-8")).hexdigest()[:16]
+        database_dir = os.path.join(self.base_dir, key)
+        database_path = os.path.join(database_dir, "compile_commands.json")
+        
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is None:
+                entries = self._load(database_path)
+                if entries is None:
+                    self._prune()
+                    entries = {}
+                self._entries[key] = entries
+                self._workspaces[key] = workspace
+            
+            missing = [path for path in file_paths if path not in entries]
+            if not missing and os.path.exists(database_path):
+                self._counters["reused"] += 1
+                return database_dir
+            
+            # Headers are compiled as C++ as soon as the workspace has any C++ source,
+            # so existing .h entries are rebuilt when that changes
+            has_cxx = any(
+                os.path.splitext(path)[1].lower() in CXX_SOURCE_EXTENSIONS | CXX_HEADER_EXTENSIONS
+                for path in list(entries) + file_paths
+            )
+            stale_headers = [
+                path for path, entry in entries.items()
+                if os.path.splitext(path)[1].lower() == '.h'
+                and entry["arguments"] != self.compile_arguments(path, compiler_options, has_cxx)
+            ]
+            
+            # Relative options such as -Iinclude resolve against the workspace root
+            for path in missing + stale_headers:
+                entries[path] = {
+                    "directory": workspace,
+                    "arguments": self.compile_arguments(path, compiler_options, has_cxx),
+                    "file": path
+                }
+            
+            self._write(database_dir, workspace, list(entries.values()))
+            self._counters["written"] += 1
+            logger.debug(f"Compilation database for {workspace} now has {len(entries)} entries")
+            
+            return database_dir
+    
+    def remove_workspace(self, directory: str) -> None:
+        """
+        Drop the databases of a workspace that is being removed
+        
+        Args:
+            directory: Removed directory; databases of workspaces inside it are dropped too
+        """
+        directory = os.path.abspath(directory)
+        
+        with self._lock:
+            keys = [
+                key for key, workspace in self._workspaces.items()
+                if workspace == directory or workspace.startswith(directory + os.sep)
+            ]
+            for key in keys:
+                self._entries.pop(key, None)
+                self._workspaces.pop(key, None)
+                self._counters["pruned"] += 1
+        
+        for key in keys:
+            shutil.rmtree(os.path.join(self.base_dir, key), ignore_errors=True)
+    
+    @staticmethod
+    def get_workspace(file_paths: List[str]) -> str:
+        """Get the deepest directory containing every file"""
+        return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in file_paths])
+    
+    @staticmethod
+    def compile_arguments(file_path: str, compiler_options: List[str], has_cxx: bool) -> List[str]:
+        """
+        Build the compiler invocation for one file
+        
+        The language standard is left to the compiler's default unless
+        CLANGTIDY_C_STANDARD / CLANGTIDY_CXX_STANDARD is set, and a -std=
+        in the compiler options always takes precedence.
+        
+        Args:
+            file_path: Source or header file
+            compiler_options: Extra compiler options
+            has_cxx: Whether the workspace contains C++ sources, which decides how .h files are compiled
+        
+        Returns:
+            Compiler arguments, starting with the compiler
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        is_c = extension in C_SOURCE_EXTENSIONS or (extension == '.h' and not has_cxx)
+        
+        if is_c:
+            arguments = ["clang", "-x", "c"]
+            standard = settings.CLANGTIDY_CONFIG.get("c_standard")
+        else:
+            arguments = ["clang++", "-x", "c++"]
+            standard = settings.CLANGTIDY_CONFIG.get("cxx_standard")
+        
+        if standard and not any(option.startswith("-std=") for option in compiler_options):
+            arguments.append(f"-std={standard}")
+        
+        return arguments + list(compiler_options) + ["-c", file_path]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of known databases and counters"""
+        with self._lock:
+            return {
+                "databases": len(self._entries),
+                **self._counters,
+            }
+    
+    @staticmethod
+    def _load(database_path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Load the entries of an existing database by file, if there is one"""
+        if not os.path.exists(database_path):
+            return None
+        
+        try:
+            with open(database_path, 'r', encoding='utf-8') as f:
+                return {entry["file"]: entry for entry in json.load(f)}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable compilation database {database_path}: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _write(database_dir: str, workspace: str, entries: List[Dict[str, Any]]) -> None:
+        """Write a database atomically, recording the workspace it belongs to"""
+        ensure_directory_exists(database_dir)
+        
+        with open(os.path.join(database_dir, "workspace"), 'w', encoding='utf-8') as f:
+            f.write(workspace)
+        
+        database_path = os.path.join(database_dir, "compile_commands.json")
+        temp_path = f"{database_path}.{os.getpid()}.tmp"
+        
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        
+        os.replace(temp_path, database_path)
+    
+    def _prune(self) -> None:
+        """Remove databases whose workspace no longer exists; the caller holds the lock"""
+        if not os.path.isdir(self.base_dir):
+            return
+        
+        for key in os.listdir(self.base_dir):
+            database_dir = os.path.join(self.base_dir, key)
+            
+            try:
+                with open(os.path.join(database_dir, "workspace"), 'r', encoding='utf-8') as f:
+                    workspace = f.read()
+            except OSError:
+                workspace = ""
+            
+            if workspace and os.path.isdir(workspace):
+                continue
+            
+            self._entries.pop(key, None)
+            self._workspaces.pop(key, None)
+            shutil.rmtree(database_dir, ignore_errors=True)
+            self._counters["pruned"] += 1
+
+# Create compilation database store instance
+compilation_databases = CompilationDatabaseStore(os.path.join(settings.CACHE_DIR, "clangtidy-db"))
\ No newline at end of file
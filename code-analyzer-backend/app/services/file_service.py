@@ -1,17 +1,21 @@
 import os
 import logging
 import uuid
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from fastapi import UploadFile
 import asyncio
 
 from app.core.config import settings
 from app.core.errors import FileException
-from app.core.security import save_upload_files, cleanup_files
+from app.core.security import save_upload_files, save_upload_archive, is_archive, cleanup_files
+from app.services.compilation_database import compilation_databases
 from app.utils.file_utils import ensure_directory_exists, create_temp_directory, cleanup_directory
 
 logger = logging.getLogger(__name__)
 
+# Extraction reports of uploads that contained archives, by temp directory
+_upload_reports: Dict[str, Dict[str, Any]] = {}
+
 class FileService:
     """Service for handling file uploads and management"""
     
@@ -20,6 +24,9 @@ class FileService:
         """
         Save uploaded files to a temporary directory
         
+        Archives (.zip, .tar, .tar.gz) are extracted into the directory with
+        their layout preserved, and the extraction is reported by get_upload_stats
+        
         Args:
             files: List of uploaded files
         
@@ -43,18 +50,44 @@ class FileService:
         
         try:
             # Save files
-            saved_paths = await save_upload_files(files)
+            saved_paths = await save_upload_files([file for file in files if not is_archive(file.filename)], temp_dir)
+            
+            # Extract archives into the same workspace
+            for file in files:
+                if not is_archive(file.filename):
+                    continue
+                
+                try:
+                    extracted, report = await save_upload_archive(file, temp_dir)
+                except FileException:
+                    cleanup_files(saved_paths)
+                    raise
+                
+                saved_paths.extend(extracted)
+                FileService._add_upload_report(temp_dir, report)
+                logger.info(
+                    f"Extracted {report['files_extracted']} files ({report['bytes_extracted']} bytes) "
+                    f"from {file.filename} in {report['extract_seconds']}s"
+                )
+            
+            if not saved_paths:
+                raise FileException(
+                    message="No files to analyze in the upload",
+                    status_code=400
+                )
             
             logger.info(f"Saved {len(saved_paths)} files to {temp_dir}")
             return saved_paths, temp_dir
         
         except FileException as e:
             # Clean up on error
+            _upload_reports.pop(temp_dir, None)
             cleanup_directory(temp_dir)
             raise e
         
         except Exception as e:
             # Clean up on error
+            _upload_reports.pop(temp_dir, None)
             cleanup_directory(temp_dir)
             logger.error(f"Error saving uploaded files: {str(e)}")
             raise FileException(
@@ -75,6 +108,10 @@ class FileService:
             # Clean up individual files
             cleanup_files(file_paths)
             
+            if temp_dir:
+                _upload_reports.pop(temp_dir, None)
+                compilation_databases.remove_workspace(temp_dir)
+            
             # Clean up temp directory if provided
             if temp_dir and os.path.exists(temp_dir):
                 cleanup_directory(temp_dir)
@@ -84,6 +121,31 @@ class FileService:
         except Exception as e:
             logger.warning(f"Error during cleanup: {str(e)}")
     
+    @staticmethod
+    def get_upload_stats(temp_dir: Optional[str]) -> Dict[str, Any]:
+        """
+        Get the archive extraction report of an upload, to merge into analysis stats
+        
+        Args:
+            temp_dir: Temporary directory of the upload
+        
+        Returns:
+            {"upload": report} if archives were extracted, otherwise an empty dictionary
+        """
+        report = _upload_reports.get(temp_dir) if temp_dir else None
+        return {"upload": dict(report)} if report else {}
+    
+    @staticmethod
+    def _add_upload_report(temp_dir: str, report: Dict[str, Any]) -> None:
+        """Add the report of one extracted archive to the totals of the upload"""
+        totals = _upload_reports.get(temp_dir)
+        if totals is None:
+            _upload_reports[temp_dir] = dict(report)
+            return
+        
+        for key, value in report.items():
+            totals[key] = round(totals[key] + value, 4)
+    
     @staticmethod
     def get_file_types(file_paths: List[str]) -> Dict[str, int]:
         """
@@ -0,0 +1,374 @@
+import asyncio
+import os
+import re
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.errors import FileException, SemgrepException
+from app.services.clangtidy_service import ClangTidyService, CPP_EXTENSIONS
+from app.services.compilation_database import CXX_SOURCE_EXTENSIONS, CXX_HEADER_EXTENSIONS
+from app.services.result_cache import ResultCache, result_cache
+from app.services.semgrep_config_cache import SemgrepConfigCache
+from app.services.semgrep_service import SemgrepService
+from app.services.tool_registry import tool_registry
+from app.utils.file_utils import get_file_name, hash_file, move_saved_file, normalize_upload_name
+
+logger = logging.getLogger(__name__)
+
+# Content hashes in manifests are lowercase SHA-256 hex digests
+CONTENT_HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+# Tools supporting incremental scans: item list key and the extensions they analyze (None for all files)
+INCREMENTAL_TOOLS = {
+    "semgrep": ("findings", None),
+    "clangtidy": ("issues", CPP_EXTENSIONS),
+}
+
+# Header extensions whose changes invalidate every ClangTidy file result of a manifest
+HEADER_EXTENSIONS = {'.h'} | CXX_HEADER_EXTENSIONS
+
+class IncrementalScanService:
+    """
+    Service for scans that only analyze files changed since a previous scan
+    
+    The client sends a manifest mapping the relative path of every file to
+    its SHA-256 content hash. Results are kept per file in the result cache,
+    keyed by tool version, normalized configuration, relative path and
+    content hash, so check_manifest can tell which files have no results
+    yet. The client then uploads only those files (named by their relative
+    path) along with the manifest; they are laid out under their relative
+    paths, analyzed in one run, their results are split by file and stored,
+    and the results of the unchanged files are read back from the store.
+    ClangTidy diagnostics also depend on the headers a file includes, so for
+    ClangTidy the keys cover the hashes of every header in the manifest,
+    changing a header re-analyzes all files, and the headers are uploaded
+    along with any file to analyze so its includes resolve.
+    """
+    
+    @staticmethod
+    def get_runners() -> Dict[str, Callable[[List[str], Dict[str, Any]], Awaitable[Dict[str, Any]]]]:
+        """Map tool names to their analysis functions"""
+        return {
+            "semgrep": SemgrepService.analyze_files,
+            "clangtidy": ClangTidyService.analyze_files,
+        }
+    
+    @staticmethod
+    def normalize_manifest(tool: str, manifest: Dict[str, str]) -> Dict[str, str]:
+        """
+        Validate a manifest and keep the files the tool analyzes
+        
+        Args:
+            tool: Tool name
+            manifest: Relative file path to SHA-256 content hash
+        
+        Returns:
+            Normalized relative path to content hash, sorted by path
+        
+        Raises:
+            FileException: If the manifest is too large or has invalid entries
+        """
+        if len(manifest) > settings.MAX_MANIFEST_FILES:
+            raise FileException(
+                message="Manifest lists too many files",
+                status_code=400,
+                details={"files": len(manifest), "max_files": settings.MAX_MANIFEST_FILES}
+            )
+        
+        extensions = INCREMENTAL_TOOLS[tool][1]
+        normalized = {}
+        invalid = []
+        
+        for path, content_hash in manifest.items():
+            name = normalize_upload_name(path)
+            content_hash = str(content_hash).lower()
+            
+            if not name or not CONTENT_HASH_PATTERN.match(content_hash):
+                invalid.append(path)
+                continue
+            
+            if extensions is None or os.path.splitext(name)[1].lower() in extensions:
+                normalized[name] = content_hash
+        
+        if invalid:
+            raise FileException(
+                message="Manifest entries need a relative path and a SHA-256 content hash",
+                status_code=400,
+                details={"invalid_paths": invalid[:100]}
+            )
+        
+        return dict(sorted(normalized.items()))
+    
+    @staticmethod
+    async def check_manifest(tool: str, config: Dict[str, Any], manifest: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Find the files of a manifest that must be uploaded
+        
+        These are the files without stored results and, for ClangTidy, every
+        header of the manifest as soon as one file needs analysis, since the
+        files being analyzed may include them.
+        
+        Args:
+            tool: Tool name
+            config: Tool configuration
+            manifest: Relative file path to SHA-256 content hash
+        
+        Returns:
+            Dictionary with the "missing" paths and their "missing_hashes",
+            and the number of "files" the tool analyzes and of "cached" ones
+        """
+        manifest = IncrementalScanService.normalize_manifest(tool, manifest)
+        keys = await IncrementalScanService._get_file_keys(tool, config, manifest)
+        
+        unanalyzed = await asyncio.to_thread(lambda: [path for path, key in keys.items() if not result_cache.contains(key)])
+        missing = IncrementalScanService._get_required(tool, manifest, unanalyzed)
+        
+        return {
+            "missing": missing,
+            "missing_hashes": sorted({manifest[path] for path in missing}),
+            "files": len(manifest),
+            "cached": len(manifest) - len(unanalyzed)
+        }
+    
+    @staticmethod
+    async def analyze_files(
+        tool: str,
+        config: Dict[str, Any],
+        manifest: Dict[str, str],
+        file_paths: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Analyze the uploaded files of a manifest and add the stored results of the others
+        
+        Uploads are moved to their relative paths in a fresh directory next
+        to them, so include directives and path-based rules see the layout
+        of the tree. Uploads without stored results are analyzed in one run;
+        the others (headers sent only so they can be included) are laid out
+        but not analyzed. ClangTidy results of a run with "file not found"
+        diagnostics are returned but not stored.
+        
+        Args:
+            tool: Tool name
+            config: Tool configuration
+            manifest: Relative file path to SHA-256 content hash
+            file_paths: Saved uploads, each remembered under its relative path
+        
+        Returns:
+            Formatted results for every file of the manifest, with relative
+            paths as file names and an "incremental" entry in the stats
+        
+        Raises:
+            FileException: If an upload is not in the manifest or does not
+                match its hash, or a file that has to be uploaded was not (409)
+        """
+        items_key, extensions = INCREMENTAL_TOOLS[tool]
+        manifest = IncrementalScanService.normalize_manifest(tool, manifest)
+        keys = await IncrementalScanService._get_file_keys(tool, config, manifest)
+        
+        # Match the uploads with the manifest
+        uploads: Dict[str, str] = {}
+        mismatched = []
+        
+        for path in file_paths:
+            name = get_file_name(path) or os.path.basename(path)
+            if extensions is not None and os.path.splitext(name)[1].lower() not in extensions:
+                continue
+            
+            if manifest.get(name) != await asyncio.to_thread(hash_file, path):
+                mismatched.append(name)
+            else:
+                uploads[name] = path
+        
+        if mismatched:
+            raise FileException(
+                message="Uploaded files do not match the manifest",
+                status_code=400,
+                details={"paths": mismatched}
+            )
+        
+        # Read the stored results, then check that everything to analyze or include was uploaded
+        stored: Dict[str, List[Dict[str, Any]]] = {}
+        if settings.RESULT_CACHE_ENABLED:
+            entries = await asyncio.to_thread(lambda: {name: result_cache.get(key) for name, key in keys.items()})
+            stored = {name: entry["items"] for name, entry in entries.items() if entry is not None}
+        
+        unanalyzed = [name for name in manifest if name not in stored]
+        missing = [
+            name for name in IncrementalScanService._get_required(tool, manifest, unanalyzed)
+            if name not in uploads
+        ]
+        
+        if missing:
+            raise FileException(
+                message="No stored results for some files of the manifest, upload them",
+                status_code=409,
+                details={"missing": missing, "missing_hashes": sorted({manifest[name] for name in missing})}
+            )
+        
+        # Analyze the uploads without stored results and store their results per file
+        stats: Dict[str, Any] = {}
+        extra_items: List[Dict[str, Any]] = []
+        stored_files = 0
+        
+        if unanalyzed:
+            workspace = await asyncio.to_thread(IncrementalScanService._lay_out, uploads)
+            targets = {name: workspace[name] for name in unanalyzed}
+            
+            results = await IncrementalScanService.get_runners()[tool](list(targets.values()), config)
+            stats = dict(results.get("stats", {}))
+            by_file, extra_items = IncrementalScanService._split_by_file(results.get(items_key, []), targets)
+            
+            for name in targets:
+                stored[name] = by_file.get(name, [])
+            
+            if tool == "clangtidy" and IncrementalScanService._has_missing_includes(results.get(items_key, [])):
+                logger.warning("Incremental ClangTidy run could not resolve some includes, its results are not stored")
+            elif settings.RESULT_CACHE_ENABLED:
+                for name in targets:
+                    await asyncio.to_thread(result_cache.put, keys[name], tool, {"items": stored[name]})
+                stored_files = len(targets)
+        
+        items = [item for name in manifest for item in stored[name]] + extra_items
+        
+        by_severity = {"ERROR": 0, "WARNING": 0, "INFO": 0}
+        for item in items:
+            by_severity[item["severity"]] = by_severity.get(item["severity"], 0) + 1
+        
+        stats.update({
+            f"total_{items_key}": len(items),
+            f"files_with_{items_key}": len({item["file"] for item in items}),
+            "files_analyzed": len(manifest),
+            "by_severity": by_severity,
+            "incremental": {
+                "files": len(manifest),
+                "analyzed": len(unanalyzed),
+                "cached": len(manifest) - len(unanalyzed),
+                "uploaded": len(uploads),
+                "stored": stored_files
+            }
+        })
+        stats.pop("cached", None)
+        stats.pop("coalesced", None)
+        
+        logger.info(f"Incremental {tool} scan: {len(unanalyzed)} of {len(manifest)} files analyzed")
+        return {items_key: items, "stats": stats}
+    
+    @staticmethod
+    def _get_required(tool: str, manifest: Dict[str, str], unanalyzed: List[str]) -> List[str]:
+        """
+        Get the files that must be uploaded to analyze some files of a manifest
+        
+        Args:
+            tool: Tool name
+            manifest: Normalized manifest
+            unanalyzed: Files without stored results
+        
+        Returns:
+            The unanalyzed files plus, for ClangTidy, every header they may
+            include, in manifest order
+        """
+        required = set(unanalyzed)
+        if tool == "clangtidy" and required:
+            required.update(name for name in manifest if os.path.splitext(name)[1].lower() in HEADER_EXTENSIONS)
+        
+        return [name for name in manifest if name in required]
+    
+    @staticmethod
+    def _lay_out(uploads: Dict[str, str]) -> Dict[str, str]:
+        """
+        Move uploads to their relative paths in a new directory next to them
+        
+        Args:
+            uploads: Relative path to saved upload path
+        
+        Returns:
+            Relative path to new path
+        """
+        if not uploads:
+            return {}
+        
+        directory = tempfile.mkdtemp(prefix="tree-", dir=os.path.dirname(next(iter(uploads.values()))))
+        return {name: move_saved_file(path, directory, name) for name, path in uploads.items()}
+    
+    @staticmethod
+    def _has_missing_includes(items: List[Dict[str, Any]]) -> bool:
+        """Check whether ClangTidy reported includes it could not find"""
+        return any(
+            item.get("check") == "clang-diagnostic-error" and "file not found" in item.get("message", "")
+            for item in items
+        )
+    
+    @staticmethod
+    async def _get_file_keys(tool: str, config: Dict[str, Any], manifest: Dict[str, str]) -> Dict[str, str]:
+        """Get the result cache key of every file of a normalized manifest"""
+        version = await tool_registry.get_version(tool)
+        
+        if tool == "semgrep":
+            rules_path = config.get("rules_path", settings.SEMGREP_RULES_PATH)
+            selected_rules = config.get("selected_rules", [])
+            catalog = await SemgrepService.get_catalog(rules_path)
+            
+            missing_rules = SemgrepConfigCache.find_missing_rules(catalog, selected_rules)
+            if missing_rules:
+                raise SemgrepException(
+                    message=f"Unknown Semgrep rules: {', '.join(missing_rules)}",
+                    details={"unknown_rules": missing_rules, "rules_path": catalog.rules_dir},
+                    status_code=400
+                )
+            
+            cache_config = SemgrepService.get_cache_config(catalog, selected_rules)
+        else:
+            cache_config = ClangTidyService.get_cache_config(config)
+            
+            # Diagnostics depend on the included headers and on whether headers compile as C++
+            headers = [
+                [name, content_hash] for name, content_hash in manifest.items()
+                if os.path.splitext(name)[1].lower() in HEADER_EXTENSIONS
+            ]
+            cache_config["headers"] = hashlib.sha256(json.dumps(headers).encode("utf-8")).hexdigest()
+            cache_config["cxx"] = any(
+                os.path.splitext(name)[1].lower() in CXX_SOURCE_EXTENSIONS | CXX_HEADER_EXTENSIONS
+                for name in manifest
+            )
+        
+        return {
+            name: ResultCache.make_key(tool, version, {**cache_config, "file": name}, [content_hash])
+            for name, content_hash in manifest.items()
+        }
+    
+    @staticmethod
+    def _split_by_file(
+        items: List[Dict[str, Any]],
+        uploads: Dict[str, str]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """
+        Group findings by the relative path of their file
+        
+        Args:
+            items: Formatted findings, with saved upload paths as file names
+            uploads: Relative path to saved upload path
+        
+        Returns:
+            Tuple of (findings by relative path with file names rewritten,
+            findings in files outside the upload, which are not stored)
+        """
+        names = {}
+        for name, path in uploads.items():
+            names[path] = name
+            names[os.path.abspath(path)] = name
+        
+        by_file: Dict[str, List[Dict[str, Any]]] = {}
+        extra = []
+        
+        for item in items:
+            name = names.get(item.get("file"))
+            if name is None:
+                extra.append(item)
+            else:
+                by_file.setdefault(name, []).append({**item, "file": name})
+        
+        return by_file, extra
\ No newline at end of file
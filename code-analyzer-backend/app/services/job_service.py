@@ -0,0 +1,421 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.core.errors import JobException, AdmissionRejected
+from app.services.baseline_service import baseline_store
+from app.services.clangtidy_service import ClangTidyService
+from app.services.file_service import FileService
+from app.services.semgrep_service import SemgrepService
+from app.services.snyk_service import SnykService
+
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+def _split_setting(value: str) -> List[str]:
+    """Split a comma-separated setting into lowercase entries"""
+    return [entry.strip().lower() for entry in value.split(",") if entry.strip()]
+
+async def check_callback_url(url: str) -> List[str]:
+    """
+    Reject callback URLs the server must not call
+    
+    The scheme must be in JOB_CALLBACK_ALLOWED_SCHEMES and, when
+    JOB_CALLBACK_ALLOWED_HOSTS is set, the host must be listed (entries
+    starting with "." match subdomains). Unless JOB_CALLBACK_ALLOW_PRIVATE is
+    set, every address the host resolves to must be public, so callbacks
+    cannot reach loopback, private networks or the cloud metadata endpoint.
+    
+    Args:
+        url: Callback URL supplied by the client
+    
+    Returns:
+        The checked addresses of the host, which the callback must be sent
+        to (empty if private addresses are allowed and nothing was resolved)
+    
+    Raises:
+        JobException: If the URL is not allowed (400)
+    """
+    parsed = urlsplit(url)
+    schemes = _split_setting(settings.JOB_CALLBACK_ALLOWED_SCHEMES)
+    
+    if parsed.scheme.lower() not in schemes or not parsed.hostname:
+        raise JobException(
+            message="Callback URL must be an absolute URL with an allowed scheme",
+            status_code=400,
+            details={"callback_url": url, "allowed_schemes": schemes}
+        )
+    
+    host = parsed.hostname.lower().rstrip(".")
+    hosts = _split_setting(settings.JOB_CALLBACK_ALLOWED_HOSTS)
+    
+    if hosts and not any(host == allowed or (allowed.startswith(".") and host.endswith(allowed)) for allowed in hosts):
+        raise JobException(
+            message="Callback host is not allowed",
+            status_code=400,
+            details={"callback_url": url, "host": host}
+        )
+    
+    if settings.JOB_CALLBACK_ALLOW_PRIVATE:
+        return []
+    
+    try:
+        port = parsed.port or (443 if parsed.scheme.lower() == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, ValueError) as e:
+        raise JobException(
+            message="Callback host cannot be resolved",
+            status_code=400,
+            details={"callback_url": url, "error": str(e)}
+        )
+    
+    blocked = sorted({
+        info[4][0] for info in infos
+        if not ipaddress.ip_address(info[4][0].split("%")[0]).is_global
+    })
+    if blocked:
+        raise JobException(
+            message="Callback URL points to a private or reserved address",
+            status_code=400,
+            details={"callback_url": url, "addresses": blocked}
+        )
+    
+    return list(dict.fromkeys(info[4][0].split("%")[0] for info in infos))
+
+class Job:
+    """Class to hold the state of an analysis job"""
+    
+    def __init__(
+        self,
+        tool: str,
+        file_paths: List[str],
+        temp_dir: Optional[str],
+        config: Dict[str, Any],
+        callback_url: Optional[str] = None,
+        upload_seconds: float = 0.0,
+        baseline_id: Optional[str] = None,
+    ):
+        self.id = uuid.uuid4().hex
+        self.tool = tool
+        self.file_paths = file_paths
+        self.temp_dir = temp_dir
+        self.config = config
+        self.callback_url = callback_url
+        self.baseline_id = baseline_id
+        self.status = JOB_QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Dict[str, Any]] = None
+        self.callback_status: Optional[str] = None
+        self.attempts = 0
+        self.upload_seconds = upload_seconds
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+    
+    @property
+    def finished(self) -> bool:
+        """Whether the job has completed or failed"""
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+    
+    def timings(self) -> Dict[str, Optional[float]]:
+        """Get the time spent in each phase of the job, in seconds"""
+        now = time.time()
+        started = self.started_at or now
+        return {
+            "upload_seconds": round(self.upload_seconds, 4),
+            "queued_seconds": round(started - self.created_at, 4),
+            "run_seconds": round((self.finished_at or now) - self.started_at, 4) if self.started_at else None,
+            "total_seconds": round((self.finished_at or now) - self.created_at, 4),
+        }
+    
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        """Convert the job to a dictionary"""
+        data = {
+            "id": self.id,
+            "tool": self.tool,
+            "status": self.status,
+            "file_count": len(self.file_paths),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "timings": self.timings(),
+            "error": self.error,
+            "callback_url": self.callback_url,
+            "callback_status": self.callback_status,
+            "attempts": self.attempts,
+        }
+        
+        if include_result:
+            data["result"] = self.result
+        
+        return data
+
+class JobManager:
+    """
+    Runs analysis jobs on a pool of in-process workers
+    
+    Jobs are queued on submit and picked up by JOB_WORKERS worker tasks.
+    A job whose tool is too busy to admit it is requeued after a backoff
+    that doubles from JOB_RETRY_BACKOFF seconds, up to JOB_MAX_RETRIES times.
+    Finished jobs stay queryable for JOB_RESULT_TTL seconds.
+    """
+    
+    def __init__(self, workers: int, queue_size: int, result_ttl: float):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.result_ttl = result_ttl
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+    
+    @staticmethod
+    def get_runners() -> Dict[str, Callable[[List[str], Dict[str, Any]], Awaitable[Dict[str, Any]]]]:
+        """Map tool names to their analysis functions"""
+        return {
+            "semgrep": SemgrepService.analyze_files,
+            "snyk": SnykService.analyze_files,
+            "clangtidy": ClangTidyService.analyze_files,
+        }
+    
+    async def start(self) -> None:
+        """Start the worker tasks"""
+        if self._tasks:
+            return
+        
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        logger.info(f"Started {self.workers} analysis job workers")
+    
+    async def stop(self) -> None:
+        """Stop the worker tasks"""
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+    
+    async def submit(
+        self,
+        tool: str,
+        file_paths: List[str],
+        temp_dir: Optional[str],
+        config: Dict[str, Any],
+        callback_url: Optional[str] = None,
+        upload_seconds: float = 0.0,
+        baseline_id: Optional[str] = None,
+    ) -> Job:
+        """
+        Queue an analysis job
+        
+        The job owns the uploaded files and cleans them up when it finishes
+        
+        Args:
+            tool: Tool name
+            file_paths: Paths of the uploaded files
+            temp_dir: Temporary directory of the upload
+            config: Tool configuration
+            callback_url: URL that receives the job and its result on completion (optional)
+            upload_seconds: Time spent receiving the upload
+            baseline_id: Baseline whose findings are removed from the result (optional)
+        
+        Returns:
+            The queued job
+        
+        Raises:
+            JobException: If the tool is unknown or the queue is full
+        """
+        if tool not in self.get_runners():
+            raise JobException(
+                message=f"Unknown tool: {tool}",
+                status_code=400
+            )
+        
+        await self.start()
+        self._prune()
+        
+        job = Job(tool, file_paths, temp_dir, config, callback_url, upload_seconds, baseline_id)
+        
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobException(
+                message="Job queue is full, try again later",
+                status_code=503,
+                details={"queue_size": self.queue_size}
+            )
+        
+        self._jobs[job.id] = job
+        logger.info(f"Queued {tool} job {job.id} with {len(file_paths)} files")
+        return job
+    
+    def get(self, job_id: str) -> Job:
+        """
+        Get a job by id
+        
+        Raises:
+            JobException: If the job does not exist
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobException(
+                message="Job not found",
+                status_code=404,
+                details={"job_id": job_id}
+            )
+        return job
+    
+    def list_jobs(self) -> List[Job]:
+        """List known jobs, oldest first"""
+        self._prune()
+        return list(self._jobs.values())
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get job counts by status"""
+        by_status: Dict[str, int] = {}
+        for job in self._jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "by_status": by_status,
+        }
+    
+    async def _worker(self, index: int) -> None:
+        """Take jobs off the queue and run them"""
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Unexpected error in job worker {index}: {str(e)}")
+            finally:
+                self._queue.task_done()
+    
+    async def _run(self, job: Job) -> None:
+        """Run one job and deliver its callback"""
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        job.attempts += 1
+        requeued = False
+        
+        try:
+            job.result = await self.get_runners()[job.tool](job.file_paths, job.config)
+            if job.baseline_id:
+                job.result = baseline_store.apply(job.baseline_id, job.tool, job.result)
+            job.status = JOB_COMPLETED
+        
+        except AdmissionRejected as e:
+            if job.attempts > settings.JOB_MAX_RETRIES:
+                self._fail(job, e)
+            else:
+                # The tool is busy; keep the files and try again later
+                delay = max(e.retry_after, settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1))
+                logger.info(f"{job.tool} job {job.id} rejected by admission control, retrying in {delay}s")
+                job.status = JOB_QUEUED
+                job.started_at = None
+                
+                task = asyncio.create_task(self._requeue(job, delay))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+                requeued = True
+        
+        except Exception as e:
+            logger.error(f"{job.tool} job {job.id} failed: {str(e)}")
+            self._fail(job, e)
+        
+        finally:
+            if not requeued:
+                job.finished_at = time.time()
+                FileService.cleanup_analysis_files(job.file_paths, job.temp_dir)
+        
+        if job.callback_url and not requeued:
+            await self._send_callback(job)
+    
+    @staticmethod
+    def _fail(job: Job, error: Exception) -> None:
+        """Mark a job as failed with the details of an error"""
+        job.error = {
+            "message": getattr(error, "message", str(error)),
+            "details": getattr(error, "details", None),
+        }
+        job.status = JOB_FAILED
+    
+    async def _requeue(self, job: Job, delay: float) -> None:
+        """Put a job back on the queue after a delay"""
+        await asyncio.sleep(delay)
+        await self._queue.put(job)
+    
+    async def _send_callback(self, job: Job) -> None:
+        """
+        POST the finished job to its callback URL
+        
+        The request connects to an address that was just checked rather than
+        resolving the host again, so a host cannot pass the check with a
+        public address and then rebind to a private one. The Host header and,
+        for https, the TLS server name and certificate check still use the
+        host name.
+        """
+        try:
+            # The host may resolve differently than when the job was submitted
+            addresses = await check_callback_url(job.callback_url)
+        except JobException as e:
+            logger.warning(f"Refused callback for job {job.id} to {job.callback_url}: {e.message}")
+            job.callback_status = f"refused ({e.message})"
+            return
+        
+        url = httpx.URL(job.callback_url)
+        headers = {}
+        extensions = {}
+        if addresses:
+            headers["Host"] = url.netloc.decode("ascii")
+            extensions["sni_hostname"] = url.host
+            url = url.copy_with(host=addresses[0])
+        
+        try:
+            async with httpx.AsyncClient(timeout=settings.JOB_CALLBACK_TIMEOUT) as client:
+                response = await client.post(
+                    url,
+                    json=job.to_dict(include_result=True),
+                    headers=headers,
+                    extensions=extensions
+                )
+            job.callback_status = "delivered" if response.is_success else f"rejected ({response.status_code})"
+        except Exception as e:
+            logger.warning(f"Callback for job {job.id} to {job.callback_url} failed: {str(e)}")
+            job.callback_status = f"failed ({str(e)})"
+    
+    def _prune(self) -> None:
+        """Forget finished jobs older than the result TTL"""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+# Create job manager instance
+job_manager = JobManager(
+    workers=settings.JOB_WORKERS,
+    queue_size=settings.JOB_QUEUE_SIZE,
+    result_ttl=settings.JOB_RESULT_TTL,
+)
\ No newline at end of file
@@ -0,0 +1,326 @@
+import asyncio
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.tool_registry import tool_registry
+from app.utils.file_utils import ensure_directory_exists
+from app.utils.result_formatter import relocate_results
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """
+    Two-tier cache for analysis results
+    
+    Entries are keyed by a hash of the tool, tool version, normalized config
+    and the names and content hashes of the analyzed files. Hot entries live in an
+    in-memory LRU tier, and every entry is also written to an on-disk tier.
+    Both tiers evict least recently used entries once they exceed their byte limit.
+    Lookups, stores and invalidations read and write files under a lock, so
+    callers on the event loop run them in a thread. Entries left on disk by a
+    previous process are indexed by the first of these calls rather than at
+    import time.
+    """
+    
+    def __init__(self, disk_dir: Optional[str], memory_limit: int, disk_limit: int):
+        self.disk_dir = disk_dir
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._memory: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._disk_bytes = 0
+        self._indexed = not disk_dir
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "invalidations": 0,
+        }
+    
+    @staticmethod
+    def make_key(tool: str, version: Optional[str], config: Dict[str, Any], content_keys: List[Any]) -> str:
+        """
+        Build a cache key
+        
+        Args:
+            tool: Tool name
+            version: Tool version reported by --version
+            config: Normalized tool configuration
+            content_keys: Content hashes of the analyzed files, in analysis order,
+                optionally paired with their names (see get_content_keys)
+        
+        Returns:
+            Hex digest identifying the analysis
+        """
+        payload = json.dumps({
+            "tool": tool,
+            "version": version,
+            "config": config,
+            "files": content_keys,
+        }, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached entry
+        
+        Returns:
+            A fresh copy of the cached value, or None on a miss
+        """
+        with self._lock:
+            self._ensure_index()
+            item = self._memory.get(key)
+            if item is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return json.loads(item[1])
+            
+            disk_item = self._disk.get(key)
+            if disk_item is None:
+                self._counters["misses"] += 1
+                return None
+            
+            tool = disk_item[0]
+            try:
+                with open(self._disk_path(key, tool), 'rb') as f:
+                    payload = f.read()
+            except OSError as e:
+                logger.warning(f"Error reading cached result {key}: {str(e)}")
+                self._drop_disk(key)
+                self._counters["misses"] += 1
+                return None
+            
+            self._disk.move_to_end(key)
+            self._counters["disk_hits"] += 1
+            self._store_memory(key, tool, payload)
+            return json.loads(payload)
+    
+    def contains(self, key: str) -> bool:
+        """Check whether an entry is cached, without reading it or counting a lookup"""
+        with self._lock:
+            self._ensure_index()
+            return key in self._memory or key in self._disk
+    
+    def put(self, key: str, tool: str, value: Dict[str, Any]) -> None:
+        """
+        Store an entry in both tiers
+        
+        Args:
+            key: Cache key from make_key
+            tool: Tool name, used for version invalidation
+            value: JSON-serializable value
+        """
+        payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        
+        with self._lock:
+            self._ensure_index()
+            self._counters["stores"] += 1
+            self._store_memory(key, tool, payload)
+            
+            if self.disk_dir and len(payload) <= self.disk_limit:
+                try:
+                    path = self._disk_path(key, tool)
+                    ensure_directory_exists(os.path.dirname(path))
+                    temp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(temp_path, 'wb') as f:
+                        f.write(payload)
+                    os.replace(temp_path, path)
+                except Exception as e:
+                    logger.warning(f"Error writing cached result {key}: {str(e)}")
+                    return
+                
+                self._drop_disk(key, remove_file=False)
+                self._disk[key] = (tool, len(payload))
+                self._disk_bytes += len(payload)
+                self._evict_disk()
+    
+    def get_results(self, key: str, items_key: str, file_paths: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Get cached analysis results for the current files
+        
+        Args:
+            key: Cache key from make_key
+            items_key: Key of the list of findings in the results
+            file_paths: Paths of the files being analyzed now
+        
+        Returns:
+            Formatted results with file paths rewritten to file_paths, or None on a miss
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None
+        
+        results = relocate_results(entry["results"], items_key, entry["files"], file_paths)
+        results["stats"]["cached"] = True
+        return results
+    
+    def put_results(self, key: str, tool: str, file_paths: List[str], results: Dict[str, Any]) -> None:
+        """
+        Store formatted analysis results along with the paths they refer to
+        
+        Args:
+            key: Cache key from make_key
+            tool: Tool name
+            file_paths: Paths of the analyzed files
+            results: Formatted results
+        """
+        self.put(key, tool, {"files": file_paths, "results": results})
+    
+    def invalidate_tool(self, tool: str) -> int:
+        """
+        Drop every entry produced by a tool
+        
+        Entries leave the index under the lock; their files are deleted after
+        it is released, so lookups are not held up by the deletions.
+        
+        Args:
+            tool: Tool name
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self._ensure_index()
+            memory_keys = [key for key, item in self._memory.items() if item[0] == tool]
+            for key in memory_keys:
+                self._memory_bytes -= len(self._memory.pop(key)[1])
+            
+            disk_keys = [key for key, item in self._disk.items() if item[0] == tool]
+            for key in disk_keys:
+                self._drop_disk(key, remove_file=False)
+            
+            removed = len(set(memory_keys) | set(disk_keys))
+            self._counters["invalidations"] += removed
+        
+        for key in disk_keys:
+            try:
+                os.unlink(self._disk_path(key, tool))
+            except OSError:
+                pass
+        
+        if removed:
+            logger.info(f"Invalidated {removed} cached {tool} results")
+        
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes (the disk tier counts once it is indexed)"""
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_limit": self.memory_limit,
+                "disk_indexed": self._indexed,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "disk_limit": self.disk_limit,
+            }
+    
+    def _store_memory(self, key: str, tool: str, payload: bytes) -> None:
+        """Insert an entry into the memory tier and evict down to the limit"""
+        if len(payload) > self.memory_limit:
+            return
+        
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[1])
+        
+        self._memory[key] = (tool, payload)
+        self._memory_bytes += len(payload)
+        
+        while self._memory_bytes > self.memory_limit and self._memory:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._counters["memory_evictions"] += 1
+    
+    def _evict_disk(self) -> None:
+        """Evict least recently used disk entries down to the limit"""
+        while self._disk_bytes > self.disk_limit and self._disk:
+            key = next(iter(self._disk))
+            self._drop_disk(key)
+            self._counters["disk_evictions"] += 1
+    
+    def _drop_disk(self, key: str, remove_file: bool = True) -> None:
+        """Remove an entry from the disk tier"""
+        item = self._disk.pop(key, None)
+        if item is None:
+            return
+        
+        self._disk_bytes -= item[1]
+        
+        if remove_file:
+            try:
+                os.unlink(self._disk_path(key, item[0]))
+            except OSError:
+                pass
+    
+    def _disk_path(self, key: str, tool: str) -> str:
+        """Get the path of the file holding an entry"""
+        return os.path.join(self.disk_dir, key[:2], f"{tool}-{key}.json")
+    
+    def _ensure_index(self) -> None:
+        """Index the disk tier on first use; the caller holds the lock"""
+        if not self._indexed:
+            self._indexed = True
+            self._load_disk_index()
+    
+    def _load_disk_index(self) -> None:
+        """Index entries left on disk by a previous process, oldest access first"""
+        found = []
+        
+        try:
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    if not name.endswith(".json") or "-" not in name:
+                        continue
+                    tool, key = name[:-len(".json")].rsplit("-", 1)
+                    stat = os.stat(os.path.join(root, name))
+                    found.append((stat.st_atime, key, tool, stat.st_size))
+        except OSError as e:
+            logger.warning(f"Error indexing result cache {self.disk_dir}: {str(e)}")
+        
+        for _, key, tool, size in sorted(found):
+            self._disk[key] = (tool, size)
+            self._disk_bytes += size
+        
+        self._evict_disk()
+
+# Create cache instance
+result_cache = ResultCache(
+    disk_dir=os.path.join(settings.CACHE_DIR, "results") if settings.RESULT_CACHE_ENABLED else None,
+    memory_limit=settings.RESULT_CACHE_MEMORY_BYTES,
+    disk_limit=settings.RESULT_CACHE_DISK_BYTES,
+)
+
+# Invalidations started by version changes, kept so they are not garbage collected
+_invalidations: Set[asyncio.Task] = set()
+
+def _on_version_change(tool: str, old_version: Optional[str], new_version: Optional[str]) -> None:
+    """Drop the results of an older tool version in a thread, off the event loop"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        result_cache.invalidate_tool(tool)
+        return
+    
+    task = loop.create_task(asyncio.to_thread(result_cache.invalidate_tool, tool))
+    _invalidations.add(task)
+    task.add_done_callback(_invalidations.discard)
+
+# Drop results produced by an older tool version as soon as the registry notices the upgrade
+tool_registry.add_listener(_on_version_change)
\ No newline at end of file
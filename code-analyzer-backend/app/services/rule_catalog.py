@@ -0,0 +1,311 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.file_utils import ensure_directory_exists, find_files
+from app.utils.search_index import SearchIndex
+from app.utils.yaml_parser import parse_semgrep_rule_file, extract_semgrep_rule_metadata
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout changes so stale snapshots are ignored
+SNAPSHOT_FORMAT = 1
+
+class SemgrepRuleCatalog:
+    """
+    In-process catalog of the Semgrep rules in one directory
+    
+    Rule files are keyed by path and (mtime, size). A refresh only re-parses
+    files that changed since the last scan, and the catalog is persisted to a
+    JSON snapshot so a restart does not have to parse every file again.
+    Lookups by id, language and severity are served from memory.
+    """
+    
+    def __init__(self, rules_dir: str, snapshot_path: Optional[str] = None):
+        self.rules_dir = rules_dir
+        self.snapshot_path = snapshot_path
+        self.version = ""
+        self.last_scan = 0.0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._rules: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self._by_language: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_severity: Dict[str, List[Dict[str, Any]]] = {}
+        self._search_index: Optional[SearchIndex] = None
+        self._lock = threading.Lock()
+        
+        if snapshot_path:
+            self._load_snapshot()
+    
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Bring the catalog up to date with the rules directory
+        
+        Args:
+            force: Rescan even if the last scan is within the refresh interval
+        
+        Returns:
+            True if any rule file was added, changed or removed
+        """
+        with self._lock:
+            if not force and self.last_scan and time.time() - self.last_scan < settings.SEMGREP_RULES_REFRESH_INTERVAL:
+                return False
+            
+            rule_files = find_files(self.rules_dir, "*.yml") + find_files(self.rules_dir, "*.yaml")
+            
+            if not rule_files:
+                logger.warning(f"No rule files found in {self.rules_dir}")
+            
+            entries = {}
+            parsed = 0
+            
+            for rule_file in rule_files:
+                try:
+                    stat = os.stat(rule_file)
+                except OSError as e:
+                    logger.warning(f"Could not stat rule file {rule_file}: {str(e)}")
+                    continue
+                
+                entry = self._entries.get(rule_file)
+                if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                    entry = self._parse_entry(rule_file, stat.st_mtime_ns, stat.st_size)
+                    parsed += 1
+                
+                entries[rule_file] = entry
+            
+            changed = parsed > 0 or len(entries) != len(self._entries)
+            self._entries = entries
+            self.last_scan = time.time()
+            
+            if changed or not self.version:
+                self._rebuild_indexes()
+                logger.info(f"Semgrep rule catalog for {self.rules_dir}: parsed {parsed} of {len(entries)} files, {len(self._rules)} rules")
+            
+            if changed:
+                self._save_snapshot()
+            
+            return changed
+    
+    def list_rules(self, language: Optional[str] = None, severity: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List rule metadata, optionally filtered by language and severity
+        
+        Args:
+            language: Only include rules targeting this language
+            severity: Only include rules with this severity
+        
+        Returns:
+            List of rule metadata
+        """
+        if language is None and severity is None:
+            return list(self._rules)
+        
+        if language is not None:
+            candidates = self._by_language.get(language.lower(), [])
+        else:
+            candidates = self._by_severity.get(severity.upper(), [])
+        
+        if language is not None and severity is not None:
+            candidates = [rule for rule in candidates if str(rule.get("severity", "INFO")).upper() == severity.upper()]
+        
+        return list(candidates)
+    
+    def get_rule(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        """Get the metadata of a rule by id"""
+        return self._by_id.get(rule_id)
+    
+    def get_definition(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        """Get the full rule definition (as written in the rule file) by id"""
+        return self._definitions.get(rule_id)
+    
+    def get_search_index(self) -> SearchIndex:
+        """Get the full-text index of the rules, building it on first use after a change"""
+        index = self._search_index
+        if index is None or index.version != self.version:
+            index = SearchIndex(
+                self._rules,
+                text_fields=["id", "name", "description", "languages", "severity"],
+                facet_fields={
+                    "languages": lambda value: value.lower(),
+                    "severity": lambda value: value.upper(),
+                },
+                version=self.version
+            )
+            self._search_index = index
+        return index
+    
+    def get_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the catalog entry for a rule file
+        
+        Returns None if the file is not in the catalog or changed since it was parsed
+        """
+        entry = self._entries.get(file_path)
+        if entry is None:
+            return None
+        
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            return None
+        
+        return entry
+    
+    def get_file_stamp(self, file_path: str) -> Optional[Tuple[int, int]]:
+        """Get the (mtime_ns, size) recorded for a rule file"""
+        entry = self._entries.get(file_path)
+        if entry is None:
+            return None
+        return entry["mtime_ns"], entry["size"]
+    
+    def _parse_entry(self, rule_file: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+        """Parse a rule file into a catalog entry"""
+        entry = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "file_name": os.path.basename(rule_file),
+            "rules": [],
+            "metadata": []
+        }
+        
+        try:
+            rule_data = parse_semgrep_rule_file(rule_file)
+            rule_meta = extract_semgrep_rule_metadata(rule_data)
+            
+            for rule in rule_meta.get("rules", []):
+                rule["path"] = rule_data["file_path"]
+                entry["metadata"].append(rule)
+            
+            entry["rules"] = rule_data.get("rules", [])
+        
+        except Exception as e:
+            # Keep the entry so the file is not re-parsed until it changes
+            logger.warning(f"Error parsing rule file {rule_file}: {str(e)}")
+        
+        return entry
+    
+    def _rebuild_indexes(self) -> None:
+        """Rebuild the lookup indexes and version from the entries"""
+        rules = []
+        by_id = {}
+        definitions = {}
+        by_language: Dict[str, List[Dict[str, Any]]] = {}
+        by_severity: Dict[str, List[Dict[str, Any]]] = {}
+        digest = hashlib.sha256()
+        
+        for rule_file in sorted(self._entries):
+            entry = self._entries[rule_file]
+            digest.update(f"{rule_file}\0{entry['mtime_ns']}\0{entry['size']}\n".encode("utf-8"))
+            
+            for rule in entry["metadata"]:
+                rules.append(rule)
+                by_id.setdefault(rule["id"], rule)
+                by_severity.setdefault(str(rule.get("severity", "INFO")).upper(), []).append(rule)
+                
+                for language in rule.get("languages", []):
+                    by_language.setdefault(str(language).lower(), []).append(rule)
+            
+            for definition in entry["rules"]:
+                definitions.setdefault(definition["id"], definition)
+        
+        self._rules = rules
+        self._by_id = by_id
+        self._definitions = definitions
+        self._by_language = by_language
+        self._by_severity = by_severity
+        self.version = digest.hexdigest()[:16]
+    
+    def _load_snapshot(self) -> None:
+        """Load entries from the on-disk snapshot, if one exists"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            
+            if snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("rules_dir") != self.rules_dir:
+                logger.info(f"Ignoring incompatible rule catalog snapshot {self.snapshot_path}")
+                return
+            
+            self._entries = snapshot.get("entries", {})
+            logger.debug(f"Loaded {len(self._entries)} rule files from snapshot {self.snapshot_path}")
+        
+        except Exception as e:
+            logger.warning(f"Error loading rule catalog snapshot {self.snapshot_path}: {str(e)}")
+            self._entries = {}
+    
+    def _save_snapshot(self) -> None:
+        """Persist the entries to the on-disk snapshot"""
+        if not self.snapshot_path:
+            return
+        
+        try:
+            ensure_directory_exists(os.path.dirname(self.snapshot_path))
+            temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "format": SNAPSHOT_FORMAT,
+                    "rules_dir": self.rules_dir,
+                    "entries": self._entries
+                }, f, default=str)
+            
+            os.replace(temp_path, self.snapshot_path)
+        
+        except Exception as e:
+            logger.warning(f"Error saving rule catalog snapshot {self.snapshot_path}: {str(e)}")
+
+# Catalogs by rules directory, least recently used first
+_catalogs: "OrderedDict[str, SemgrepRuleCatalog]" = OrderedDict()
+_catalogs_lock = threading.Lock()
+
+def get_rule_catalog(rules_dir: str) -> SemgrepRuleCatalog:
+    """
+    Get the catalog for a rules directory, creating it on first use
+    
+    Rules directories come from requests, so at most
+    SEMGREP_MAX_RULE_CATALOGS catalogs are kept; the least recently used one
+    is dropped together with its snapshot.
+    
+    Args:
+        rules_dir: Path to the rules directory
+    
+    Returns:
+        Rule catalog (not refreshed)
+    """
+    rules_dir = os.path.abspath(rules_dir)
+    evicted = []
+    
+    with _catalogs_lock:
+        catalog = _catalogs.get(rules_dir)
+        if catalog is None:
+            name = hashlib.sha256(rules_dir.encode("utf-8")).hexdigest()[:16]
+            snapshot_path = os.path.join(settings.CACHE_DIR, "semgrep-rules", f"{name}.json")
+            catalog = SemgrepRuleCatalog(rules_dir, snapshot_path)
+            _catalogs[rules_dir] = catalog
+            
+            while len(_catalogs) > max(1, settings.SEMGREP_MAX_RULE_CATALOGS):
+                evicted.append(_catalogs.popitem(last=False)[1])
+        else:
+            _catalogs.move_to_end(rules_dir)
+    
+    for old in evicted:
+        logger.info(f"Dropping Semgrep rule catalog for {old.rules_dir}")
+        if old.snapshot_path:
+            try:
+                os.unlink(old.snapshot_path)
+            except OSError:
+                pass
+    
+    return catalog
\ No newline at end of file
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.errors import AppException
+from app.services.baseline_service import baseline_store
+from app.services.clangtidy_service import ClangTidyService
+from app.services.file_service import FileService
+from app.services.semgrep_service import SemgrepService
+from app.services.snyk_service import SnykService
+from app.services.tool_registry import tool_registry
+
+logger = logging.getLogger(__name__)
+
+# File categories (from FileService.categorize_files) each tool is run on
+TOOL_CATEGORIES = {
+    "semgrep": ["c_cpp", "web", "other"],
+    "snyk": ["config"],
+    "clangtidy": ["c_cpp"],
+}
+
+class ScanService:
+    """Service for running several analysis tools over one upload"""
+    
+    @staticmethod
+    def get_runners() -> Dict[str, Callable[[List[str], Dict[str, Any]], Awaitable[Dict[str, Any]]]]:
+        """Map tool names to their analysis functions"""
+        return {
+            "semgrep": SemgrepService.analyze_files,
+            "snyk": SnykService.analyze_files,
+            "clangtidy": ClangTidyService.analyze_files,
+        }
+    
+    @staticmethod
+    def route_files(file_paths: List[str]) -> Dict[str, List[str]]:
+        """
+        Route files to the tools that can analyze them
+        
+        Args:
+            file_paths: List of file paths
+        
+        Returns:
+            Dictionary mapping tool names to the files they should analyze
+        """
+        categories = FileService.categorize_files(file_paths)
+        
+        return {
+            tool: [path for category in tool_categories for path in categories[category]]
+            for tool, tool_categories in TOOL_CATEGORIES.items()
+        }
+    
+    @staticmethod
+    async def scan_files(
+        file_paths: List[str],
+        configs: Dict[str, Optional[Dict[str, Any]]],
+        baseline_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze files with every configured tool concurrently
+        
+        Tools without a configuration, without relevant files or that are not
+        installed are skipped without starting a process
+        
+        Args:
+            file_paths: List of file paths to analyze
+            configs: Dictionary mapping tool names to their configuration
+            baseline_id: Baseline whose findings are removed from every tool's results (optional)
+        
+        Returns:
+            Per-tool sections with status, timing and results, plus overall stats
+        
+        Raises:
+            BaselineException: If the baseline does not exist
+        """
+        # Fail before starting any tool if the baseline does not exist
+        if baseline_id:
+            baseline_store.get(baseline_id)
+        
+        routes = ScanService.route_files(file_paths)
+        runners = ScanService.get_runners()
+        sections: Dict[str, Dict[str, Any]] = {}
+        pending = {}
+        
+        for tool, tool_files in routes.items():
+            config = configs.get(tool)
+            
+            if config is None:
+                sections[tool] = ScanService._skipped(tool_files, "not configured")
+            elif not tool_files:
+                sections[tool] = ScanService._skipped(tool_files, "no relevant files")
+            elif not await tool_registry.is_available(tool):
+                sections[tool] = ScanService._skipped(tool_files, "tool not available")
+            else:
+                pending[tool] = ScanService._run_tool(runners[tool], tool, tool_files, config)
+        
+        started = time.perf_counter()
+        completed = await asyncio.gather(*pending.values())
+        
+        for tool, section in zip(pending, completed):
+            if baseline_id and section["status"] == "completed":
+                section["results"] = baseline_store.apply(baseline_id, tool, section["results"])
+            sections[tool] = section
+        
+        return {
+            "tools": {tool: sections[tool] for tool in routes},
+            "stats": {
+                "files_uploaded": len(file_paths),
+                "file_types": FileService.get_file_types(file_paths),
+                "tools_run": len(pending),
+                "tools_failed": sum(1 for section in completed if section["status"] == "failed"),
+                "duration_seconds": round(time.perf_counter() - started, 4)
+            }
+        }
+    
+    @staticmethod
+    async def _run_tool(
+        runner: Callable[[List[str], Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        tool: str,
+        file_paths: List[str],
+        config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run one tool and build its section of the scan result"""
+        started = time.perf_counter()
+        
+        try:
+            results = await runner(file_paths, config)
+            return ScanService._section("completed", file_paths, started, results=results)
+        
+        except AppException as e:
+            logger.error(f"{tool} failed during scan: {e.message}")
+            return ScanService._section("failed", file_paths, started, error={"message": e.message, "details": e.details})
+        
+        except Exception as e:
+            logger.error(f"{tool} failed during scan: {str(e)}")
+            return ScanService._section("failed", file_paths, started, error={"message": str(e)})
+    
+    @staticmethod
+    def _skipped(file_paths: List[str], reason: str) -> Dict[str, Any]:
+        """Build the section for a tool that was not run"""
+        return ScanService._section("skipped", file_paths, None, reason=reason)
+    
+    @staticmethod
+    def _section(
+        status: str,
+        file_paths: List[str],
+        started: Optional[float],
+        reason: Optional[str] = None,
+        results: Optional[Dict[str, Any]] = None,
+        error: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build a tool section with every field of ToolScanSection, so it can be returned as is"""
+        return {
+            "status": status,
+            "reason": reason,
+            "files": len(file_paths),
+            "duration_seconds": round(time.perf_counter() - started, 4) if started is not None else 0.0,
+            "results": results,
+            "error": error
+        }
\ No newline at end of file
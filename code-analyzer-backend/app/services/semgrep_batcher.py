@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.errors import AdmissionRejected
+
+logger = logging.getLogger(__name__)
+
+# Runs Semgrep over (rules_path, selected_rules, file_paths), returning (output, resource usage)
+SemgrepRunner = Callable[[str, List[str], List[str]], Awaitable[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]]
+
+class _PendingRequest:
+    """One caller waiting for its share of a batch"""
+    
+    def __init__(self, file_paths: List[str]):
+        self.file_paths = file_paths
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+class _Batch:
+    """Requests with the same normalized config collected during one window"""
+    
+    def __init__(self, rules_path: str, selected_rules: List[str]):
+        self.rules_path = rules_path
+        self.selected_rules = selected_rules
+        self.requests: List[_PendingRequest] = []
+        self.file_count = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class SemgrepBatcher:
+    """
+    Combines concurrent Semgrep requests that share a ruleset into one process
+    
+    Requests with the same rules directory and set of selected rules that
+    arrive within `window` seconds of the first one are run as a single
+    Semgrep invocation over all of their files, so rule loading and start-up
+    are paid once. Findings and errors are split back to each caller by
+    target path. If a batched run fails, each request is retried on its own
+    so one bad upload cannot fail the others.
+    """
+    
+    def __init__(self, runner: SemgrepRunner, window: float, max_files: int):
+        self.runner = runner
+        self.window = window
+        self.max_files = max_files
+        self._batches: Dict[Tuple[str, Tuple[str, ...]], _Batch] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._counters = {
+            "requests": 0,
+            "runs": 0,
+            "batched_requests": 0,
+            "largest_batch": 0,
+            "fallbacks": 0,
+        }
+    
+    async def submit(
+        self,
+        rules_path: str,
+        selected_rules: List[str],
+        file_paths: List[str]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Analyze files, possibly together with other requests
+        
+        Args:
+            rules_path: Path to the rules directory
+            selected_rules: IDs of the rules to run
+            file_paths: List of file paths to analyze
+        
+        Returns:
+            Tuple of (Semgrep output restricted to file_paths, run info with
+            "resources" of the shared run and "batch" size details)
+        
+        Raises:
+            SemgrepException: If Semgrep fails for this request
+            AdmissionRejected: If Semgrep is too busy to take the run
+        """
+        self._counters["requests"] += 1
+        
+        if self.window <= 0:
+            return await self._run_alone(rules_path, selected_rules, file_paths)
+        
+        key = (os.path.abspath(rules_path), tuple(sorted(set(selected_rules))))
+        batch = self._batches.get(key)
+        
+        if batch is None:
+            batch = _Batch(key[0], list(key[1]))
+            self._batches[key] = batch
+            batch.timer = asyncio.get_running_loop().call_later(self.window, self._flush, key)
+        
+        request = _PendingRequest(file_paths)
+        batch.requests.append(request)
+        batch.file_count += len(file_paths)
+        
+        if batch.file_count >= self.max_files:
+            self._flush(key)
+        
+        return await request.future
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get batching counters"""
+        runs = self._counters["runs"]
+        return {
+            "window": self.window,
+            "max_files": self.max_files,
+            **self._counters,
+            "requests_per_run": round(self._counters["batched_requests"] / runs, 2) if runs else 0.0,
+            "pending_batches": len(self._batches),
+        }
+    
+    def _flush(self, key: Tuple[str, Tuple[str, ...]]) -> None:
+        """Close the batch for a key and start running it"""
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        
+        if batch.timer is not None:
+            batch.timer.cancel()
+        
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run_batch(self, batch: _Batch) -> None:
+        """Run a closed batch and hand each request its results"""
+        requests = [request for request in batch.requests if not request.future.done()]
+        if not requests:
+            return
+        
+        all_paths = [path for request in requests for path in request.file_paths]
+        batch_info = {"requests": len(requests), "files": len(all_paths)}
+        
+        self._counters["runs"] += 1
+        self._counters["batched_requests"] += len(requests)
+        self._counters["largest_batch"] = max(self._counters["largest_batch"], len(requests))
+        
+        try:
+            output, usage = await self.runner(batch.rules_path, batch.selected_rules, all_paths)
+        
+        except Exception as e:
+            if len(requests) == 1 or isinstance(e, AdmissionRejected):
+                for request in requests:
+                    self._resolve(request, exception=e)
+                return
+            
+            # Retry each request alone so a failure stays with the request that caused it
+            logger.warning(f"Batched Semgrep run over {len(requests)} requests failed, retrying individually: {str(e)}")
+            self._counters["fallbacks"] += 1
+            await asyncio.gather(*(
+                self._run_single(batch, request) for request in requests
+            ))
+            return
+        
+        if len(requests) > 1:
+            logger.info(f"Ran {len(requests)} Semgrep requests ({len(all_paths)} files) in one process")
+        
+        for request in requests:
+            self._resolve(request, result=(
+                self._split_output(output, request.file_paths),
+                {"resources": usage, "batch": batch_info}
+            ))
+    
+    async def _run_single(self, batch: _Batch, request: _PendingRequest) -> None:
+        """Run one request of a failed batch on its own"""
+        try:
+            result = await self._run_alone(batch.rules_path, batch.selected_rules, request.file_paths)
+        except Exception as e:
+            self._resolve(request, exception=e)
+            return
+        
+        self._resolve(request, result=result)
+    
+    async def _run_alone(
+        self,
+        rules_path: str,
+        selected_rules: List[str],
+        file_paths: List[str]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run Semgrep for a single request"""
+        output, usage = await self.runner(rules_path, selected_rules, file_paths)
+        return output, {"resources": usage, "batch": {"requests": 1, "files": len(file_paths)}}
+    
+    @staticmethod
+    def _resolve(request: _PendingRequest, result: Any = None, exception: Optional[BaseException] = None) -> None:
+        """Complete a request's future unless its caller went away"""
+        if request.future.done():
+            return
+        
+        if exception is not None:
+            request.future.set_exception(exception)
+        else:
+            request.future.set_result(result)
+    
+    @staticmethod
+    def _split_output(output: Dict[str, Any], file_paths: List[str]) -> Dict[str, Any]:
+        """
+        Restrict Semgrep output to the findings and errors of some files
+        
+        Errors that do not name a path (e.g. rule errors) are kept for every caller
+        """
+        paths = set(file_paths) | {os.path.abspath(path) for path in file_paths}
+        
+        def belongs(item: Dict[str, Any]) -> bool:
+            path = item.get("path")
+            return path is None or path in paths or os.path.abspath(path) in paths
+        
+        split = {key: value for key, value in output.items() if key not in ("results", "errors", "paths")}
+        split["results"] = [item for item in output.get("results", []) if belongs(item)]
+        split["errors"] = [item for item in output.get("errors", []) if belongs(item)]
+        
+        if "results" not in output:
+            del split["results"]
+        
+        return split
\ No newline at end of file
@@ -0,0 +1,138 @@
+import os
+import glob
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Tuple
+
+from app.core.config import settings
+from app.core.errors import SemgrepException
+from app.services.rule_catalog import SemgrepRuleCatalog
+from app.utils.file_utils import ensure_directory_exists
+from app.utils.yaml_parser import generate_semgrep_config, serialize_yaml
+
+logger = logging.getLogger(__name__)
+
+class SemgrepConfigCache:
+    """
+    On-disk cache of merged Semgrep configs, one per selected-rule set
+    
+    The selected rule ids are resolved through the rule catalog to their
+    full definitions and written as a single config file. The file name is
+    derived from the sorted rule ids and the (mtime, size) of the rule files
+    they come from, so a repeated selection is served by an existing file
+    without any YAML work, and editing a rule file produces a new one.
+    Older configs for the same selection are removed when a new one is written.
+    """
+    
+    def __init__(self, config_dir: str):
+        self.config_dir = config_dir
+        self._paths: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "materialized": 0,
+        }
+    
+    def get_config_path(self, catalog: SemgrepRuleCatalog, rule_ids: List[str]) -> str:
+        """
+        Get the path of the merged config for a set of rules, writing it if needed
+        
+        Args:
+            catalog: Up-to-date rule catalog the rules come from
+            rule_ids: IDs of the rules to include
+        
+        Returns:
+            Path to the Semgrep config file
+        
+        Raises:
+            SemgrepException: If a rule id is not in the catalog (status 400)
+        """
+        rule_ids = sorted(set(rule_ids))
+        selection_key, stamp_key = self._make_key(catalog, rule_ids)
+        config_path = os.path.join(self.config_dir, f"{selection_key}-{stamp_key}.yml")
+        
+        with self._lock:
+            if self._paths.get(selection_key) == config_path and os.path.exists(config_path):
+                self._counters["hits"] += 1
+                return config_path
+            
+            if os.path.exists(config_path):
+                self._paths[selection_key] = config_path
+                self._counters["hits"] += 1
+                return config_path
+            
+            definitions = [catalog.get_definition(rule_id) for rule_id in rule_ids]
+            self._write_config(config_path, serialize_yaml(generate_semgrep_config(definitions)))
+            self._remove_stale(selection_key, config_path)
+            
+            self._paths[selection_key] = config_path
+            self._counters["materialized"] += 1
+            logger.info(f"Materialized Semgrep config with {len(rule_ids)} rules at {config_path}")
+            
+            return config_path
+    
+    @staticmethod
+    def find_missing_rules(catalog: SemgrepRuleCatalog, rule_ids: List[str]) -> List[str]:
+        """Get the rule ids that have no definition in the catalog"""
+        return sorted({rule_id for rule_id in rule_ids if catalog.get_definition(rule_id) is None})
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of known configs and counters"""
+        return {
+            "config_dir": self.config_dir,
+            "selections": len(self._paths),
+            **self._counters,
+        }
+    
+    def _make_key(self, catalog: SemgrepRuleCatalog, rule_ids: List[str]) -> Tuple[str, str]:
+        """
+        Hash a sorted selection and the stamps of the rule files it uses
+        
+        Returns:
+            Tuple of (hash of the rule ids, hash of the rule file stamps)
+        """
+        missing = self.find_missing_rules(catalog, rule_ids)
+        if missing:
+            raise SemgrepException(
+                message=f"Unknown Semgrep rules: {', '.join(missing)}",
+                details={"unknown_rules": missing, "rules_path": catalog.rules_dir},
+                status_code=400
+            )
+        
+        selection = hashlib.sha256()
+        stamps = hashlib.sha256()
+        
+        for rule_id in rule_ids:
+            selection.update(f"{rule_id}\n".encode("utf-8"))
+            
+            rule = catalog.get_rule(rule_id) or {}
+            rule_file = rule.get("path")
+            stamp = catalog.get_file_stamp(rule_file) if rule_file else None
+            stamps.update(f"{rule_id}\0{rule_file}\0{stamp}\n".encode("utf-8"))
+        
+        return selection.hexdigest()[:16], stamps.hexdigest()[:16]
+    
+    def _write_config(self, config_path: str, content: str) -> None:
+        """Write a config atomically so concurrent readers never see a partial file"""
+        ensure_directory_exists(self.config_dir)
+        temp_path = f"{config_path}.{os.getpid()}.tmp"
+        
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        os.replace(temp_path, config_path)
+    
+    def _remove_stale(self, selection_key: str, config_path: str) -> None:
+        """Remove configs of the same selection built from older rule files"""
+        for stale_path in glob.glob(os.path.join(self.config_dir, f"{selection_key}-*.yml")):
+            if stale_path == config_path:
+                continue
+            
+            try:
+                os.unlink(stale_path)
+            except OSError as e:
+                logger.warning(f"Could not remove stale Semgrep config {stale_path}: {str(e)}")
+
+# Create config cache instance
+semgrep_config_cache = SemgrepConfigCache(os.path.join(settings.CACHE_DIR, "semgrep-configs"))
\ No newline at end of file
@@ -1,15 +1,23 @@
+import asyncio
 import os
 import json
 import logging
-import tempfile
 from typing import Dict, List, Any, Optional, Tuple
 
 from app.core.config import settings
-from app.core.errors import SemgrepException
+from app.core.errors import SemgrepException, AdmissionRejected
+from app.services.result_cache import ResultCache, result_cache
+from app.services.rule_catalog import SemgrepRuleCatalog, get_rule_catalog
+from app.services.semgrep_batcher import SemgrepBatcher
+from app.services.semgrep_config_cache import SemgrepConfigCache, semgrep_config_cache
+from app.services.tool_registry import tool_registry
+from app.utils.admission import admission_controller
 from app.utils.command_executor import run_command_async
-from app.utils.file_utils import find_files, write_file
-from app.utils.yaml_parser import parse_semgrep_rule_file, extract_semgrep_rule_metadata, generate_semgrep_config, serialize_yaml
-from app.utils.result_formatter import format_semgrep_results
+from app.utils.resource_limits import ResourceProfile
+from app.utils.file_utils import get_content_keys
+from app.utils.yaml_parser import parse_semgrep_rule_file, extract_semgrep_rule_metadata
+from app.utils.result_formatter import format_semgrep_results, relocate_results
+from app.utils.singleflight import analysis_flights
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +25,67 @@ class SemgrepService:
     """Service for Semgrep operations"""
     
     @staticmethod
-    async def list_rules(rules_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def get_catalog(rules_path: Optional[str] = None) -> SemgrepRuleCatalog:
+        """
+        Get the up-to-date rule catalog for a rules directory
+        
+        Only rule files that changed since the last refresh are re-parsed,
+        and the directory is rescanned at most once per refresh interval
+        
+        Args:
+            rules_path: Path to the rules directory (optional, uses config default if not provided)
+        
+        Returns:
+            Rule catalog
+        """
+        catalog = get_rule_catalog(rules_path or settings.SEMGREP_RULES_PATH)
+        await asyncio.to_thread(catalog.refresh)
+        return catalog
+    
+    @staticmethod
+    async def get_rules_version(rules_path: Optional[str] = None) -> str:
+        """
+        Get a version string that changes whenever the rules in a directory change
+        
+        Args:
+            rules_path: Path to the rules directory (optional, uses config default if not provided)
+        
+        Returns:
+            Rules directory and catalog version
+        """
+        catalog = await SemgrepService.get_catalog(rules_path)
+        return f"{catalog.rules_dir}:{catalog.version}"
+    
+    @staticmethod
+    def get_rule_file_version(rule_path: str) -> Optional[str]:
+        """
+        Get a version string that changes whenever a rule file changes
+        
+        Args:
+            rule_path: Path to the rule file
+        
+        Returns:
+            Path, modification time and size, or None if the file cannot be read
+        """
+        try:
+            stat = os.stat(rule_path)
+        except OSError:
+            return None
+        return f"{os.path.abspath(rule_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    
+    @staticmethod
+    async def list_rules(
+        rules_path: Optional[str] = None,
+        language: Optional[str] = None,
+        severity: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         List available Semgrep rules
         
         Args:
             rules_path: Path to the rules directory (optional, uses config default if not provided)
+            language: Only list rules targeting this language (optional)
+            severity: Only list rules with this severity (optional)
         
         Returns:
             List of rule metadata
@@ -34,31 +97,8 @@ class SemgrepService:
         rules_dir = rules_path or settings.SEMGREP_RULES_PATH
         
         try:
-            # Find all YAML files in the rules directory
-            rule_files = find_files(rules_dir, "*.yml") + find_files(rules_dir, "*.yaml")
-            
-            if not rule_files:
-                logger.warning(f"No rule files found in {rules_dir}")
-                return []
-            
-            rules = []
-            
-            # Parse each rule file
-            for rule_file in rule_files:
-                try:
-                    rule_data = parse_semgrep_rule_file(rule_file)
-                    rule_meta = extract_semgrep_rule_metadata(rule_data)
-                    
-                    # Flatten rules metadata
-                    for rule in rule_meta.get("rules", []):
-                        rule["path"] = rule_data["file_path"]
-                        rules.append(rule)
-                
-                except Exception as e:
-                    logger.warning(f"Error parsing rule file {rule_file}: {str(e)}")
-                    continue
-            
-            return rules
+            catalog = await SemgrepService.get_catalog(rules_dir)
+            return catalog.list_rules(language=language, severity=severity)
         
         except Exception as e:
             logger.error(f"Error listing Semgrep rules: {str(e)}")
@@ -67,11 +107,65 @@ class SemgrepService:
                 details={"rules_path": rules_dir}
             )
     
+    @staticmethod
+    async def search_rules(
+        rules_path: Optional[str] = None,
+        query: Optional[str] = None,
+        language: Optional[str] = None,
+        severity: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Search Semgrep rules by id, name, message, language and severity
+        
+        Args:
+            rules_path: Path to the rules directory (optional, uses config default if not provided)
+            query: Words that must all appear in the rule (optional)
+            language: Only include rules targeting this language (optional)
+            severity: Only include rules with this severity (optional)
+            limit: Maximum number of rules to return
+            cursor: Cursor from the previous page (optional)
+        
+        Returns:
+            Page of rules with the total, next cursor and facet counts
+        
+        Raises:
+            SemgrepException: If the cursor is invalid or rules cannot be searched
+        """
+        rules_dir = rules_path or settings.SEMGREP_RULES_PATH
+        
+        try:
+            catalog = await SemgrepService.get_catalog(rules_dir)
+            return catalog.get_search_index().search(
+                query=query,
+                filters={"languages": language, "severity": severity},
+                limit=limit,
+                cursor=cursor
+            )
+        
+        except ValueError as e:
+            raise SemgrepException(
+                message=str(e),
+                details={"cursor": cursor},
+                status_code=400
+            )
+        
+        except Exception as e:
+            logger.error(f"Error searching Semgrep rules: {str(e)}")
+            raise SemgrepException(
+                message=f"Error searching Semgrep rules: {str(e)}",
+                details={"rules_path": rules_dir}
+            )
+    
     @staticmethod
     async def get_rule_content(rule_path: str) -> Dict[str, Any]:
         """
         Get the content of a specific Semgrep rule
         
+        Metadata comes from the rule catalog when the file belongs to the
+        default rules directory and has not changed since it was indexed
+        
         Args:
             rule_path: Path to the rule file
         
@@ -82,8 +176,22 @@ class SemgrepService:
             SemgrepException: If rule cannot be read
         """
         try:
-            rule_data = parse_semgrep_rule_file(rule_path)
-            rule_meta = extract_semgrep_rule_metadata(rule_data)
+            catalog = await SemgrepService.get_catalog()
+            entry = catalog.get_file(os.path.abspath(rule_path))
+            
+            if entry is not None:
+                rule_meta = {
+                    "file_path": os.path.abspath(rule_path),
+                    "file_name": entry["file_name"],
+                    "rules": entry["metadata"]
+                }
+                rules = entry["rules"]
+            else:
+                rule_data = parse_semgrep_rule_file(rule_path)
+                rule_meta = extract_semgrep_rule_metadata(rule_data)
+                for rule in rule_meta["rules"]:
+                    rule["path"] = rule_data["file_path"]
+                rules = rule_data.get("rules", [])
             
             # Read raw content
             with open(rule_path, 'r', encoding='utf-8') as f:
@@ -92,7 +200,7 @@ class SemgrepService:
             return {
                 "content": raw_content,
                 "metadata": rule_meta,
-                "rules": rule_data.get("rules", [])
+                "rules": rules
             }
         
         except Exception as e:
@@ -102,6 +210,24 @@ class SemgrepService:
                 details={"rule_path": rule_path}
             )
     
+    @staticmethod
+    def get_cache_config(catalog: SemgrepRuleCatalog, selected_rules: List[str]) -> Dict[str, Any]:
+        """
+        Get the normalized configuration identifying Semgrep results in the result cache
+        
+        Args:
+            catalog: Catalog of the rules directory
+            selected_rules: IDs of the rules to run
+        
+        Returns:
+            Configuration that changes whenever the rules that would run change
+        """
+        return {
+            "rules_path": catalog.rules_dir,
+            "rules_version": catalog.version,
+            "selected_rules": sorted(set(selected_rules))
+        }
+    
     @staticmethod
     async def analyze_files(file_paths: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -130,50 +256,158 @@ class SemgrepService:
                 logger.warning("No rules selected for Semgrep analysis")
                 return {"findings": [], "stats": {"total_findings": 0, "files_analyzed": len(file_paths)}}
             
-            # Create a temporary config file for Semgrep
-            semgrep_config = generate_semgrep_config(selected_rules, rules_path)
-            config_yaml = serialize_yaml(semgrep_config)
+            # Identify the analysis by tool version, normalized config and file contents
+            catalog = await SemgrepService.get_catalog(rules_path)
+            
+            # Reject unknown rules before any work is queued
+            missing_rules = SemgrepConfigCache.find_missing_rules(catalog, selected_rules)
+            if missing_rules:
+                raise SemgrepException(
+                    message=f"Unknown Semgrep rules: {', '.join(missing_rules)}",
+                    details={"unknown_rules": missing_rules, "rules_path": catalog.rules_dir},
+                    status_code=400
+                )
+            
+            analysis_key = ResultCache.make_key(
+                "semgrep",
+                await tool_registry.get_version("semgrep"),
+                SemgrepService.get_cache_config(catalog, selected_rules),
+                await asyncio.to_thread(get_content_keys, file_paths)
+            )
             
-            fd, config_path = tempfile.mkstemp(suffix='.yml')
-            os.close(fd)
+            # Serve identical analyses from the result cache
+            if settings.RESULT_CACHE_ENABLED:
+                cached_results = await asyncio.to_thread(result_cache.get_results, analysis_key, "findings", file_paths)
+                if cached_results is not None:
+                    logger.info(f"Semgrep results for {len(file_paths)} files served from cache")
+                    return cached_results
             
-            write_file(config_path, config_yaml)
+            # Join an identical analysis that is already running, or start one
+            (run_paths, formatted_results), shared = await analysis_flights.do(
+                analysis_key,
+                lambda: SemgrepService._run_analysis(rules_path, selected_rules, file_paths, analysis_key)
+            )
             
-            try:
-                # Build command
-                command = [
-                    "semgrep",
-                    "--config", config_path,
-                    "--json",
-                    *file_paths
-                ]
-                
-                # Run Semgrep
-                result = await run_command_async(command, timeout=settings.SEMGREP_CONFIG["timeout"])
-                
-                # Semgrep returns non-zero if it finds issues, which is expected
-                if result.returncode != 0 and result.returncode != 1:
-                    logger.error(f"Semgrep exited with error code {result.returncode}: {result.stderr}")
-                    raise SemgrepException(
-                        message=f"Semgrep analysis failed with error code {result.returncode}",
-                        details={"stderr": result.stderr}
-                    )
-                
-                # Format results
-                formatted_results = format_semgrep_results(result.stdout, file_paths)
-                
-                return formatted_results
+            if shared:
+                relocate_results(formatted_results, "findings", run_paths, file_paths)
+                formatted_results["stats"]["coalesced"] = True
             
-            finally:
-                # Clean up temp config file
-                if os.path.exists(config_path):
-                    os.unlink(config_path)
+            return formatted_results
         
-        except SemgrepException as e:
+        except (SemgrepException, AdmissionRejected) as e:
             raise e
         
         except Exception as e:
             logger.error(f"Error during Semgrep analysis: {str(e)}")
             raise SemgrepException(
                 message=f"Error during Semgrep analysis: {str(e)}"
-            )
\ No newline at end of file
+            )
+    
+    @staticmethod
+    async def _run_analysis(
+        rules_path: str,
+        selected_rules: List[str],
+        file_paths: List[str],
+        analysis_key: str
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        Run an analysis that is not in the result cache
+        
+        Args:
+            rules_path: Path to the rules directory
+            selected_rules: IDs of the rules to run
+            file_paths: List of file paths to analyze
+            analysis_key: Key identifying the analysis
+        
+        Returns:
+            Tuple of (file paths the results refer to, formatted results)
+        """
+        # Run Semgrep, sharing the process with concurrent requests for the same rules
+        output, run_info = await semgrep_batcher.submit(rules_path, selected_rules, file_paths)
+        
+        # Format results
+        formatted_results = format_semgrep_results(output, file_paths)
+        
+        if settings.RESULT_CACHE_ENABLED:
+            await asyncio.to_thread(result_cache.put_results, analysis_key, "semgrep", file_paths, formatted_results)
+        
+        # Usage and batching describe this run only, so they are not cached
+        formatted_results["stats"]["resources"] = run_info["resources"]
+        formatted_results["stats"]["batch"] = run_info["batch"]
+        
+        return file_paths, formatted_results
+    
+    @staticmethod
+    async def run_semgrep(
+        rules_path: str,
+        selected_rules: List[str],
+        file_paths: List[str]
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Run one Semgrep process over a set of files
+        
+        Args:
+            rules_path: Path to the rules directory
+            selected_rules: IDs of the rules to run
+            file_paths: List of file paths to analyze
+        
+        Returns:
+            Tuple of (parsed Semgrep JSON output, resource usage of the run)
+        
+        Raises:
+            SemgrepException: If Semgrep fails
+            AdmissionRejected: If Semgrep is too busy to take the run
+        """
+        # Merge the selected rule definitions into one config, reused across runs
+        catalog = await SemgrepService.get_catalog(rules_path)
+        config_path = await asyncio.to_thread(semgrep_config_cache.get_config_path, catalog, selected_rules)
+        
+        # Build command
+        command = [
+            tool_registry.get_binary("semgrep"),
+            "--config", config_path,
+            "--json",
+            *file_paths
+        ]
+        
+        # Run Semgrep once a server-wide slot is free
+        async with admission_controller.slot("semgrep"):
+            result = await run_command_async(
+                command,
+                timeout=settings.SEMGREP_CONFIG["timeout"],
+                resource_profile=ResourceProfile.from_config("semgrep", settings.SEMGREP_CONFIG)
+            )
+        
+        try:
+            # Semgrep returns non-zero if it finds issues, which is expected
+            if result.returncode != 0 and result.returncode != 1:
+                logger.error(f"Semgrep exited with error code {result.returncode}: {result.stderr}")
+                raise SemgrepException(
+                    message=f"Semgrep analysis failed with error code {result.returncode}",
+                    details={"stderr": result.stderr, "resources": result.resource_usage}
+                )
+            
+            # Parse the JSON straight from the captured output
+            return result.load_json(default={}), result.resource_usage
+        
+        finally:
+            result.cleanup()
+    
+    @staticmethod
+    async def check_availability() -> bool:
+        """
+        Check if Semgrep is available
+        
+        The result comes from the tool registry cache and does not spawn a process
+        
+        Returns:
+            True if Semgrep is available, False otherwise
+        """
+        return await tool_registry.is_available("semgrep")
+
+# Create batcher instance
+semgrep_batcher = SemgrepBatcher(
+    runner=SemgrepService.run_semgrep,
+    window=settings.SEMGREP_CONFIG["batch_window"],
+    max_files=settings.SEMGREP_CONFIG["batch_max_files"],
+)
\ No newline at end of file
@@ -1,17 +1,27 @@
+import asyncio
 import os
 import json
 import logging
 import tempfile
 import shutil
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 
 from app.core.config import settings
-from app.core.errors import SnykException
+from app.core.errors import SnykException, AdmissionRejected
+from app.services.result_cache import ResultCache
+from app.services.tool_registry import tool_registry
+from app.utils.admission import admission_controller
 from app.utils.command_executor import run_command_async
-from app.utils.result_formatter import format_snyk_results
+from app.utils.resource_limits import ResourceProfile
+from app.utils.file_utils import get_file_name, hash_file
+from app.utils.result_formatter import format_snyk_results, relocate_results
+from app.utils.singleflight import analysis_flights
 
 logger = logging.getLogger(__name__)
 
+# Characters of stderr reported when Snyk does not print valid JSON
+STDERR_TAIL_LENGTH = 2000
+
 class SnykService:
     """Service for Snyk operations"""
     
@@ -38,75 +48,169 @@ class SnykService:
             # Extract configuration
             snyk_path = config.get("path", settings.SNYK_PATH)
             options = config.get("options", {})
+            names = SnykService._get_relative_names(file_paths)
             
-            # Create a temporary directory to copy files for analysis
-            temp_dir = tempfile.mkdtemp()
+            # Identify the analysis by tool version, options and file names and contents
+            analysis_key = ResultCache.make_key(
+                "snyk",
+                await tool_registry.get_version("snyk"),
+                {
+                    "options": options or {},
+                    "file_names": names
+                },
+                await asyncio.to_thread(lambda: [hash_file(path) for path in file_paths])
+            )
             
-            try:
-                # Copy files to temp directory
-                for file_path in file_paths:
-                    if os.path.isfile(file_path):
-                        filename = os.path.basename(file_path)
-                        dest_path = os.path.join(temp_dir, filename)
-                        shutil.copy2(file_path, dest_path)
-                
-                # Build command
-                command = [
-                    "snyk",
-                    "test",
-                    "--json",
-                    "--all-projects"
-                ]
-                
-                # Add severity filter if specified
-                if options and "severity" in options:
-                    severity = options.get("severity", "medium").lower()
-                    command.extend(["--severity-threshold", severity])
-                
-                # Add API key if available
-                api_key = settings.SNYK_CONFIG.get("api_key")
-                env = os.environ.copy()
-                if api_key:
-                    env["SNYK_API_TOKEN"] = api_key
-                
-                # Run Snyk in the temporary directory
+            # Join an identical analysis that is already running, or start one
+            (run_paths, formatted_results), shared = await analysis_flights.do(
+                analysis_key,
+                lambda: SnykService._run_analysis(file_paths, names, options)
+            )
+            
+            if shared:
+                relocate_results(formatted_results, "vulnerabilities", run_paths, file_paths)
+                formatted_results["stats"]["coalesced"] = True
+            
+            return formatted_results
+        
+        except (SnykException, AdmissionRejected) as e:
+            raise e
+        
+        except Exception as e:
+            logger.error(f"Error during Snyk analysis: {str(e)}")
+            raise SnykException(
+                message=f"Error during Snyk analysis: {str(e)}"
+            )
+    
+    @staticmethod
+    def _get_relative_names(file_paths: List[str]) -> List[str]:
+        """
+        Get the relative path each file is analyzed under
+        
+        Snyk detects projects by manifest names and directories, so files
+        keep the name the client gave them (their relative path inside an
+        uploaded archive) rather than the random name they were saved under.
+        
+        Args:
+            file_paths: List of file paths to analyze
+        
+        Returns:
+            Relative paths, in the same order
+        
+        Raises:
+            SnykException: If two files would be analyzed under the same path
+        """
+        names = [get_file_name(path) or os.path.basename(path) for path in file_paths]
+        
+        seen: Set[str] = set()
+        duplicates = set()
+        for name in names:
+            if name in seen:
+                duplicates.add(name)
+            seen.add(name)
+        
+        if duplicates:
+            raise SnykException(
+                message="Several uploaded files have the same path, upload them inside an archive to keep their directories",
+                status_code=400,
+                details={"duplicate_paths": sorted(duplicates)}
+            )
+        
+        return names
+    
+    @staticmethod
+    async def _run_analysis(
+        file_paths: List[str],
+        names: List[str],
+        options: Optional[Dict[str, Any]]
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        Run Snyk over a set of files
+        
+        Args:
+            file_paths: List of file paths to analyze
+            names: Relative path of each file in the project directory
+            options: Snyk options from the request
+        
+        Returns:
+            Tuple of (file paths the results refer to, formatted results)
+        """
+        # Create a temporary directory to copy files for analysis
+        temp_dir = tempfile.mkdtemp()
+        
+        try:
+            # Copy files to temp directory, keeping their relative paths
+            for file_path, name in zip(file_paths, names):
+                if os.path.isfile(file_path):
+                    dest_path = os.path.join(temp_dir, *name.split("/"))
+                    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                    shutil.copy2(file_path, dest_path)
+            
+            # Build command
+            command = [
+                tool_registry.get_binary("snyk"),
+                "test",
+                "--json",
+                "--all-projects"
+            ]
+            
+            # Add severity filter if specified
+            if options and "severity" in options:
+                severity = options.get("severity", "medium").lower()
+                command.extend(["--severity-threshold", severity])
+            
+            # Add API key if available
+            api_key = settings.SNYK_CONFIG.get("api_key")
+            env = os.environ.copy()
+            if api_key:
+                env["SNYK_API_TOKEN"] = api_key
+            
+            # Run Snyk in the temporary directory once a server-wide slot is free
+            async with admission_controller.slot("snyk"):
                 result = await run_command_async(
                     command,
                     cwd=temp_dir,
                     env=env,
-                    timeout=settings.SNYK_CONFIG["timeout"]
+                    timeout=settings.SNYK_CONFIG["timeout"],
+                    resource_profile=ResourceProfile.from_config("snyk", settings.SNYK_CONFIG)
                 )
-                
-                # Snyk returns non-zero if it finds vulnerabilities, which is expected
-                stdout = result.stdout if result.stdout else "{}"
-                
-                # Format results
-                formatted_results = format_snyk_results(stdout, file_paths)
-                
-                return formatted_results
             
+            # Snyk returns non-zero if it finds vulnerabilities, which is expected
+            try:
+                output = result.load_json(default={})
+            except ValueError as e:
+                # Snyk prints plain text instead of JSON when it cannot run (e.g. authentication errors)
+                logger.error(f"Error parsing Snyk JSON output: {str(e)}")
+                raise SnykException(
+                    message="Error parsing Snyk results",
+                    details={
+                        "error": str(e),
+                        "returncode": result.returncode,
+                        "stderr": result.stderr[-STDERR_TAIL_LENGTH:]
+                    }
+                )
             finally:
-                # Clean up temp directory
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
+                result.cleanup()
+            
+            # Format results
+            formatted_results = format_snyk_results(output, file_paths)
+            formatted_results["stats"]["resources"] = result.resource_usage
+            
+            return file_paths, formatted_results
         
-        except Exception as e:
-            logger.error(f"Error during Snyk analysis: {str(e)}")
-            raise SnykException(
-                message=f"Error during Snyk analysis: {str(e)}"
-            )
+        finally:
+            # Clean up temp directory
+            if os.path.exists(temp_dir):
+                shutil.rmtree(temp_dir)
     
     @staticmethod
     async def check_availability() -> bool:
         """
         Check if Snyk is available
         
+        The result comes from the tool registry cache and does not spawn a process
+        
         Returns:
             True if Snyk is available, False otherwise
         """
-        try:
-            result = await run_command_async(["snyk", "--version"], timeout=10)
-            return result.returncode == 0
-        except Exception as e:
-            logger.warning(f"Snyk is not available: {str(e)}")
-            return False
\ No newline at end of file
+        return await tool_registry.is_available("snyk")
\ No newline at end of file
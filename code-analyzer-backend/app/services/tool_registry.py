@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import re
+import shutil
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.utils.command_executor import run_command_async
+
+logger = logging.getLogger(__name__)
+
+# Matches "version 14.0.0" style strings in tool --version output
+VERSION_PATTERN = re.compile(r'version\s+([\w.\-+]+)', re.IGNORECASE)
+
+class ToolStatus:
+    """Class to hold the cached probe result for a tool"""
+    
+    def __init__(
+        self,
+        name: str,
+        available: bool = False,
+        version: Optional[str] = None,
+        path: Optional[str] = None,
+        error: Optional[str] = None,
+        checked_at: Optional[float] = None,
+    ):
+        self.name = name
+        self.available = available
+        self.version = version
+        self.path = path
+        self.error = error
+        self.checked_at = checked_at
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the status to a dictionary"""
+        return {
+            "name": self.name,
+            "available": self.available,
+            "version": self.version,
+            "path": self.path,
+            "error": self.error,
+            "checked_at": self.checked_at,
+        }
+
+class ToolRegistry:
+    """
+    Registry of external analysis tools
+    
+    Tools are probed with `--version` at startup and on a background interval,
+    and availability, version and resolved binary path are served from memory.
+    """
+    
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._statuses: Dict[str, ToolStatus] = {}
+        self._listeners: List[Callable[[str, Optional[str], Optional[str]], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+    
+    @staticmethod
+    def get_tool_commands() -> Dict[str, str]:
+        """Map tool names to their configured binaries"""
+        return {
+            "semgrep": settings.SEMGREP_PATH,
+            "snyk": settings.SNYK_BINARY,
+            "clangtidy": settings.CLANGTIDY_PATH,
+        }
+    
+    @property
+    def ready(self) -> bool:
+        """Whether every tool has been probed at least once"""
+        return all(name in self._statuses for name in self.get_tool_commands())
+    
+    def add_listener(self, listener: Callable[[str, Optional[str], Optional[str]], None]) -> None:
+        """
+        Register a callback invoked as listener(tool, old_version, new_version)
+        whenever a probe reports a different version for a tool
+        """
+        self._listeners.append(listener)
+    
+    async def start(self) -> None:
+        """Probe all tools and start the background refresh task"""
+        await self.refresh()
+        
+        if self.refresh_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self) -> None:
+        """Stop the background refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def refresh(self, tool: Optional[str] = None) -> Dict[str, ToolStatus]:
+        """
+        Probe one tool, or all tools, and update the cache
+        
+        Args:
+            tool: Name of the tool to probe (optional, probes all tools if not provided)
+        
+        Returns:
+            Dictionary mapping tool names to their status
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        
+        names = [tool] if tool else list(self.get_tool_commands())
+        
+        async with self._lock:
+            statuses = await asyncio.gather(*(self._probe(name) for name in names))
+            
+            for status in statuses:
+                previous = self._statuses.get(status.name)
+                self._statuses[status.name] = status
+                
+                if previous is not None and previous.version != status.version:
+                    logger.info(f"{status.name} version changed from {previous.version} to {status.version}")
+                    for listener in self._listeners:
+                        try:
+                            listener(status.name, previous.version, status.version)
+                        except Exception as e:
+                            logger.warning(f"Tool version listener failed: {str(e)}")
+        
+        return {name: self._statuses[name] for name in names}
+    
+    async def get_status(self, tool: str) -> ToolStatus:
+        """
+        Get the cached status of a tool, probing it on first use
+        
+        Args:
+            tool: Name of the tool
+        
+        Returns:
+            Cached tool status
+        """
+        status = self._statuses.get(tool)
+        
+        if status is None:
+            # Wait for a probe already running instead of starting one per caller
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                status = self._statuses.get(tool)
+        
+        if status is None:
+            status = (await self.refresh(tool))[tool]
+        
+        return status
+    
+    async def is_available(self, tool: str) -> bool:
+        """Check whether a tool is available, using the cached probe result"""
+        return (await self.get_status(tool)).available
+    
+    async def get_version(self, tool: str) -> Optional[str]:
+        """Get the cached version string of a tool"""
+        return (await self.get_status(tool)).version
+    
+    def get_binary(self, tool: str) -> str:
+        """
+        Get the binary to execute for a tool
+        
+        Returns the resolved path if the tool has been probed, otherwise the configured command
+        """
+        status = self._statuses.get(tool)
+        if status is not None and status.path:
+            return status.path
+        return self.get_tool_commands()[tool]
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get the cached status of all probed tools"""
+        return {name: status.to_dict() for name, status in self._statuses.items()}
+    
+    async def _refresh_loop(self) -> None:
+        """Periodically re-probe all tools"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Error refreshing tool registry: {str(e)}")
+    
+    async def _probe(self, tool: str) -> ToolStatus:
+        """
+        Run `--version` for a tool and build its status
+        
+        Args:
+            tool: Name of the tool
+        
+        Returns:
+            Fresh tool status
+        """
+        command = self.get_tool_commands()[tool]
+        path = shutil.which(command)
+        
+        if path is None:
+            return ToolStatus(
+                name=tool,
+                error=f"'{command}' not found",
+                checked_at=time.time()
+            )
+        
+        try:
+            result = await run_command_async([path, "--version"], timeout=10)
+            
+            if result.returncode != 0:
+                return ToolStatus(
+                    name=tool,
+                    path=path,
+                    error=result.stderr.strip() or f"Exited with code {result.returncode}",
+                    checked_at=time.time()
+                )
+            
+            return ToolStatus(
+                name=tool,
+                available=True,
+                version=self._parse_version(result.stdout),
+                path=path,
+                checked_at=time.time()
+            )
+        
+        except Exception as e:
+            logger.warning(f"{tool} is not available: {str(e)}")
+            return ToolStatus(
+                name=tool,
+                path=path,
+                error=str(e),
+                checked_at=time.time()
+            )
+    
+    @staticmethod
+    def _parse_version(output: str) -> Optional[str]:
+        """Extract a version string from --version output"""
+        match = VERSION_PATTERN.search(output)
+        if match:
+            return match.group(1)
+        
+        for line in output.splitlines():
+            if line.strip():
+                return line.strip()
+        
+        return None
+
+# Create registry instance
+tool_registry = ToolRegistry(refresh_interval=settings.TOOL_REFRESH_INTERVAL)
\ No newline at end of file
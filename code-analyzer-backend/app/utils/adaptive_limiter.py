@@ -0,0 +1,173 @@
+import collections
+import logging
+import math
+import os
+import time
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def read_load_per_cpu() -> Optional[float]:
+    """Get the 1-minute load average divided by the number of CPUs, if available"""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+def read_available_memory_fraction() -> Optional[float]:
+    """Get MemAvailable / MemTotal from /proc/meminfo, if available"""
+    values = {}
+    try:
+        with open("/proc/meminfo", 'r') as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("MemTotal", "MemAvailable"):
+                    values[name] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    
+    if not values.get("MemTotal") or "MemAvailable" not in values:
+        return None
+    
+    return values["MemAvailable"] / values["MemTotal"]
+
+class AdaptiveLimiter:
+    """
+    AIMD controller for a concurrency limit
+    
+    Every completed run feeds its latency into a fast and a slow moving
+    average. At most once per interval the limiter decides:
+    
+    - multiplicative decrease when the host is overloaded (load per CPU above
+      max_load_per_cpu), short on memory (available fraction below
+      min_memory_fraction) or runs got slower (fast average above
+      latency_tolerance times the slow baseline)
+    - additive increase by one when none of that holds and the limit was
+      actually the bottleneck (every slot busy or callers waiting)
+    - otherwise the limit is kept
+    
+    The limit always stays between floor and ceiling, and recent decisions
+    are kept with their reasons for the metrics endpoint.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        floor: int,
+        ceiling: int,
+        interval: float,
+        max_load_per_cpu: float,
+        min_memory_fraction: float,
+        latency_tolerance: float,
+        backoff: float,
+        min_samples: int = 5,
+        history_size: int = 20,
+    ):
+        self.name = name
+        self.floor = max(1, floor)
+        self.ceiling = max(self.floor, ceiling)
+        self.interval = interval
+        self.max_load_per_cpu = max_load_per_cpu
+        self.min_memory_fraction = min_memory_fraction
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.min_samples = min_samples
+        self.samples = 0
+        self.fast_latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self.last_signals: Dict[str, Any] = {}
+        self._last_decision = 0.0
+        self._saturated = False
+        self._decisions: Deque[Dict[str, Any]] = collections.deque(maxlen=history_size)
+    
+    def observe(self, latency: float, saturated: bool) -> None:
+        """
+        Record a completed run
+        
+        Args:
+            latency: Run time in seconds
+            saturated: Whether every slot was busy or callers were waiting
+        """
+        self.samples += 1
+        self._saturated = self._saturated or saturated
+        
+        if self.fast_latency is None:
+            self.fast_latency = latency
+            self.baseline_latency = latency
+        else:
+            self.fast_latency += 0.3 * (latency - self.fast_latency)
+            self.baseline_latency += 0.05 * (latency - self.baseline_latency)
+    
+    def decide(self, limit: int, now: Optional[float] = None) -> int:
+        """
+        Work out the next limit
+        
+        Args:
+            limit: Current limit
+            now: Current time (defaults to time.monotonic())
+        
+        Returns:
+            New limit, which equals limit if it is too soon to decide or nothing changed
+        """
+        now = time.monotonic() if now is None else now
+        if now - self._last_decision < self.interval:
+            return limit
+        
+        self._last_decision = now
+        
+        load = read_load_per_cpu()
+        memory = read_available_memory_fraction()
+        self.last_signals = {
+            "load_per_cpu": round(load, 3) if load is not None else None,
+            "available_memory_fraction": round(memory, 3) if memory is not None else None,
+            "fast_latency": round(self.fast_latency, 4) if self.fast_latency is not None else None,
+            "baseline_latency": round(self.baseline_latency, 4) if self.baseline_latency is not None else None,
+            "saturated": self._saturated,
+        }
+        
+        reason = None
+        new_limit = limit
+        
+        if load is not None and load > self.max_load_per_cpu:
+            reason = f"load {load:.2f} per CPU above {self.max_load_per_cpu}"
+        elif memory is not None and memory < self.min_memory_fraction:
+            reason = f"available memory {memory:.1%} below {self.min_memory_fraction:.0%}"
+        elif (
+            self.samples >= self.min_samples
+            and self.fast_latency > self.baseline_latency * self.latency_tolerance
+        ):
+            reason = f"latency {self.fast_latency:.2f}s above {self.latency_tolerance}x baseline {self.baseline_latency:.2f}s"
+        
+        if reason is not None:
+            new_limit = math.floor(limit * self.backoff)
+        elif self._saturated:
+            new_limit = limit + 1
+            reason = "all slots busy and host has headroom"
+        
+        new_limit = max(self.floor, min(self.ceiling, new_limit))
+        self._saturated = False
+        
+        if new_limit != limit:
+            self._record(limit, new_limit, reason)
+        
+        return new_limit
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the bounds, latest signals and recent decisions"""
+        return {
+            "floor": self.floor,
+            "ceiling": self.ceiling,
+            "samples": self.samples,
+            "signals": self.last_signals,
+            "decisions": list(self._decisions),
+        }
+    
+    def _record(self, old_limit: int, new_limit: int, reason: str) -> None:
+        """Remember a limit change"""
+        self._decisions.append({
+            "at": time.time(),
+            "from": old_limit,
+            "to": new_limit,
+            "reason": reason,
+        })
+        logger.info(f"Adaptive limit for {self.name}: {old_limit} -> {new_limit} ({reason})")
\ No newline at end of file
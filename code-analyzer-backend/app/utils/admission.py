@@ -0,0 +1,254 @@
+import asyncio
+import collections
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from app.core.config import settings
+from app.core.errors import AdmissionRejected
+from app.utils.adaptive_limiter import AdaptiveLimiter
+
+logger = logging.getLogger(__name__)
+
+class AdmissionGate:
+    """
+    Concurrency limit with a bounded wait queue for one tool
+    
+    At most `limit` holders run at once. Further callers wait in FIFO order,
+    up to `queue_size` of them for at most `max_wait` seconds each; anyone
+    beyond that is rejected straight away. Callers belonging to a request
+    that already holds a slot (the later batches of a ClangTidy analysis)
+    pass admitted=True and wait without being rejected. Run times are
+    tracked as an exponentially weighted moving average to estimate when
+    to retry.
+    With a limiter, the limit is adjusted after each run from the observed
+    latency and host load.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        queue_size: int,
+        max_wait: float,
+        smoothing: float = 0.2,
+        limiter: Optional[AdaptiveLimiter] = None,
+    ):
+        self.name = name
+        self.limit = max(1, limit)
+        self.limiter = limiter
+        self.queue_size = max(0, queue_size)
+        self.max_wait = max_wait
+        self.smoothing = smoothing
+        self.active = 0
+        self.average_run_seconds: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._counters = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+        }
+    
+    @property
+    def waiting(self) -> int:
+        """Number of callers waiting for a slot"""
+        return len(self._waiters)
+    
+    def retry_after(self) -> int:
+        """Estimate the seconds until a new caller would get a slot"""
+        average = self.average_run_seconds or 1.0
+        ahead = self.waiting + max(0, self.active - self.limit + 1)
+        return max(1, math.ceil(average * ahead / self.limit))
+    
+    def check(self) -> None:
+        """
+        Reject early if a new caller could not even be queued
+        
+        Raises:
+            AdmissionRejected: If every slot is taken and the queue is full
+        """
+        if self.active >= self.limit and self.waiting >= self.queue_size:
+            self._counters["rejected_queue_full"] += 1
+            raise self._rejection("queue is full")
+    
+    async def acquire(self, admitted: bool = False) -> None:
+        """
+        Take a slot, waiting in the queue if necessary
+        
+        Args:
+            admitted: The caller's request was already admitted, so it waits
+                for a slot however full the queue is and however long it takes
+        
+        Raises:
+            AdmissionRejected: If the queue is full or the wait exceeds max_wait
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._counters["admitted"] += 1
+            return
+        
+        if not admitted:
+            self.check()
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._counters["queued"] += 1
+        
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=None if admitted else self.max_wait)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self._counters["rejected_timeout"] += 1
+            raise self._rejection(f"waited more than {self.max_wait} seconds")
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        
+        self._counters["admitted"] += 1
+    
+    def release(self, run_seconds: Optional[float] = None) -> None:
+        """
+        Give a slot back and hand it to the next waiter
+        
+        Args:
+            run_seconds: How long the slot was held, fed into the run time average
+        """
+        if run_seconds is not None:
+            if self.average_run_seconds is None:
+                self.average_run_seconds = run_seconds
+            else:
+                self.average_run_seconds += self.smoothing * (run_seconds - self.average_run_seconds)
+        
+        saturated = self.active >= self.limit or bool(self._waiters)
+        self.active -= 1
+        
+        if run_seconds is not None and self.limiter is not None:
+            self.limiter.observe(run_seconds, saturated)
+            self.limit = self.limiter.decide(self.limit)
+        
+        self._wake()
+    
+    def set_limit(self, limit: int) -> None:
+        """Change the concurrency limit, admitting waiters if it grew"""
+        self.limit = max(1, limit)
+        self._wake()
+    
+    @asynccontextmanager
+    async def slot(self, admitted: bool = False) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block; see acquire for admitted"""
+        await self.acquire(admitted)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the current load and counters"""
+        return {
+            "limit": self.limit,
+            "in_flight": self.active,
+            "queue_depth": self.waiting,
+            "queue_size": self.queue_size,
+            "max_wait": self.max_wait,
+            "average_run_seconds": round(self.average_run_seconds, 4) if self.average_run_seconds is not None else None,
+            "retry_after": self.retry_after(),
+            **self._counters,
+            "adaptive": self.limiter.stats() if self.limiter is not None else None,
+        }
+    
+    def _wake(self) -> None:
+        """Hand free slots to waiters in FIFO order"""
+        while self._waiters and self.active < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.active += 1
+            waiter.set_result(None)
+    
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Leave the queue, giving back the slot if it was handed over meanwhile"""
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+            return
+        
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+    
+    def _rejection(self, reason: str) -> AdmissionRejected:
+        """Build the exception for a rejected caller"""
+        retry_after = self.retry_after()
+        logger.warning(f"Rejected {self.name} run: {reason} (retry after {retry_after}s)")
+        return AdmissionRejected(
+            message=f"Too many {self.name} analyses in progress, {reason}",
+            retry_after=retry_after,
+            details={
+                "tool": self.name,
+                "in_flight": self.active,
+                "queue_depth": self.waiting,
+                "retry_after": retry_after
+            }
+        )
+
+class AdmissionController:
+    """Holds the admission gate of each tool"""
+    
+    def __init__(self, gates: Dict[str, AdmissionGate]):
+        self.gates = gates
+    
+    def gate(self, tool: str) -> AdmissionGate:
+        """Get the gate of a tool"""
+        return self.gates[tool]
+    
+    def check(self, tool: str) -> None:
+        """
+        Reject early if the tool cannot take another run
+        
+        Raises:
+            AdmissionRejected: If the tool's queue is full
+        """
+        self.gates[tool].check()
+    
+    def slot(self, tool: str, admitted: bool = False):
+        """Hold one of the tool's slots for the duration of an async with block"""
+        return self.gates[tool].slot(admitted)
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the load of every tool"""
+        return {tool: gate.stats() for tool, gate in self.gates.items()}
+
+def _gate_from_config(name: str, config: Dict[str, Any]) -> AdmissionGate:
+    """Build a gate from a tool configuration dictionary"""
+    limiter = None
+    if settings.ADAPTIVE_CONCURRENCY_ENABLED:
+        limiter = AdaptiveLimiter(
+            name=name,
+            floor=int(config["min_concurrent"]),
+            ceiling=int(config["max_concurrent"]),
+            interval=settings.ADAPTIVE_INTERVAL,
+            max_load_per_cpu=settings.ADAPTIVE_MAX_LOAD_PER_CPU,
+            min_memory_fraction=settings.ADAPTIVE_MIN_MEMORY_FRACTION,
+            latency_tolerance=settings.ADAPTIVE_LATENCY_TOLERANCE,
+            backoff=settings.ADAPTIVE_BACKOFF,
+        )
+    
+    return AdmissionGate(
+        name=name,
+        limit=int(config["max_concurrent"]),
+        queue_size=int(config["queue_size"]),
+        max_wait=float(config["queue_timeout"]),
+        limiter=limiter,
+    )
+
+# Create admission controller instance
+admission_controller = AdmissionController({
+    "semgrep": _gate_from_config("semgrep", settings.SEMGREP_CONFIG),
+    "snyk": _gate_from_config("snyk", settings.SNYK_CONFIG),
+    "clangtidy": _gate_from_config("clangtidy", settings.CLANGTIDY_CONFIG),
+})
\ No newline at end of file
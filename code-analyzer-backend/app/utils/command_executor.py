@@ -1,52 +1,247 @@
 import asyncio
+import inspect
+import io
+import json
 import logging
+import os
 import shlex
 import subprocess
-from typing import Dict, List, Optional, Tuple, Union
+import tempfile
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
 
+from app.core.config import settings
 from app.core.errors import AppException
+from app.utils.resource_limits import ResourceMonitor, ResourceProfile, kill_process_group
 
 logger = logging.getLogger(__name__)
 
+# Callback receiving stdout as it is read; may return an awaitable
+OutputCallback = Callable[[Any], Optional[Awaitable[None]]]
+
 class CommandResult:
     """Class to hold command execution results"""
     
     def __init__(
         self, 
         returncode: int, 
-        stdout: str, 
+        stdout: Optional[str], 
         stderr: str, 
-        command: str
+        command: str,
+        stdout_path: Optional[str] = None,
+        stdout_bytes: Optional[int] = None,
+        stderr_truncated: bool = False,
+        stdout_data: Optional[bytes] = None,
+        resource_usage: Optional[Dict[str, Any]] = None,
     ):
         self.returncode = returncode
-        self.stdout = stdout
         self.stderr = stderr
         self.command = command
+        self.stdout_path = stdout_path
+        self.stderr_truncated = stderr_truncated
+        self.resource_usage = resource_usage
+        self._stdout = stdout
+        self._stdout_data = stdout_data
+        
+        if stdout_bytes is None:
+            stdout_bytes = len(stdout.encode("utf-8")) if stdout else 0
+        self.stdout_bytes = stdout_bytes
     
     @property
     def successful(self) -> bool:
         """Check if command executed successfully"""
         return self.returncode == 0
     
+    @property
+    def stdout(self) -> str:
+        """
+        Get stdout as a string
+        
+        Output spilled to disk is read back in full, so callers expecting
+        large output should use load_json or open_stdout instead
+        """
+        if self._stdout is None:
+            if self.stdout_path:
+                with open(self.stdout_path, 'r', encoding='utf-8', errors='replace') as f:
+                    self._stdout = f.read()
+            else:
+                self._stdout = (self._stdout_data or b"").decode("utf-8", errors="replace")
+                self._stdout_data = None
+        
+        return self._stdout
+    
+    def open_stdout(self) -> BinaryIO:
+        """Open stdout as a binary file-like object"""
+        if self.stdout_path:
+            return open(self.stdout_path, 'rb')
+        
+        return io.BytesIO(self._stdout_data if self._stdout_data is not None else self.stdout.encode("utf-8"))
+    
+    def load_json(self, default: Any = None) -> Any:
+        """
+        Parse stdout as JSON without building an intermediate string
+        
+        Args:
+            default: Value returned when stdout is empty
+        
+        Returns:
+            Parsed JSON
+        """
+        if not self.stdout_bytes:
+            return default
+        
+        with self.open_stdout() as f:
+            return json.load(f)
+    
+    def cleanup(self) -> None:
+        """Remove the spill file, if stdout was spilled to disk"""
+        if self.stdout_path:
+            try:
+                os.unlink(self.stdout_path)
+            except OSError:
+                pass
+            self.stdout_path = None
+    
     def __str__(self) -> str:
         return f"Command: {self.command}, Return code: {self.returncode}"
 
+class _OutputCapture:
+    """
+    Collects a stream of process output
+    
+    Bytes are kept in memory up to spill_threshold, then moved to a temporary
+    file; with keep=False nothing is retained and only callbacks see the data.
+    At most retain_limit bytes (the tail) are kept when spilling is disabled.
+    """
+    
+    def __init__(
+        self,
+        spill_threshold: Optional[int] = None,
+        retain_limit: Optional[int] = None,
+        keep: bool = True,
+        on_chunk: Optional[OutputCallback] = None,
+        on_line: Optional[OutputCallback] = None,
+    ):
+        self.spill_threshold = spill_threshold
+        self.retain_limit = retain_limit
+        self.keep = keep
+        self.on_chunk = on_chunk
+        self.on_line = on_line
+        self.total_bytes = 0
+        self.truncated = False
+        self.spill_path: Optional[str] = None
+        self._buffer = bytearray()
+        self._spill_file = None
+        self._partial_line = b""
+    
+    async def feed(self, chunk: bytes) -> None:
+        """Take the next chunk of output"""
+        self.total_bytes += len(chunk)
+        
+        if self.on_chunk:
+            await _call(self.on_chunk, chunk)
+        
+        if self.on_line:
+            lines = (self._partial_line + chunk).split(b"\n")
+            self._partial_line = lines.pop()
+            for line in lines:
+                await _call(self.on_line, line.rstrip(b"\r").decode("utf-8", errors="replace"))
+        
+        if not self.keep:
+            return
+        
+        if self._spill_file is not None:
+            self._spill_file.write(chunk)
+            return
+        
+        self._buffer += chunk
+        
+        if self.spill_threshold is not None and len(self._buffer) > self.spill_threshold:
+            fd, self.spill_path = tempfile.mkstemp(suffix='.out')
+            self._spill_file = os.fdopen(fd, 'wb')
+            self._spill_file.write(self._buffer)
+            self._buffer = bytearray()
+        elif self.retain_limit is not None and len(self._buffer) > self.retain_limit:
+            del self._buffer[:len(self._buffer) - self.retain_limit]
+            self.truncated = True
+    
+    async def finish(self) -> None:
+        """Flush the last partial line and close the spill file"""
+        if self.on_line and self._partial_line:
+            await _call(self.on_line, self._partial_line.rstrip(b"\r").decode("utf-8", errors="replace"))
+            self._partial_line = b""
+        
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+    
+    def discard(self) -> None:
+        """Close and remove the spill file after a failure"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        
+        if self.spill_path:
+            try:
+                os.unlink(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
+    
+    @property
+    def data(self) -> bytes:
+        """Bytes retained in memory"""
+        return bytes(self._buffer)
+
+async def _call(callback: OutputCallback, value: Any) -> None:
+    """Invoke an output callback, awaiting it if it is a coroutine"""
+    result = callback(value)
+    if inspect.isawaitable(result):
+        await result
+
+async def _pump(stream: asyncio.StreamReader, capture: _OutputCapture) -> None:
+    """Read a process pipe into a capture until EOF"""
+    while True:
+        chunk = await stream.read(settings.COMMAND_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        await capture.feed(chunk)
+    
+    await capture.finish()
+
 async def run_command_async(
     command: Union[str, List[str]],
     shell: bool = False,
     cwd: Optional[str] = None,
     env: Optional[Dict[str, str]] = None,
     timeout: Optional[float] = 300,
+    spill_threshold: Optional[int] = None,
+    stderr_limit: Optional[int] = None,
+    on_stdout_chunk: Optional[OutputCallback] = None,
+    on_stdout_line: Optional[OutputCallback] = None,
+    keep_stdout: bool = True,
+    resource_profile: Optional[ResourceProfile] = None,
 ) -> CommandResult:
     """
     Run a shell command asynchronously and return the result
     
+    Stdout is read incrementally. It is kept in memory until it exceeds
+    spill_threshold bytes and then written to a temporary file (see
+    CommandResult.stdout_path); callers must call CommandResult.cleanup()
+    once they are done with the output. Only the last stderr_limit bytes of
+    stderr are retained.
+    
     Args:
         command: Command to run (string or list of arguments)
         shell: Whether to run in shell mode
         cwd: Working directory
         env: Environment variables
         timeout: Command timeout in seconds
+        spill_threshold: Stdout bytes kept in memory before spilling to disk (defaults to COMMAND_OUTPUT_SPILL_THRESHOLD)
+        stderr_limit: Stderr bytes retained (defaults to COMMAND_STDERR_LIMIT)
+        on_stdout_chunk: Called with each chunk of stdout bytes as it is read
+        on_stdout_line: Called with each decoded line of stdout as it is read
+        keep_stdout: Whether to retain stdout; set to False when callbacks consume it
+        resource_profile: Limits to apply to the process (optional)
     
     Returns:
         CommandResult object with execution results
@@ -57,6 +252,17 @@ async def run_command_async(
     # Format command for logging and result
     cmd_str = command if isinstance(command, str) else " ".join(command)
     
+    stdout_capture = _OutputCapture(
+        spill_threshold=settings.COMMAND_OUTPUT_SPILL_THRESHOLD if spill_threshold is None else spill_threshold,
+        keep=keep_stdout,
+        on_chunk=on_stdout_chunk,
+        on_line=on_stdout_line,
+    )
+    stderr_capture = _OutputCapture(
+        retain_limit=settings.COMMAND_STDERR_LIMIT if stderr_limit is None else stderr_limit,
+    )
+    monitor: Optional[ResourceMonitor] = None
+    
     try:
         # Prepare command as list if it's a string and shell=False
         if isinstance(command, str) and not shell:
@@ -72,19 +278,27 @@ async def run_command_async(
             shell=shell,
             cwd=cwd,
             env=env,
+            start_new_session=True,
+            preexec_fn=resource_profile.preexec_fn() if resource_profile else None,
         )
         
+        if resource_profile:
+            monitor = ResourceMonitor(process.pid, resource_profile, settings.RESOURCE_SAMPLE_INTERVAL)
+            monitor.start()
+        
         try:
             # Wait for command to complete with timeout
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), timeout=timeout
+            await asyncio.wait_for(
+                asyncio.gather(
+                    _pump(process.stdout, stdout_capture),
+                    _pump(process.stderr, stderr_capture),
+                    process.wait(),
+                ),
+                timeout=timeout
             )
         except asyncio.TimeoutError:
-            # Kill the process if it times out
-            try:
-                process.kill()
-            except Exception:
-                pass
+            # Kill the process and its children if it times out
+            kill_process_group(process.pid)
             
             logger.error(f"Command timed out after {timeout} seconds: {cmd_str}")
             raise AppException(
@@ -92,10 +306,17 @@ async def run_command_async(
                 message=f"Command timed out after {timeout} seconds",
                 details={"command": cmd_str}
             )
+        except asyncio.CancelledError:
+            # Don't leave the process running if the caller gave up on it
+            kill_process_group(process.pid)
+            stdout_capture.discard()
+            raise
+        finally:
+            if monitor is not None:
+                await monitor.stop()
         
-        # Decode output
-        stdout_str = stdout.decode("utf-8", errors="replace")
-        stderr_str = stderr.decode("utf-8", errors="replace")
+        # Decode stderr
+        stderr_str = stderr_capture.data.decode("utf-8", errors="replace")
         
         # Log results
         if process.returncode != 0:
@@ -106,14 +327,30 @@ async def run_command_async(
         else:
             logger.debug(f"Command completed successfully: {cmd_str}")
         
+        if monitor is not None and monitor.killed_reason:
+            logger.warning(f"Command killed for exceeding its resource limits ({monitor.killed_reason}): {cmd_str}")
+        
+        if stdout_capture.spill_path:
+            logger.debug(f"Spilled {stdout_capture.total_bytes} bytes of stdout to {stdout_capture.spill_path}")
+        
         return CommandResult(
             returncode=process.returncode,
-            stdout=stdout_str,
+            stdout=None,
             stderr=stderr_str,
             command=cmd_str,
+            stdout_path=stdout_capture.spill_path,
+            stdout_bytes=stdout_capture.total_bytes,
+            stderr_truncated=stderr_capture.truncated,
+            stdout_data=stdout_capture.data,
+            resource_usage=monitor.usage() if monitor is not None else None,
         )
         
+    except AppException:
+        stdout_capture.discard()
+        raise
+    
     except Exception as e:
+        stdout_capture.discard()
         logger.error(f"Error executing command {cmd_str}: {str(e)}")
         raise AppException(
             status_code=500,
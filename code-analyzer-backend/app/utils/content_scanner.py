@@ -0,0 +1,122 @@
+import codecs
+import re
+import logging
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class ScanMatch:
+    """Class to hold the first dangerous pattern found in scanned content"""
+    
+    def __init__(self, pattern: str, offset: int, text: bytes):
+        self.pattern = pattern
+        self.offset = offset
+        self.text = text
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the match to a dictionary"""
+        return {
+            "pattern": self.pattern,
+            "offset": self.offset,
+            "match": self.text[:200].decode("utf-8", errors="replace"),
+        }
+    
+    def __str__(self) -> str:
+        return f"Pattern {self.pattern!r} at byte {self.offset}"
+
+class PatternSet:
+    """
+    A set of patterns compiled into one alternation over bytes
+    
+    Each pattern becomes a named group, so a single regex pass finds the first
+    match of any pattern and tells which pattern it was. Content is scanned in
+    chunks, so a match is only found across a chunk boundary if it is at most
+    max_match_length bytes long: patterns must bound their repetitions (e.g.
+    "\\s{0,1024}" rather than "\\s*").
+    """
+    
+    def __init__(self, patterns: List[str], max_match_length: int = 4096):
+        self.patterns = list(patterns)
+        self.max_match_length = max_match_length
+        self.regex = re.compile(
+            b"|".join(
+                b"(?P<p%d>%s)" % (index, pattern.encode("utf-8"))
+                for index, pattern in enumerate(self.patterns)
+            )
+        )
+    
+    def scanner(self) -> "ContentScanner":
+        """Create a scanner for one stream of content"""
+        return ContentScanner(self)
+
+class ContentScanner:
+    """
+    Scans content chunk by chunk for the patterns of a PatternSet
+    
+    The last max_match_length bytes of each chunk are carried into the next
+    scan so matches crossing a chunk boundary are found, provided the patterns
+    are bounded to that length. Scanning stops at the
+    first match, so cost is linear in the content size and memory is bounded by
+    the chunk size plus the carried bytes. Content that is not valid UTF-8 is
+    treated as binary and reported safe, as the original decode-based check did.
+    """
+    
+    def __init__(self, pattern_set: PatternSet):
+        self.pattern_set = pattern_set
+        self.bytes_scanned = 0
+        self.match: Optional[ScanMatch] = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._is_text = True
+        self._carry = b""
+    
+    def feed(self, chunk: bytes) -> None:
+        """
+        Scan the next chunk of content
+        
+        Args:
+            chunk: Next bytes of the content
+        """
+        if not chunk:
+            return
+        
+        if self._is_text:
+            try:
+                self._decoder.decode(chunk)
+            except UnicodeDecodeError:
+                self._is_text = False
+        
+        if self.match is None and self._is_text:
+            window = self._carry + chunk
+            window_offset = self.bytes_scanned - len(self._carry)
+            found = self.pattern_set.regex.search(window)
+            
+            if found is not None:
+                index = int(found.lastgroup[1:])
+                self.match = ScanMatch(
+                    pattern=self.pattern_set.patterns[index],
+                    offset=window_offset + found.start(),
+                    text=found.group(0)
+                )
+                self._carry = b""
+            else:
+                self._carry = window[-self.pattern_set.max_match_length:]
+        
+        self.bytes_scanned += len(chunk)
+    
+    def finish(self) -> Optional[ScanMatch]:
+        """
+        Finish scanning
+        
+        Returns:
+            The first dangerous match, or None if the content appears safe
+        """
+        if self._is_text:
+            try:
+                self._decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                self._is_text = False
+        
+        if not self._is_text:
+            return None
+        
+        return self.match
\ No newline at end of file
@@ -1,9 +1,10 @@
 import os
+import hashlib
 import shutil
 import tempfile
 import logging
 from pathlib import Path
-from typing import List, Optional, Set, Dict, Any, Union
+from typing import List, Optional, Set, Dict, Any, Tuple, Union
 import glob
 import json
 import yaml
@@ -59,6 +60,8 @@ def cleanup_directory(directory: str) -> None:
     Args:
         directory: Directory to clean up
     """
+    forget_directory(directory)
+    
     try:
         if os.path.exists(directory):
             shutil.rmtree(directory)
@@ -228,4 +231,206 @@ def get_relative_path(file_path: str, base_path: str) -> str:
     try:
         return os.path.relpath(file_path, base_path)
     except Exception:
-        return file_path
\ No newline at end of file
+        return file_path
+
+# Content hashes computed while files were written, keyed by path
+_file_hashes: Dict[str, Tuple[int, int, str]] = {}
+MAX_REMEMBERED_HASHES = 100000
+
+def remember_file_hash(file_path: str, digest: str) -> None:
+    """
+    Remember the content hash of a file that was just written
+    
+    The hash is reused by hash_file as long as the file size and mtime are unchanged
+    
+    Args:
+        file_path: Path to the file
+        digest: SHA-256 hex digest of the file contents
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return
+    
+    if len(_file_hashes) >= MAX_REMEMBERED_HASHES:
+        # Drop the oldest entry
+        _file_hashes.pop(next(iter(_file_hashes)))
+    
+    _file_hashes[file_path] = (stat.st_size, stat.st_mtime_ns, digest)
+
+def forget_file_hash(file_path: str) -> None:
+    """
+    Forget the remembered content hash of a file
+    
+    Args:
+        file_path: Path to the file
+    """
+    _file_hashes.pop(file_path, None)
+
+# Names the clients gave uploaded files, keyed by the path they were saved to
+_file_names: Dict[str, str] = {}
+
+def normalize_upload_name(filename: Optional[str]) -> str:
+    """
+    Reduce a client-supplied file name to a safe relative path
+    
+    Backslashes become slashes and empty, "." and ".." segments are dropped,
+    so "C:\\src\\main.c" gives "C:/src/main.c" and "../../etc/x" gives "etc/x"
+    
+    Args:
+        filename: File name sent by the client
+    
+    Returns:
+        Relative path using forward slashes (empty if nothing is left)
+    """
+    segments = (filename or "").replace("\\", "/").split("/")
+    return "/".join(segment for segment in segments if segment not in ("", ".", ".."))
+
+def remember_file_name(file_path: str, name: str) -> None:
+    """
+    Remember the name a client gave a file saved under another name
+    
+    Args:
+        file_path: Path the file was saved to
+        name: Name of the file on the client, as returned by normalize_upload_name
+    """
+    if len(_file_names) >= MAX_REMEMBERED_HASHES:
+        # Drop the oldest entry
+        _file_names.pop(next(iter(_file_names)))
+    
+    _file_names[os.path.abspath(file_path)] = name
+
+def get_file_name(file_path: str) -> Optional[str]:
+    """Get the client name remembered for a saved file, if any"""
+    return _file_names.get(os.path.abspath(file_path))
+
+def forget_file_name(file_path: str) -> None:
+    """
+    Forget the client name remembered for a saved file
+    
+    Args:
+        file_path: Path to the file
+    """
+    _file_names.pop(os.path.abspath(file_path), None)
+
+def forget_directory(directory: str) -> None:
+    """
+    Forget the remembered content hashes and client names of every file under a directory
+    
+    Args:
+        directory: Directory being removed
+    """
+    prefix = os.path.join(os.path.abspath(directory), "")
+    
+    for path in [path for path in _file_hashes if os.path.abspath(path).startswith(prefix)]:
+        _file_hashes.pop(path, None)
+    
+    for path in [path for path in _file_names if path.startswith(prefix)]:
+        _file_names.pop(path, None)
+
+def move_saved_file(file_path: str, directory: str, relative_path: str) -> str:
+    """
+    Move a saved upload to its relative path under a directory
+    
+    The remembered content hash and client name move with the file
+    
+    Args:
+        file_path: Path the upload was saved to
+        directory: Directory to lay the file out in
+        relative_path: Normalized relative path (see normalize_upload_name)
+    
+    Returns:
+        New path of the file
+    
+    Raises:
+        FileException: If another file was already moved to the same path
+    """
+    target_path = os.path.join(directory, *relative_path.split("/"))
+    
+    if os.path.exists(target_path):
+        raise FileException(
+            message="Several uploaded files have the same path",
+            status_code=400,
+            details={"path": relative_path}
+        )
+    
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    os.replace(file_path, target_path)
+    
+    remembered = _file_hashes.pop(file_path, None)
+    if remembered is not None:
+        _file_hashes[target_path] = remembered
+    
+    forget_file_name(file_path)
+    remember_file_name(target_path, relative_path)
+    
+    return target_path
+
+def get_cache_name(file_path: str) -> str:
+    """
+    Get the part of a saved file's name that tools can see, for cache keys
+    
+    Files extracted from archives are saved under their relative path, which
+    path-based rules and include directives depend on; other uploads get a
+    random name and only keep their extension.
+    
+    Args:
+        file_path: Path to the saved file
+    
+    Returns:
+        Relative path of the file in its workspace, or its lowercase extension
+    """
+    name = get_file_name(file_path)
+    if name and os.path.abspath(file_path).replace(os.sep, "/").endswith(f"/{name}"):
+        return name
+    return os.path.splitext(file_path)[1].lower()
+
+def get_content_keys(file_paths: List[str]) -> List[List[str]]:
+    """
+    Describe files for a cache key by the name tools see and their content hash
+    
+    Args:
+        file_paths: Paths to the files
+    
+    Returns:
+        [cache name, SHA-256 hex digest] for each file, in the same order
+    
+    Raises:
+        FileException: If a file cannot be read
+    """
+    return [[get_cache_name(path), hash_file(path)] for path in file_paths]
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 hash of a file's contents
+    
+    Hashes remembered when the file was written are reused without reading the file
+    
+    Args:
+        file_path: Path to the file
+        chunk_size: Number of bytes read at a time
+    
+    Returns:
+        Hex digest of the file contents
+    
+    Raises:
+        FileException: If file cannot be read
+    """
+    try:
+        remembered = _file_hashes.get(file_path)
+        if remembered is not None:
+            stat = os.stat(file_path)
+            if remembered[0] == stat.st_size and remembered[1] == stat.st_mtime_ns:
+                return remembered[2]
+        
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except Exception as e:
+        logger.error(f"Error hashing file {file_path}: {str(e)}")
+        raise FileException(
+            message=f"Could not hash file: {str(e)}",
+            details={"file_path": file_path}
+        )
\ No newline at end of file
@@ -0,0 +1,70 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the values a response depends on
+    
+    Args:
+        parts: Values identifying the response, e.g. a catalog version and the query string
+    
+    Returns:
+        Quoted entity tag
+    """
+    digest = hashlib.sha256("\0".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+def get_cache_control() -> str:
+    """Get the Cache-Control value for catalog responses"""
+    max_age = settings.CATALOG_CACHE_MAX_AGE
+    if max_age > 0:
+        return f"public, max-age={max_age}, must-revalidate"
+    # Clients may keep the response but must revalidate it, which a 304 makes cheap
+    return "no-cache"
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Check whether the client already has the current representation
+    
+    If-None-Match uses weak comparison, so W/ prefixes are ignored
+    
+    Args:
+        request: Incoming request
+        etag: ETag of the current representation
+    
+    Returns:
+        True if If-None-Match lists the ETag (or is "*")
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    
+    return False
+
+def not_modified_response(etag: str) -> Response:
+    """Build an empty 304 response carrying the validators"""
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": get_cache_control()}
+    )
+
+def set_cache_headers(response: Response, etag: Optional[str]) -> None:
+    """Add ETag and Cache-Control headers to a response"""
+    if etag is None:
+        return
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = get_cache_control()
\ No newline at end of file
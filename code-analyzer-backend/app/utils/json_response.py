@@ -0,0 +1,55 @@
+import json
+import time
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.background import BackgroundTask
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for large analysis results
+    
+    Returning this from a handler skips FastAPI's response_model validation
+    and jsonable_encoder pass, so it is only meant for content that already
+    has the shape of the declared response model (the formatted results of
+    the analysis services). The route keeps its response_model, so the
+    OpenAPI schema is unchanged. Content is encoded with orjson when it is
+    installed and compact stdlib json otherwise, and the encoding time is
+    reported in a Server-Timing header.
+    """
+    
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        started = time.perf_counter()
+        super().__init__(content, status_code, headers, media_type, background)
+        self.serialization_seconds = time.perf_counter() - started
+        
+        self.headers["Server-Timing"] = f"serialize;dur={self.serialization_seconds * 1000:.3f}"
+        logger.debug(f"Serialized {len(self.body)} bytes in {self.serialization_seconds * 1000:.1f}ms")
+    
+    def render(self, content: Any) -> bytes:
+        """Encode content as UTF-8 JSON"""
+        if orjson is not None:
+            return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+        
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
\ No newline at end of file
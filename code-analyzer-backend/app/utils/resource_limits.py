@@ -0,0 +1,344 @@
+import asyncio
+import logging
+import os
+import re
+import signal
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Suffixes accepted by parse_size
+SIZE_UNITS = {
+    "": 1,
+    "K": 1024,
+    "M": 1024 ** 2,
+    "G": 1024 ** 3,
+    "T": 1024 ** 4,
+}
+
+# Clock ticks per second used by /proc/<pid>/stat CPU times
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+def parse_size(value: Any) -> Optional[int]:
+    """
+    Parse a size such as "4G", "512M" or 1048576 into bytes
+    
+    Args:
+        value: Size as an integer number of bytes or a string with an optional K/M/G/T suffix
+    
+    Returns:
+        Size in bytes, or None if no size is set
+    
+    Raises:
+        ValueError: If the size cannot be parsed
+    """
+    if value is None or value == "":
+        return None
+    
+    if isinstance(value, (int, float)):
+        return int(value)
+    
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+def parse_cpu_list(value: Any) -> Optional[List[int]]:
+    """
+    Parse a CPU list such as "0-3,6" into CPU numbers
+    
+    Args:
+        value: CPU list string, or a list of CPU numbers
+    
+    Returns:
+        Sorted CPU numbers, or None if no affinity is set
+    
+    Raises:
+        ValueError: If the list cannot be parsed
+    """
+    if value is None or value == "" or value == []:
+        return None
+    
+    if isinstance(value, (list, tuple, set)):
+        return sorted(int(cpu) for cpu in value)
+    
+    cpus = set()
+    for part in str(value).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    
+    return sorted(cpus) or None
+
+class ResourceProfile:
+    """
+    Resource limits applied to a tool's processes
+    
+    max_memory caps the address space of every process (RLIMIT_AS) and is
+    enforced by the kernel. max_rss caps the resident memory of the whole
+    process group; Linux ignores RLIMIT_RSS, so it is enforced by the
+    ResourceMonitor killing the group. nice and cpu_affinity are applied to
+    the process before it executes the tool and are inherited by its children.
+    nice can only lower the priority: raising it needs privileges the server
+    should not run with, so negative values are treated as 0.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        max_memory: Optional[int] = None,
+        max_rss: Optional[int] = None,
+        nice: int = 0,
+        cpu_affinity: Optional[List[int]] = None,
+    ):
+        self.name = name
+        self.max_memory = max_memory
+        self.max_rss = max_rss
+        self.nice = nice
+        self.cpu_affinity = cpu_affinity
+    
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> "ResourceProfile":
+        """
+        Build a profile from a tool configuration dictionary
+        
+        Args:
+            name: Tool name
+            config: Tool configuration (e.g. settings.SEMGREP_CONFIG)
+        
+        Returns:
+            Resource profile
+        """
+        nice = int(config.get("nice") or 0)
+        if nice < 0:
+            # os.nice with a negative increment fails in the child without CAP_SYS_NICE
+            logger.warning(f"Ignoring negative nice value {nice} for {name}; only lowering the priority is supported")
+            nice = 0
+        
+        return cls(
+            name=name,
+            max_memory=parse_size(config.get("max_memory")),
+            max_rss=parse_size(config.get("max_rss")),
+            nice=nice,
+            cpu_affinity=parse_cpu_list(config.get("cpu_affinity")),
+        )
+    
+    def preexec_fn(self) -> Optional[Callable[[], None]]:
+        """
+        Get a function that applies the limits in the child process
+        
+        Returns:
+            Function to pass as preexec_fn, or None if there is nothing to apply
+        """
+        if not self.max_memory and not self.nice and not self.cpu_affinity:
+            return None
+        
+        max_memory = self.max_memory
+        nice = self.nice
+        cpu_affinity = self.cpu_affinity
+        
+        def apply_limits() -> None:
+            # Runs between fork and exec, so it must not log or take locks
+            if max_memory and resource is not None:
+                resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+            if nice:
+                os.nice(nice)
+            if cpu_affinity and hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(0, cpu_affinity)
+        
+        return apply_limits
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the profile to a dictionary"""
+        return {
+            "max_memory": self.max_memory,
+            "max_rss": self.max_rss,
+            "nice": self.nice,
+            "cpu_affinity": self.cpu_affinity,
+        }
+
+def kill_process_group(pid: int) -> None:
+    """
+    Kill a process and everything in its process group
+    
+    The process must have been started with start_new_session=True so that
+    its pid is also its process group id
+    """
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, AttributeError):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except Exception:
+            pass
+
+# Whether the kernel lists each thread's children in /proc/<pid>/task/<tid>/children
+PROC_CHILDREN_SUPPORTED = os.path.exists(f"/proc/self/task/{os.getpid()}/children")
+
+class ResourceMonitor:
+    """
+    Samples the memory and CPU use of a process tree from /proc
+    
+    Peak RSS is the highest sum of VmRSS, or of the per-process high-water
+    marks (VmHWM), seen across the tree. CPU time includes reaped children.
+    Only the monitored process and its descendants are visited, following
+    /proc/<pid>/task/*/children, and background samples are taken in a
+    thread so many monitored processes do not block the event loop. Kernels
+    without the children files fall back to scanning /proc for the process
+    group. Sampling is best effort: on systems without /proc only wall time
+    is reported.
+    """
+    
+    def __init__(self, pid: int, profile: ResourceProfile, interval: float):
+        self.pid = pid
+        self.profile = profile
+        self.interval = interval
+        self.peak_rss = 0
+        self.cpu_seconds = 0.0
+        self.processes = 0
+        self.killed_reason: Optional[str] = None
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start sampling in the background"""
+        self._task = asyncio.ensure_future(self._run())
+    
+    async def stop(self) -> None:
+        """Stop sampling"""
+        self._finished = time.monotonic()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    def sample(self) -> None:
+        """Record one sample of the process tree"""
+        rss = 0
+        hwm = 0
+        cpu_ticks = 0
+        processes = 0
+        
+        for pid in self._tree_pids() if PROC_CHILDREN_SUPPORTED else self._group_pids():
+            try:
+                with open(f"/proc/{pid}/stat", 'r') as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                with open(f"/proc/{pid}/status", 'r') as f:
+                    status = f.read()
+            except OSError:
+                continue
+            
+            # Fields after the command name: utime, stime, cutime, cstime are 14-17 in proc(5)
+            cpu_ticks += sum(int(value) for value in fields[11:15])
+            rss += _status_kib(status, "VmRSS") * 1024
+            hwm += _status_kib(status, "VmHWM") * 1024
+            processes += 1
+        
+        if processes:
+            self.peak_rss = max(self.peak_rss, rss, hwm)
+            self.cpu_seconds = max(self.cpu_seconds, cpu_ticks / CLOCK_TICKS)
+            self.processes = max(self.processes, processes)
+        
+        if self.profile.max_rss and rss > self.profile.max_rss and self.killed_reason is None:
+            self.killed_reason = f"resident memory {rss} bytes exceeded limit of {self.profile.max_rss} bytes"
+            logger.warning(f"Killing {self.profile.name} process group {self.pid}: {self.killed_reason}")
+            kill_process_group(self.pid)
+    
+    def usage(self) -> Dict[str, Any]:
+        """Get the usage recorded for the run"""
+        finished = self._finished or time.monotonic()
+        return {
+            "peak_rss_bytes": self.peak_rss,
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "wall_seconds": round(finished - self._started, 4),
+            "processes": self.processes,
+            "killed_reason": self.killed_reason,
+            "limits": self.profile.to_dict(),
+        }
+    
+    async def _run(self) -> None:
+        """Sample until stopped, starting right away so short runs are still measured"""
+        while True:
+            await asyncio.to_thread(self.sample)
+            await asyncio.sleep(self.interval)
+    
+    def _tree_pids(self) -> List[int]:
+        """List the monitored process and its descendants"""
+        pids = []
+        pending = [self.pid]
+        
+        while pending:
+            pid = pending.pop()
+            try:
+                tids = os.listdir(f"/proc/{pid}/task")
+            except OSError:
+                continue
+            
+            pids.append(pid)
+            for tid in tids:
+                try:
+                    with open(f"/proc/{pid}/task/{tid}/children", 'r') as f:
+                        pending.extend(int(child) for child in f.read().split())
+                except OSError:
+                    continue
+        
+        return pids
+    
+    def _group_pids(self) -> List[int]:
+        """List the processes in the monitored process group"""
+        try:
+            names = os.listdir("/proc")
+        except OSError:
+            return []
+        
+        pids = []
+        for name in names:
+            if not name.isdigit():
+                continue
+            try:
+                if os.getpgid(int(name)) == self.pid:
+                    pids.append(int(name))
+            except OSError:
+                continue
+        
+        return pids
+
+def _status_kib(status: str, field: str) -> int:
+    """Read a "<field>: <n> kB" value from /proc/<pid>/status"""
+    match = re.search(rf"^{field}:\s+(\d+)", status, re.MULTILINE)
+    return int(match.group(1)) if match else 0
+
+def summarize_usage(usages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Combine the usage of several runs of one tool
+    
+    Args:
+        usages: Usage dictionaries from ResourceMonitor.usage
+    
+    Returns:
+        Combined usage (highest peak, total CPU), or None if there were no runs
+    """
+    if not usages:
+        return None
+    
+    return {
+        "runs": len(usages),
+        "peak_rss_bytes": max(usage["peak_rss_bytes"] for usage in usages),
+        "cpu_seconds": round(sum(usage["cpu_seconds"] for usage in usages), 3),
+        "wall_seconds": round(sum(usage["wall_seconds"] for usage in usages), 4),
+        "killed": sum(1 for usage in usages if usage["killed_reason"]),
+        "limits": usages[0]["limits"],
+    }
\ No newline at end of file
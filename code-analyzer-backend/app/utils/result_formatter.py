@@ -1,20 +1,137 @@
 import json
+import hashlib
 import logging
 import os
 import re
 from typing import Dict, List, Any, Optional, Union
-import uuid
 
 from app.core.errors import AppException
+from app.utils.file_utils import get_file_name
 
 logger = logging.getLogger(__name__)
 
-def format_semgrep_results(raw_output: str, files_analyzed: List[str]) -> Dict[str, Any]:
+# Tool and the field naming the rule of an item, by the key of the item list
+FINGERPRINTED_ITEMS = {
+    "findings": ("semgrep", "rule"),
+    "issues": ("clangtidy", "check"),
+    "vulnerabilities": ("snyk", "vulnerability"),
+}
+
+def get_fingerprint_path(file_path: str, workspace: Optional[str]) -> str:
+    """
+    Get the path of a file as used in fingerprints
+    
+    Uploaded files are identified by the name the client gave them, other
+    files by their path relative to the workspace of the analysis
+    
+    Args:
+        file_path: Path reported by the tool
+        workspace: Deepest directory containing the analyzed files
+    
+    Returns:
+        Relative path using forward slashes
+    """
+    name = get_file_name(file_path)
+    if name:
+        return name
+    
+    path = os.path.abspath(file_path)
+    if workspace:
+        try:
+            path = os.path.relpath(path, workspace)
+        except ValueError:
+            pass
+    return path.replace(os.sep, "/")
+
+def normalize_snippet(code: str) -> str:
+    """Collapse whitespace so re-indented or reflowed code keeps its fingerprint"""
+    return " ".join(code.split())
+
+def fingerprint_items(
+    items: List[Dict[str, Any]],
+    items_key: str,
+    files_analyzed: List[str],
+    seen: Optional[Dict[str, int]] = None
+) -> None:
+    """
+    Give formatted findings stable ids
+    
+    The id hashes the tool, the rule or check, the normalized relative path,
+    the line and column, and a hash of the whitespace-normalized source line
+    (read from the file, or the snippet reported by the tool when the file
+    cannot be read). Items that would still share an id, e.g. two messages of
+    one check at the same position, get an ordinal suffix ("-2", "-3", ...)
+    in their output order. The same code analyzed again therefore gets the
+    same ids, whatever the files were called on disk.
+    
+    Args:
+        items: Formatted findings (modified in place)
+        items_key: Key of the list of findings ("findings", "issues" or "vulnerabilities")
+        files_analyzed: List of files that were analyzed
+        seen: Ordinal counts shared by several calls, so the parts of one run
+            (e.g. the batches of a streamed analysis) number collisions as if
+            they were formatted together (optional)
+    """
+    tool, rule_field = FINGERPRINTED_ITEMS[items_key]
+    
+    try:
+        workspace = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files_analyzed])
+    except ValueError:
+        workspace = None
+    
+    source_lines: Dict[str, List[str]] = {}
+    if seen is None:
+        seen = {}
+    
+    for item in items:
+        file_path = item.get("file", "unknown")
+        line = item.get("line") or 0
+        
+        if items_key == "vulnerabilities":
+            # Dependencies have no source location; the package version stands in for the snippet
+            path = file_path
+            snippet = f"{item.get('package')}@{item.get('version')}"
+        else:
+            path = get_fingerprint_path(file_path, workspace)
+            snippet = _read_source_line(source_lines, file_path, line)
+            if snippet is None:
+                snippet = item.get("code") or ""
+        
+        snippet_hash = hashlib.sha256(normalize_snippet(snippet).encode("utf-8")).hexdigest()
+        key = "\0".join([
+            tool,
+            str(item.get(rule_field, "unknown")),
+            path,
+            str(line),
+            str(item.get("column") or 0),
+            snippet_hash,
+        ])
+        fingerprint = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        
+        count = seen.get(fingerprint, 0) + 1
+        seen[fingerprint] = count
+        item["id"] = fingerprint if count == 1 else f"{fingerprint}-{count}"
+
+def _read_source_line(cache: Dict[str, List[str]], file_path: str, line: int) -> Optional[str]:
+    """Get one line of a source file, reading each file at most once per pass"""
+    if file_path not in cache:
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                cache[file_path] = f.read().splitlines()
+        except OSError:
+            cache[file_path] = []
+    
+    lines = cache[file_path]
+    if 1 <= line <= len(lines):
+        return lines[line - 1]
+    return None
+
+def format_semgrep_results(raw_output: Union[str, Dict[str, Any]], files_analyzed: List[str]) -> Dict[str, Any]:
     """
     Format Semgrep results into a standardized format
     
     Args:
-        raw_output: Raw JSON output from Semgrep
+        raw_output: Raw JSON output from Semgrep, or the already parsed output
         files_analyzed: List of files that were analyzed
     
     Returns:
@@ -25,7 +142,7 @@ def format_semgrep_results(raw_output: str, files_analyzed: List[str]) -> Dict[s
     """
     try:
         # Parse JSON output
-        results = json.loads(raw_output)
+        results = json.loads(raw_output) if isinstance(raw_output, str) else raw_output
         
         # Initialize formatted result
         formatted_results = {
@@ -61,9 +178,6 @@ def format_semgrep_results(raw_output: str, files_analyzed: List[str]) -> Dict[s
             else:
                 standardized_severity = "INFO"
             
-            # Generate a unique ID for the finding
-            finding_id = str(uuid.uuid4())
-            
             # Extract file path and make it relative if possible
             path = finding.get("path", "unknown")
             
@@ -72,7 +186,7 @@ def format_semgrep_results(raw_output: str, files_analyzed: List[str]) -> Dict[s
             
             # Format the finding
             formatted_finding = {
-                "id": finding_id,
+                "id": "",
                 "rule": finding.get("check_id", "unknown"),
                 "severity": standardized_severity,
                 "message": finding.get("extra", {}).get("message", "No message provided"),
@@ -92,6 +206,9 @@ def format_semgrep_results(raw_output: str, files_analyzed: List[str]) -> Dict[s
         # Update files with findings count
         formatted_results["stats"]["files_with_findings"] = len(files_with_findings)
         
+        # Give every item a stable id
+        fingerprint_items(formatted_results["findings"], "findings", files_analyzed)
+        
         return formatted_results
         
     except json.JSONDecodeError as e:
@@ -109,12 +226,12 @@ def format_semgrep_results(raw_output: str, files_analyzed: List[str]) -> Dict[s
             details={"error": str(e)}
         )
 
-def format_snyk_results(raw_output: str, files_analyzed: List[str]) -> Dict[str, Any]:
+def format_snyk_results(raw_output: Union[str, Dict[str, Any]], files_analyzed: List[str]) -> Dict[str, Any]:
     """
     Format Snyk results into a standardized format
     
     Args:
-        raw_output: Raw JSON output from Snyk
+        raw_output: Raw JSON output from Snyk, or the already parsed output
         files_analyzed: List of files that were analyzed
     
     Returns:
@@ -125,7 +242,7 @@ def format_snyk_results(raw_output: str, files_analyzed: List[str]) -> Dict[str,
     """
     try:
         # Parse JSON output
-        results = json.loads(raw_output)
+        results = json.loads(raw_output) if isinstance(raw_output, str) else raw_output
         
         # Initialize formatted result
         formatted_results = {
@@ -160,16 +277,13 @@ def format_snyk_results(raw_output: str, files_analyzed: List[str]) -> Dict[str,
             if severity not in ["CRITICAL", "HIGH", "MEDIUM", "LOW"]:
                 severity = "LOW"
             
-            # Generate a unique ID for the vulnerability
-            vuln_id = str(uuid.uuid4())
-            
             # Get package information
             package_name = vuln.get("packageName", "unknown")
             file_path = vuln.get("from", ["unknown"])[0] if vuln.get("from") else "unknown"
             
             # Format the vulnerability
             formatted_vuln = {
-                "id": vuln_id,
+                "id": "",
                 "vulnerability": vuln.get("id", "unknown"),
                 "severity": severity,
                 "description": vuln.get("title", "No description provided"),
@@ -189,6 +303,9 @@ def format_snyk_results(raw_output: str, files_analyzed: List[str]) -> Dict[str,
         # Update files with vulnerabilities count
         formatted_results["stats"]["files_with_vulnerabilities"] = len(files_with_vulns)
         
+        # Give every item a stable id
+        fingerprint_items(formatted_results["vulnerabilities"], "vulnerabilities", files_analyzed)
+        
         return formatted_results
         
     except json.JSONDecodeError as e:
@@ -206,13 +323,18 @@ def format_snyk_results(raw_output: str, files_analyzed: List[str]) -> Dict[str,
             details={"error": str(e)}
         )
 
-def format_clangtidy_results(raw_output: str, files_analyzed: List[str]) -> Dict[str, Any]:
+def format_clangtidy_results(
+    raw_output: str,
+    files_analyzed: List[str],
+    seen: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
     """
     Format ClangTidy results into a standardized format
     
     Args:
         raw_output: Raw output from ClangTidy
         files_analyzed: List of files that were analyzed
+        seen: Fingerprint ordinal counts shared across calls (see fingerprint_items)
     
     Returns:
         Dictionary containing formatted results
@@ -257,12 +379,9 @@ def format_clangtidy_results(raw_output: str, files_analyzed: List[str]) -> Dict
             else:
                 severity = 'INFO'
             
-            # Generate a unique ID for the issue
-            issue_id = str(uuid.uuid4())
-            
             # Format the issue
             formatted_issue = {
-                "id": issue_id,
+                "id": "",
                 "check": check,
                 "severity": severity,
                 "message": message,
@@ -282,6 +401,9 @@ def format_clangtidy_results(raw_output: str, files_analyzed: List[str]) -> Dict
         # Update files with issues count
         formatted_results["stats"]["files_with_issues"] = len(files_with_issues)
         
+        # Give every item a stable id
+        fingerprint_items(formatted_results["issues"], "issues", files_analyzed, seen)
+        
         return formatted_results
         
     except Exception as e:
@@ -290,4 +412,39 @@ def format_clangtidy_results(raw_output: str, files_analyzed: List[str]) -> Dict
             status_code=500,
             message="Error formatting ClangTidy results",
             details={"error": str(e)}
-        )
\ No newline at end of file
+        )
+
+def relocate_results(
+    results: Dict[str, Any],
+    items_key: str,
+    old_paths: List[str],
+    new_paths: List[str]
+) -> Dict[str, Any]:
+    """
+    Rewrite file paths in formatted results produced for another set of files
+    
+    Used when results computed for one upload are reused for another upload
+    with identical contents, e.g. from the result cache
+    
+    Args:
+        results: Formatted results (modified in place)
+        items_key: Key of the list of findings ("findings", "issues" or "vulnerabilities")
+        old_paths: Paths the results were produced for
+        new_paths: Paths of the current files, in the same order
+    
+    Returns:
+        The results with file paths rewritten
+    """
+    mapping = {}
+    for old_path, new_path in zip(old_paths, new_paths):
+        mapping[old_path] = new_path
+        mapping[os.path.abspath(old_path)] = new_path
+    
+    for item in results.get(items_key, []):
+        if item.get("file") in mapping:
+            item["file"] = mapping[item["file"]]
+    
+    # The new files may have been uploaded under other names
+    fingerprint_items(results.get(items_key, []), items_key, new_paths)
+    
+    return results
\ No newline at end of file
@@ -0,0 +1,192 @@
+import re
+import json
+import time
+import base64
+import bisect
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Words are runs of letters and digits, so "bugprone-use-after-move" gives four terms
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+class SearchIndex:
+    """
+    Inverted index over a fixed list of documents
+    
+    Every term of the text fields maps to the documents containing it, and
+    every value of a facet field maps to the documents having it. Postings are
+    bitmaps held in Python ints (bit n set for document n), so intersections
+    are a bitwise and and counts a popcount. A query matches documents
+    containing all of its terms, where each term also matches longer terms it
+    is a prefix of (found by bisecting the sorted vocabulary), so "strc" finds
+    "strcpy". Facet filters are intersected in, and facet counts are computed
+    over the matches with the filters of every other facet applied. Results
+    keep the document order, which makes an opaque "last position" cursor
+    enough for pagination.
+    """
+    
+    def __init__(
+        self,
+        documents: List[Dict[str, Any]],
+        text_fields: List[str],
+        facet_fields: Dict[str, Callable[[Any], str]],
+        version: str,
+    ):
+        """
+        Args:
+            documents: Documents to index, in result order
+            text_fields: Fields whose words can be searched (strings or lists of strings)
+            facet_fields: Fields usable as filters and counted as facets, with a
+                function normalizing each value (strings or lists of strings)
+            version: Version of the documents, embedded in cursors
+        """
+        self.documents = documents
+        self.facet_fields = facet_fields
+        self.version = version
+        self._postings: Dict[str, int] = {}
+        self._facets: Dict[str, Dict[str, int]] = {field: {} for field in facet_fields}
+        
+        for position, document in enumerate(documents):
+            bit = 1 << position
+            
+            for field in text_fields:
+                for value in self._values(document.get(field)):
+                    for term in tokenize(value):
+                        self._postings[term] = self._postings.get(term, 0) | bit
+            
+            for field, normalize in facet_fields.items():
+                values = self._facets[field]
+                for value in self._values(document.get(field)):
+                    key = normalize(value)
+                    values[key] = values.get(key, 0) | bit
+        
+        self._vocabulary = sorted(self._postings)
+        self._all = (1 << len(documents)) - 1
+    
+    def search(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[Dict[str, Optional[str]]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Find the documents matching a query and facet filters
+        
+        Args:
+            query: Words that must all appear (as words or word prefixes)
+            filters: Facet field to required value; None values are ignored
+            limit: Maximum number of documents to return
+            cursor: Cursor from a previous page of the same search
+        
+        Returns:
+            Dictionary with "items" (one page of documents), "total" matches,
+            "next_cursor" (None on the last page), "facets" (counts per value
+            of every facet field) and "took_ms"
+        
+        Raises:
+            ValueError: If a filter names an unknown facet or the cursor is invalid
+        """
+        started = time.perf_counter()
+        filters = {field: value for field, value in (filters or {}).items() if value not in (None, "")}
+        
+        for field in filters:
+            if field not in self.facet_fields:
+                raise ValueError(f"Cannot filter on '{field}'")
+        
+        after = self._decode_cursor(cursor) if cursor else -1
+        
+        matches = self._match_query(query)
+        filter_bits = {
+            field: self._facets[field].get(self.facet_fields[field](value), 0)
+            for field, value in filters.items()
+        }
+        
+        results = matches
+        for bits in filter_bits.values():
+            results &= bits
+        
+        # Count each facet over the matches filtered by every other facet
+        facets = {}
+        for field, values in self._facets.items():
+            base = matches
+            for other, bits in filter_bits.items():
+                if other != field:
+                    base &= bits
+            facets[field] = {
+                value: count
+                for value, count in sorted((value, (base & bits).bit_count()) for value, bits in values.items())
+                if count
+            }
+        
+        # Take the lowest set bits after the cursor position
+        page = []
+        remaining = results >> (after + 1) << (after + 1)
+        while remaining and len(page) < limit:
+            lowest = remaining & -remaining
+            page.append(lowest.bit_length() - 1)
+            remaining ^= lowest
+        
+        return {
+            "items": [self.documents[position] for position in page],
+            "total": results.bit_count(),
+            "next_cursor": self._encode_cursor(page[-1]) if page and remaining else None,
+            "facets": facets,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+    
+    def _match_query(self, query: Optional[str]) -> int:
+        """Get the documents containing every query term (or a longer term it prefixes)"""
+        terms = tokenize(query or "")
+        if not terms:
+            return self._all
+        
+        matches = self._all
+        
+        for term in set(terms):
+            matches &= self._expand(term)
+            if not matches:
+                return 0
+        
+        return matches
+    
+    def _expand(self, prefix: str) -> int:
+        """Get the documents containing any term starting with prefix"""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        
+        bits = 0
+        for term in self._vocabulary[start:end]:
+            bits |= self._postings[term]
+        return bits
+    
+    def _encode_cursor(self, position: int) -> str:
+        """Build an opaque cursor pointing after a position"""
+        raw = json.dumps({"v": self.version, "p": position}).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+    
+    def _decode_cursor(self, cursor: str) -> int:
+        """Read the position from a cursor built by this index version"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            data = json.loads(raw)
+            position = int(data["p"])
+        except Exception:
+            raise ValueError("Invalid cursor")
+        
+        if data.get("v") != self.version:
+            raise ValueError("Cursor belongs to an older version of the catalog, restart the search")
+        
+        return position
+    
+    @staticmethod
+    def _values(value: Any) -> Iterable[str]:
+        """Get the string values of a field, which may be a list"""
+        if value is None:
+            return []
+        if isinstance(value, (list, tuple, set)):
+            return [str(item) for item in value]
+        return [str(value)]
\ No newline at end of file
@@ -0,0 +1,98 @@
+import asyncio
+import copy
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    """A running call and the number of callers waiting on it"""
+    
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into one execution
+    
+    The first caller for a key starts the call in its own task; callers that
+    arrive with the same key while it runs wait for that task instead of
+    starting another. Callers can modify the result freely: the last waiter
+    to resume gets the value itself and any other waiter of a shared call
+    gets a deep copy, so an uncontended call is never copied. A caller that is cancelled only stops
+    waiting: the shared call is cancelled when its last waiter goes away.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._counters = {
+            "started": 0,
+            "coalesced": 0,
+            "abandoned": 0,
+        }
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn, or join the identical call already running
+        
+        Args:
+            key: Key identifying identical calls
+            fn: Function starting the call
+        
+        Returns:
+            Tuple of (result owned by this caller, whether the call was shared with an earlier caller)
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._forget(key, flight))
+            self._counters["started"] += 1
+        else:
+            self._counters["coalesced"] += 1
+            logger.debug(f"Joined in-flight call {key[:12]} ({flight.waiters} already waiting)")
+        
+        flight.waiters += 1
+        
+        try:
+            value = await asyncio.shield(flight.task)
+        
+        except asyncio.CancelledError:
+            # Stop the shared call only when nobody else is waiting for it
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                self._counters["abandoned"] += 1
+            raise
+        
+        finally:
+            flight.waiters -= 1
+        
+        # The finished call takes no new waiters, so once the others have resumed
+        # (and copied the value) the last one can keep the value itself
+        if flight.waiters:
+            return copy.deepcopy(value), shared
+        
+        return value, shared
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of running calls and counters"""
+        return {
+            "in_flight": len(self._flights),
+            "waiters": sum(flight.waiters for flight in self._flights.values()),
+            **self._counters,
+        }
+    
+    def _forget(self, key: str, flight: _Flight) -> None:
+        """Drop a finished call so later callers start afresh"""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        
+        # Retrieve the exception so an abandoned failure is not reported as unhandled
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+# Create singleflight instance shared by the analysis services
+analysis_flights = SingleFlight()
\ No newline at end of file
@@ -137,7 +137,8 @@ def extract_semgrep_rule_metadata(rule_data: Dict[str, Any]) -> Dict[str, Any]:
             "id": rule.get("id", "unknown"),
             "name": rule.get("id", "unknown"),  # Use ID as name if name is not present
             "description": rule.get("message", ""),
-            "severity": rule.get("severity", "INFO")
+            "severity": rule.get("severity", "INFO"),
+            "languages": [str(lang) for lang in rule.get("languages", []) or []]
         }
         
         # Try to use a better name than the ID if available
@@ -149,28 +150,19 @@ def extract_semgrep_rule_metadata(rule_data: Dict[str, Any]) -> Dict[str, Any]:
     
     return result
 
-def generate_semgrep_config(rule_ids: List[str], rules_path: str) -> Dict[str, Any]:
+def generate_semgrep_config(rule_definitions: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Generate a Semgrep configuration file content for selected rules
     
     Args:
-        rule_ids: List of rule IDs to include
-        rules_path: Path to the rules directory
+        rule_definitions: Full definitions of the rules to include, as written in their rule files
     
     Returns:
         Dictionary containing Semgrep configuration
     """
-    config = {
-        "rules": [],
-        "includes": [],
-        "excludes": []
+    return {
+        "rules": list(rule_definitions)
     }
-    
-    # Add rule IDs
-    for rule_id in rule_ids:
-        config["rules"].append(rule_id)
-    
-    return config
 
 def serialize_yaml(data: Dict[str, Any]) -> str:
     """
@@ -3,6 +3,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routers import api_router
 from app.core.config import settings
+from app.services.job_service import job_manager
+from app.services.tool_registry import tool_registry
+from app.utils.file_utils import ensure_directory_exists
 
 # Khởi tạo ứng dụng FastAPI
 app = FastAPI(
@@ -26,6 +29,18 @@ app.add_middleware(
 # Đăng ký API router
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
+# Probe analysis tools and start job workers at startup
+@app.on_event("startup")
+async def startup():
+    ensure_directory_exists(settings.UPLOAD_DIR)
+    await tool_registry.start()
+    await job_manager.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_manager.stop()
+    await tool_registry.stop()
+
 # Định nghĩa route gốc
 @app.get("/", tags=["Root"])
 async def root():
@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services.result_cache import ResultCache
+from main import app
+
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    """Keep the uploads and caches of each test in its own directory"""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path / "cache"))
+
+@pytest.fixture
+def client():
+    """API client; startup events are not run, so no tool is probed"""
+    return TestClient(app)
+
+@pytest.fixture
+def cache(tmp_path):
+    """Empty result cache with a disk tier"""
+    return ResultCache(str(tmp_path / "results"), memory_limit=1024 * 1024, disk_limit=1024 * 1024)
+
+@pytest.fixture
+def make_file(tmp_path):
+    """Write a file below tmp_path (or another directory) and return its path"""
+    def make(name: str, content: bytes, directory=None) -> str:
+        path = (directory or tmp_path) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return str(path)
+    
+    return make
@@ -0,0 +1,31 @@
+import pytest
+
+from app.services.baseline_service import BaselineStore
+from app.api.endpoints import baselines
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    store = BaselineStore(str(tmp_path / "baselines"))
+    monkeypatch.setattr(baselines, "baseline_store", store)
+    return store
+
+def test_save_and_get_baseline(client):
+    response = client.put("/api/baselines/main", json={"fingerprints": {"semgrep": ["a", "b"]}})
+    
+    assert response.status_code == 200
+    assert response.json()["baseline"]["counts"] == {"semgrep": 2}
+    
+    response = client.get("/api/baselines/main")
+    
+    assert response.status_code == 200
+    assert response.json()["baseline"]["id"] == "main"
+
+def test_missing_baseline_is_404(client):
+    assert client.get("/api/baselines/main").status_code == 404
+    assert client.delete("/api/baselines/main").status_code == 404
+
+def test_invalid_baseline_id_is_400(client):
+    response = client.put("/api/baselines/..hidden", json={"fingerprints": {}})
+    
+    assert response.status_code == 400
+    assert "pattern" in response.json()["detail"]["details"]
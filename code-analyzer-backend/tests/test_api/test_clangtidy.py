@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services import clangtidy_service, incremental_service
+from app.services.clangtidy_service import ClangTidyService
+from app.services.tool_registry import tool_registry
+from app.utils.admission import AdmissionGate, admission_controller
+from app.utils.command_executor import CommandResult
+
+MAIN = b'#include "util.h"\nint main(void) { return 0; }\n'
+
+@pytest.fixture(autouse=True)
+def clangtidy(monkeypatch, cache):
+    """ClangTidy reported as installed, with an empty result store"""
+    async def available():
+        return True
+    
+    async def get_version(tool):
+        return "17.0.0"
+    
+    monkeypatch.setattr(ClangTidyService, "check_availability", staticmethod(available))
+    monkeypatch.setattr(tool_registry, "get_version", get_version)
+    monkeypatch.setattr(incremental_service, "result_cache", cache)
+
+def test_manifest_lists_files_to_upload(client):
+    manifest = {"src/main.c": hashlib.sha256(MAIN).hexdigest(), "src/util.h": "0" * 64, "README.md": "1" * 64}
+    
+    response = client.post("/api/clangtidy/manifest", json={"config": {"checks": ["bugprone-*"]}, "files": manifest})
+    
+    assert response.status_code == 200
+    assert response.json()["missing"] == ["src/main.c", "src/util.h"]
+
+def test_invalid_manifest_is_400(client):
+    response = client.post("/api/clangtidy/manifest", json={"config": {"checks": ["bugprone-*"]}, "files": {"src/main.c": "abc"}})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"]["details"]["invalid_paths"] == ["src/main.c"]
+
+def test_incremental_analysis_without_required_files_is_409(client):
+    manifest = {"src/main.c": hashlib.sha256(MAIN).hexdigest(), "src/util.h": "0" * 64}
+    
+    response = client.post(
+        "/api/clangtidy/analyze/incremental",
+        data={"config": json.dumps({"checks": ["bugprone-*"]}), "manifest": json.dumps(manifest)},
+        files=[("files", ("src/main.c", MAIN))]
+    )
+    
+    assert response.status_code == 409
+    assert response.json()["detail"]["details"]["missing"] == ["src/util.h"]
+
+def test_invalid_form_config_is_422(client):
+    response = client.post(
+        "/api/clangtidy/analyze",
+        data={"config": json.dumps({"checks": []})},
+        files=[("files", ("main.c", MAIN))]
+    )
+    
+    assert response.status_code == 422
+    assert response.json()["detail"]["details"][0]["loc"] == ["config", "checks"]
+
+def test_stream_sends_events_in_order(client, monkeypatch):
+    async def run_command(command, **kwargs):
+        stdout = "".join(f"{path}:1:5: warning: unused [misc-unused]\n" for path in command[command.index("-p") + 2:])
+        return CommandResult(returncode=0, stdout=stdout, stderr="", command=" ".join(command))
+    
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(clangtidy_service, "run_command_async", run_command)
+    monkeypatch.setattr(tool_registry, "get_binary", lambda tool: tool)
+    
+    response = client.post(
+        "/api/clangtidy/analyze/stream",
+        data={"config": json.dumps({"checks": ["misc-*"], "options": {"batch_size": 1}})},
+        files=[("files", ("main.c", MAIN)), ("files", ("other.c", MAIN))]
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for message in response.text.strip().split("\n\n"):
+        event, data = message.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    
+    assert [event for event, _ in events] == ["start", "issue", "progress", "issue", "progress", "stats"]
+    assert events[0][1] == {"total_files": 2}
+    assert [data["completed"] for event, data in events if event == "progress"] == [1, 2]
+    assert events[-1][1]["total_issues"] == 2
+
+def test_stream_is_refused_when_clangtidy_is_saturated(client, monkeypatch):
+    gate = AdmissionGate("clangtidy", limit=1, queue_size=0, max_wait=1)
+    gate.active = 1
+    monkeypatch.setitem(admission_controller.gates, "clangtidy", gate)
+    
+    response = client.post(
+        "/api/clangtidy/analyze/stream",
+        data={"config": json.dumps({"checks": ["misc-*"]})},
+        files=[("files", ("main.c", MAIN))]
+    )
+    
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+    # Refused before the upload was stored
+    assert not any(files for _, _, files in os.walk(settings.UPLOAD_DIR))
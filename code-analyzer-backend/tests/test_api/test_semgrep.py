@@ -0,0 +1,88 @@
+import pytest
+
+from app.core.config import settings
+
+RULES = """rules:
+  - id: strcpy-use
+    message: Avoid strcpy
+    severity: ERROR
+    languages: [c]
+    pattern: strcpy(...)
+  - id: strcat-use
+    message: Avoid strcat
+    severity: WARNING
+    languages: [c]
+    pattern: strcat(...)
+  - id: gets-use
+    message: Avoid gets
+    severity: ERROR
+    languages: [c]
+    pattern: gets(...)
+  - id: py-eval
+    message: Avoid eval
+    severity: ERROR
+    languages: [python]
+    pattern: eval(...)
+"""
+
+@pytest.fixture
+def rules_path(tmp_path):
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    (rules / "rules.yaml").write_text(RULES)
+    return str(rules)
+
+def test_search_matches_word_prefixes(client, rules_path):
+    response = client.get("/api/semgrep/rules/search", params={"path": rules_path, "q": "str"})
+    
+    assert response.status_code == 200
+    assert sorted(rule["id"] for rule in response.json()["rules"]) == ["strcat-use", "strcpy-use"]
+
+def test_facets_ignore_their_own_filter(client, rules_path):
+    response = client.get("/api/semgrep/rules/search", params={"path": rules_path, "language": "c"})
+    body = response.json()
+    
+    assert body["total"] == 3
+    assert body["facets"]["languages"] == {"c": 3, "python": 1}
+    assert body["facets"]["severity"] == {"ERROR": 2, "WARNING": 1}
+
+def test_cursor_walks_every_page_once(client, rules_path):
+    seen = []
+    params = {"path": rules_path, "limit": 3}
+    
+    while True:
+        body = client.get("/api/semgrep/rules/search", params=params).json()
+        seen.extend(rule["id"] for rule in body["rules"])
+        if body["next_cursor"] is None:
+            break
+        params["cursor"] = body["next_cursor"]
+    
+    assert sorted(seen) == ["gets-use", "py-eval", "strcat-use", "strcpy-use"]
+
+def test_invalid_cursor_is_rejected(client, rules_path):
+    response = client.get("/api/semgrep/rules/search", params={"path": rules_path, "cursor": "not-a-cursor"})
+    
+    assert response.status_code == 400
+
+def test_unchanged_listing_is_not_modified(client, rules_path):
+    response = client.get("/api/semgrep/rules", params={"path": rules_path})
+    etag = response.headers["etag"]
+    
+    revalidated = client.get("/api/semgrep/rules", params={"path": rules_path}, headers={"If-None-Match": f"W/{etag}"})
+    
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+def test_etag_changes_with_the_query_and_the_rules(client, rules_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SEMGREP_RULES_REFRESH_INTERVAL", 0)
+    etag = client.get("/api/semgrep/rules", params={"path": rules_path}).headers["etag"]
+    
+    other_query = client.get("/api/semgrep/rules", params={"path": rules_path, "language": "c"}, headers={"If-None-Match": etag})
+    assert other_query.status_code == 200
+    
+    (tmp_path / "rules" / "more.yaml").write_text(RULES.replace("-use", "-call"))
+    changed = client.get("/api/semgrep/rules", params={"path": rules_path}, headers={"If-None-Match": etag})
+    
+    assert changed.status_code == 200
+    assert len(changed.json()["rules"]) == 8
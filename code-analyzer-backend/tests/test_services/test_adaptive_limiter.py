@@ -0,0 +1,124 @@
+import pytest
+
+from app.utils import adaptive_limiter
+from app.utils.adaptive_limiter import AdaptiveLimiter
+from app.utils.admission import AdmissionGate
+
+@pytest.fixture
+def host(monkeypatch):
+    """Stubbed load and memory readings, healthy until a test changes them"""
+    readings = {"load": 0.5, "memory": 0.6}
+    monkeypatch.setattr(adaptive_limiter, "read_load_per_cpu", lambda: readings["load"])
+    monkeypatch.setattr(adaptive_limiter, "read_available_memory_fraction", lambda: readings["memory"])
+    return readings
+
+def _limiter(**kwargs) -> AdaptiveLimiter:
+    options = {
+        "name": "semgrep",
+        "floor": 1,
+        "ceiling": 8,
+        "interval": 10,
+        "max_load_per_cpu": 1.5,
+        "min_memory_fraction": 0.1,
+        "latency_tolerance": 2.0,
+        "backoff": 0.5,
+        "min_samples": 3,
+    }
+    options.update(kwargs)
+    return AdaptiveLimiter(**options)
+
+def _reasons(limiter: AdaptiveLimiter) -> list:
+    return [decision["reason"] for decision in limiter.stats()["decisions"]]
+
+def test_saturated_limit_grows_by_one(host):
+    limiter = _limiter()
+    limiter.observe(1.0, saturated=True)
+    
+    assert limiter.decide(4, now=100) == 5
+    assert _reasons(limiter) == ["all slots busy and host has headroom"]
+    # Saturation is consumed by the decision
+    assert limiter.decide(5, now=200) == 5
+
+def test_unsaturated_limit_is_kept(host):
+    limiter = _limiter()
+    limiter.observe(1.0, saturated=False)
+    
+    assert limiter.decide(4, now=100) == 4
+    assert _reasons(limiter) == []
+
+def test_high_load_backs_off(host):
+    host["load"] = 3.0
+    limiter = _limiter()
+    limiter.observe(1.0, saturated=True)
+    
+    assert limiter.decide(6, now=100) == 3
+    assert _reasons(limiter) == ["load 3.00 per CPU above 1.5"]
+    assert limiter.stats()["signals"]["load_per_cpu"] == 3.0
+
+def test_low_memory_backs_off(host):
+    host["memory"] = 0.05
+    limiter = _limiter()
+    
+    assert limiter.decide(4, now=100) == 2
+    assert _reasons(limiter) == ["available memory 5.0% below 10%"]
+
+def test_slower_runs_back_off(host):
+    limiter = _limiter()
+    for latency in (1.0, 1.0, 1.0):
+        limiter.observe(latency, saturated=True)
+    for latency in (20.0, 20.0, 20.0):
+        limiter.observe(latency, saturated=True)
+    
+    assert limiter.decide(8, now=100) == 4
+    assert _reasons(limiter)[0].startswith("latency ")
+    assert "above 2.0x baseline" in _reasons(limiter)[0]
+
+def test_latency_needs_enough_samples(host):
+    limiter = _limiter(min_samples=10)
+    limiter.observe(1.0, saturated=True)
+    limiter.observe(50.0, saturated=True)
+    
+    # Too few samples to trust the latency signal, so the limit still grows
+    assert limiter.decide(4, now=100) == 5
+
+def test_limit_stays_within_bounds(host):
+    limiter = _limiter(floor=2, ceiling=5)
+    limiter.observe(1.0, saturated=True)
+    assert limiter.decide(5, now=100) == 5
+    
+    host["load"] = 10.0
+    assert limiter.decide(3, now=200) == 2
+    assert limiter.decide(2, now=300) == 2
+    # Only actual changes are recorded
+    assert [(d["from"], d["to"]) for d in limiter.stats()["decisions"]] == [(3, 2)]
+
+def test_decisions_are_throttled_by_interval(host):
+    limiter = _limiter(interval=10)
+    limiter.observe(1.0, saturated=True)
+    assert limiter.decide(4, now=100) == 5
+    
+    limiter.observe(1.0, saturated=True)
+    assert limiter.decide(5, now=105) == 5
+    host["load"] = 10.0
+    assert limiter.decide(5, now=109.9) == 5
+    
+    assert limiter.decide(5, now=110) == 2
+    assert len(_reasons(limiter)) == 2
+
+def test_missing_readings_are_ignored(host):
+    host["load"] = None
+    host["memory"] = None
+    limiter = _limiter()
+    limiter.observe(1.0, saturated=True)
+    
+    assert limiter.decide(1, now=100) == 2
+    assert limiter.stats()["signals"]["load_per_cpu"] is None
+
+def test_gate_applies_limiter_after_each_run(host):
+    gate = AdmissionGate("semgrep", limit=2, queue_size=4, max_wait=1, limiter=_limiter(interval=0))
+    gate.active = 2
+    
+    gate.release(1.0)
+    
+    assert gate.limit == 3
+    assert gate.stats()["adaptive"]["decisions"][0]["to"] == 3
\ No newline at end of file
@@ -0,0 +1,53 @@
+import pytest
+
+from app.core.errors import BaselineException
+from app.services.baseline_service import BaselineStore
+
+def _results(*ids: str) -> dict:
+    findings = [{"id": item_id, "file": f"{item_id}.js", "severity": "high"} for item_id in ids]
+    return {"findings": findings, "stats": {"total_findings": len(findings), "by_severity": {"high": len(findings)}}}
+
+@pytest.fixture
+def store(tmp_path):
+    return BaselineStore(str(tmp_path / "baselines"))
+
+@pytest.mark.parametrize("baseline_id", ["", "../main", "a/b", ".hidden", "x" * 129])
+def test_unsafe_ids_are_rejected(store, baseline_id):
+    with pytest.raises(BaselineException) as error:
+        store.save(baseline_id, {"semgrep": []})
+    
+    assert error.value.status_code == 400
+
+def test_unknown_tools_are_rejected(store):
+    with pytest.raises(BaselineException) as error:
+        store.save("main", {"eslint": ["a"]})
+    
+    assert error.value.status_code == 400
+    assert error.value.details["tools"] == ["eslint"]
+
+def test_apply_reports_new_suppressed_and_fixed(store):
+    store.save("main", {"semgrep": ["a", "b", "gone"]})
+    
+    filtered = store.apply("main", "semgrep", _results("a", "b", "c"))
+    
+    assert [item["id"] for item in filtered["findings"]] == ["c"]
+    assert filtered["stats"]["total_findings"] == 1
+    assert filtered["stats"]["by_severity"] == {"high": 1}
+    assert filtered["stats"]["baseline"] == {"id": "main", "new": 1, "suppressed": 2, "fixed": 1}
+
+def test_baselines_are_read_back_from_disk(store):
+    store.save("main", {"clangtidy": ["a"]}, description="release")
+    
+    reloaded = BaselineStore(store.base_dir)
+    
+    assert reloaded.get("main")["fingerprints"] == {"clangtidy": frozenset({"a"})}
+    assert [meta["id"] for meta in reloaded.list_baselines()] == ["main"]
+
+def test_deleted_baseline_is_not_found(store):
+    store.save("main", {"snyk": []})
+    store.delete("main")
+    
+    with pytest.raises(BaselineException) as error:
+        store.get("main")
+    
+    assert error.value.status_code == 404
@@ -0,0 +1,123 @@
+import pytest
+
+from app.services import check_catalog as check_catalog_module
+from app.services import clangtidy_service
+from app.services.check_catalog import ClangTidyCheckCatalog, find_docs_path
+from app.services.clangtidy_service import ClangTidyService
+from app.services.tool_registry import tool_registry
+
+DOC = """.. title:: clang-tidy - {name}
+
+{name}
+{underline}
+
+.. note::
+
+   This note is not the description.
+
+Finds calls to :func:`strcpy` with ``char`` buffers that may
+overflow; see `CERT <https://example.com>`_ for **details**.
+
+Options
+-------
+"""
+
+def _write_doc(path, name: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(DOC.format(name=name, underline="=" * len(name)))
+
+@pytest.mark.parametrize("layout", ["by-category", "flat"])
+def test_description_is_the_first_paragraph(tmp_path, layout):
+    docs = tmp_path / "checks"
+    if layout == "by-category":
+        _write_doc(docs / "bugprone" / "unsafe-copy.rst", "bugprone-unsafe-copy")
+    else:
+        _write_doc(docs / "bugprone-unsafe-copy.rst", "bugprone-unsafe-copy")
+    catalog = ClangTidyCheckCatalog(str(tmp_path / "snapshots"), str(docs))
+    
+    catalog.build("17.0.0", ["bugprone-unsafe-copy"])
+    
+    assert catalog.get_check("bugprone-unsafe-copy")["description"] == (
+        "Finds calls to strcpy with char buffers that may overflow; see CERT for details."
+    )
+
+def test_undocumented_checks_get_their_category_description(tmp_path):
+    catalog = ClangTidyCheckCatalog(str(tmp_path / "snapshots"), str(tmp_path / "missing"))
+    
+    catalog.build("17.0.0", ["clang-analyzer-core.NullDereference", "acme-custom"])
+    
+    assert catalog.get_check("clang-analyzer-core.NullDereference")["category"] == "clang-analyzer"
+    assert catalog.get_check("clang-analyzer-core.NullDereference")["description"] == "Clang Static Analyzer checks"
+    assert catalog.get_check("acme-custom")["description"] == "ClangTidy check"
+
+def test_snapshot_is_kept_per_version(tmp_path):
+    snapshots = str(tmp_path / "snapshots")
+    ClangTidyCheckCatalog(snapshots).build("16.0.0", ["bugprone-a"])
+    ClangTidyCheckCatalog(snapshots).build("17.0.0", ["bugprone-a", "bugprone-b"])
+    
+    catalog = ClangTidyCheckCatalog(snapshots)
+    
+    assert catalog.load_snapshot("16.0.0")
+    assert [check["id"] for check in catalog.list_checks()] == ["bugprone-a"]
+    assert catalog.load_snapshot("17.0.0")
+    assert len(catalog.list_checks(prefix="bugprone-*")) == 2
+    assert not catalog.load_snapshot("18.0.0")
+
+@pytest.mark.asyncio
+async def test_restart_loads_the_snapshot_without_a_process(tmp_path, monkeypatch):
+    version = {"value": "17.0.0"}
+    listed = []
+    
+    async def get_version(tool):
+        return version["value"]
+    
+    async def read_check_names():
+        listed.append(version["value"])
+        return ["bugprone-a", "misc-b"]
+    
+    monkeypatch.setattr(tool_registry, "get_version", get_version)
+    monkeypatch.setattr(tool_registry, "get_binary", lambda tool: "clang-tidy")
+    monkeypatch.setattr(ClangTidyService, "_read_check_names", staticmethod(read_check_names))
+    monkeypatch.setattr(check_catalog_module, "find_docs_path", lambda binary: "")
+    
+    monkeypatch.setattr(clangtidy_service, "check_catalog", ClangTidyCheckCatalog(str(tmp_path)))
+    assert (await ClangTidyService.get_catalog()).version == "17.0.0"
+    
+    # A restart with the same version reads the snapshot
+    monkeypatch.setattr(clangtidy_service, "check_catalog", ClangTidyCheckCatalog(str(tmp_path)))
+    catalog = await ClangTidyService.get_catalog()
+    
+    assert catalog.categories() == {"bugprone": 1, "misc": 1}
+    assert listed == ["17.0.0"]
+    
+    # A new version is listed once
+    version["value"] = "18.0.0"
+    await ClangTidyService.get_catalog()
+    await ClangTidyService.get_catalog()
+    assert listed == ["17.0.0", "18.0.0"]
+
+def test_docs_are_found_next_to_the_binary(tmp_path, monkeypatch):
+    monkeypatch.setattr(check_catalog_module, "SYSTEM_DOCS_PATTERNS", [])
+    binary = tmp_path / "llvm" / "bin" / "clang-tidy"
+    binary.parent.mkdir(parents=True)
+    binary.write_text("#!/bin/sh\n")
+    binary.chmod(0o755)
+    
+    assert find_docs_path(str(binary)) == ""
+    
+    docs = tmp_path / "llvm" / "share" / "doc" / "clang-tidy" / "checks"
+    docs.mkdir(parents=True)
+    
+    assert find_docs_path(str(binary)) == str(docs)
+
+def test_newest_system_docs_are_preferred(tmp_path, monkeypatch):
+    for version in ("15", "17"):
+        (tmp_path / f"clang-tidy-{version}" / "checks").mkdir(parents=True)
+    monkeypatch.setattr(check_catalog_module, "SYSTEM_DOCS_PATTERNS", [str(tmp_path / "clang-tidy*" / "checks")])
+    
+    assert find_docs_path(None) == str(tmp_path / "clang-tidy-17" / "checks")
+
+def test_configured_docs_path_is_not_probed(tmp_path, monkeypatch):
+    monkeypatch.setattr(check_catalog_module, "find_docs_path", lambda binary: pytest.fail("probed"))
+    
+    assert ClangTidyCheckCatalog(str(tmp_path), "/opt/docs").locate_docs("clang-tidy") == "/opt/docs"
\ No newline at end of file
@@ -0,0 +1,144 @@
+import asyncio
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.core.errors import AdmissionRejected
+from app.services import clangtidy_service
+from app.services.clangtidy_service import ClangTidyService
+from app.services.tool_registry import tool_registry
+from app.utils.admission import AdmissionGate, admission_controller
+from app.utils.command_executor import CommandResult
+
+def test_batches_spread_files_over_workers():
+    files = [f"f{index}.c" for index in range(5)]
+    
+    assert ClangTidyService._make_batches(files, 0, 2) == [files[:3], files[3:]]
+    assert ClangTidyService._make_batches(files, 2, 8) == [files[:2], files[2:4], files[4:]]
+
+@pytest.mark.parametrize("batch_size, expected", [
+    (0, [["f0.c", "f1.c"], ["f2.c", "f3.c"], ["f4.c"]]),
+    (1, [["f0.c"], ["f1.c"], ["f2.c"], ["f3.c"], ["f4.c"]]),
+    (4, [["f0.c", "f1.c", "f2.c", "f3.c"], ["f4.c"]]),
+    (10, [["f0.c", "f1.c", "f2.c", "f3.c", "f4.c"]]),
+])
+def test_batch_sizes(batch_size, expected):
+    files = [f"f{index}.c" for index in range(5)]
+    
+    assert ClangTidyService._make_batches(files, batch_size, 3) == expected
+
+def test_streaming_uses_small_batches(monkeypatch):
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "batch_size", 0)
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "stream_batch_size", 1)
+    
+    assert ClangTidyService._get_batch_size({}) == 0
+    assert ClangTidyService._get_batch_size({}, stream=True) == 1
+    assert ClangTidyService._get_batch_size({"batch_size": 4}, stream=True) == 4
+
+def test_workers_never_exceed_server_limit(monkeypatch):
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "max_workers", 2)
+    
+    assert ClangTidyService._get_max_workers({"max_workers": 8}) == 2
+    assert ClangTidyService._get_max_workers({"max_workers": 1}) == 1
+
+@pytest.mark.asyncio
+async def test_request_is_admitted_once(monkeypatch):
+    monkeypatch.setitem(admission_controller.gates, "clangtidy", AdmissionGate("clangtidy", limit=1, queue_size=0, max_wait=0.05))
+    
+    async def run_command(command, **kwargs):
+        await asyncio.sleep(0.05)
+        return CommandResult(returncode=0, stdout=command[-1], stderr="", command=" ".join(command))
+    
+    monkeypatch.setattr(clangtidy_service, "run_command_async", run_command)
+    
+    commands = [["clang-tidy", f"batch{index}"] for index in range(3)]
+    first = asyncio.ensure_future(ClangTidyService._run_commands(commands, max_workers=2))
+    await asyncio.sleep(0.01)
+    
+    # A new request finds the only slot taken and no room in the queue
+    with pytest.raises(AdmissionRejected):
+        await ClangTidyService._run_commands([["clang-tidy", "other"]], max_workers=1)
+    
+    # The admitted request still runs all of its batches, one after another
+    assert await first == ["batch0", "batch1", "batch2"]
+
+@pytest.fixture
+def header_warnings(monkeypatch):
+    """Fake clang-tidy that reports the shared header once per file, later batches finishing first"""
+    state = {"delay": 0.05, "started": [], "cancelled": []}
+    
+    async def run_command(command, **kwargs):
+        files = command[command.index("-p") + 2:]
+        state["started"].append(files)
+        try:
+            await asyncio.sleep(state["delay"] / len(state["started"]))
+        except asyncio.CancelledError:
+            state["cancelled"].append(files)
+            raise
+        stdout = "".join(f"{os.path.dirname(path)}/util.h:1:1: warning: shared [bugprone-x]\n" for path in files)
+        return CommandResult(returncode=0, stdout=stdout, stderr="", command=" ".join(command))
+    
+    async def get_version(tool):
+        return "17.0.0"
+    
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(clangtidy_service, "run_command_async", run_command)
+    monkeypatch.setattr(tool_registry, "get_version", get_version)
+    monkeypatch.setattr(tool_registry, "get_binary", lambda tool: tool)
+    
+    return state
+
+@pytest.mark.asyncio
+async def test_stream_matches_whole_run(header_warnings, make_file):
+    files = [make_file(f"src/f{index}.c", b"int x;\n") for index in range(3)]
+    make_file("src/util.h", b"int shared(void);\n")
+    config = {"checks": ["bugprone-*"], "options": {"batch_size": 1}}
+    
+    events = [event async for event in ClangTidyService.analyze_files_stream(files, config)]
+    whole = await ClangTidyService.analyze_files(files, config)
+    
+    assert [event["event"] for event in events] == ["start"] + ["issue", "progress"] * 3 + ["stats"]
+    assert [event["data"]["file"] for event in events if event["event"] == "progress"] == files
+    assert [event["data"]["completed"] for event in events if event["event"] == "progress"] == [1, 2, 3]
+    # Colliding fingerprints are numbered across batches, as in one run
+    ids = [event["data"]["id"] for event in events if event["event"] == "issue"]
+    assert ids == [issue["id"] for issue in whole["issues"]]
+    assert ids[1:] == [f"{ids[0]}-2", f"{ids[0]}-3"]
+
+@pytest.mark.asyncio
+async def test_closing_stream_cancels_running_commands(monkeypatch, header_warnings, make_file):
+    files = [make_file(f"src/f{index}.c", b"int x;\n") for index in range(3)]
+    config = {"checks": ["bugprone-*"], "options": {"batch_size": 1, "max_workers": 3}}
+    
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "max_workers", 3)
+    monkeypatch.setitem(admission_controller.gates, "clangtidy", AdmissionGate("clangtidy", limit=3, queue_size=0, max_wait=0.05))
+    header_warnings["delay"] = 60
+    
+    stream = ClangTidyService.analyze_files_stream(files, config)
+    assert (await stream.__anext__())["event"] == "start"
+    waiting = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0.05)
+    
+    # The client goes away while every batch is still running
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    
+    assert len(header_warnings["started"]) == 3
+    assert header_warnings["cancelled"] == header_warnings["started"]
+
+@pytest.mark.asyncio
+async def test_stream_plan_uses_stream_batch_size(monkeypatch, header_warnings, make_file):
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "batch_size", 0)
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "stream_batch_size", 2)
+    files = [make_file(f"src/f{index}.c", b"int x;\n") for index in range(5)]
+    config = {"checks": ["bugprone-*"]}
+    
+    plan = await ClangTidyService._prepare_analysis(files, config, stream=True)
+    
+    assert plan["batches"] == [files[:2], files[2:4], files[4:]]
+    assert [command[command.index("-p") + 2:] for command in plan["commands"]] == plan["batches"]
+    
+    plan = await ClangTidyService._prepare_analysis(files, config)
+    assert len(plan["batches"]) <= plan["max_workers"]
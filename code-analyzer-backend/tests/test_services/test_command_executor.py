@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+from app.utils.command_executor import run_command_async
+
+def _python(code: str) -> list:
+    return [sys.executable, "-c", code]
+
+@pytest.mark.asyncio
+async def test_small_output_stays_in_memory():
+    result = await run_command_async(_python("print('[1, 2]')"), spill_threshold=1024)
+    
+    assert result.stdout_path is None
+    assert result.stdout_bytes == len("[1, 2]\n")
+    assert result.load_json() == [1, 2]
+
+@pytest.mark.asyncio
+async def test_output_over_threshold_spills_to_disk():
+    result = await run_command_async(_python("import json; print(json.dumps(list(range(1000))))"), spill_threshold=100)
+    spill_path = result.stdout_path
+    
+    assert spill_path and os.path.exists(spill_path)
+    assert result.load_json() == list(range(1000))
+    
+    result.cleanup()
+    
+    assert result.stdout_path is None
+    assert not os.path.exists(spill_path)
+    # A second cleanup has nothing left to remove
+    result.cleanup()
+
+@pytest.mark.asyncio
+async def test_stderr_keeps_only_the_tail():
+    result = await run_command_async(
+        _python("import sys; sys.stderr.write('a' * 5000 + 'end'); sys.exit(3)"),
+        stderr_limit=100
+    )
+    
+    assert result.returncode == 3
+    assert result.stderr_truncated
+    assert len(result.stderr) == 100
+    assert result.stderr.endswith("end")
+
+@pytest.mark.asyncio
+async def test_empty_output_gives_the_default():
+    result = await run_command_async(_python("pass"))
+    
+    assert result.load_json(default={}) == {}
\ No newline at end of file
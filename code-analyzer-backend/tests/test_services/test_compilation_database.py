@@ -0,0 +1,120 @@
+import json
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services import file_service
+from app.services.compilation_database import CompilationDatabaseStore
+from app.services.file_service import FileService
+
+@pytest.fixture
+def store(tmp_path):
+    return CompilationDatabaseStore(str(tmp_path / "db"))
+
+@pytest.fixture(autouse=True)
+def default_standards(monkeypatch):
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "c_standard", "")
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "cxx_standard", "")
+
+def _entries(database_dir: str) -> dict:
+    with open(os.path.join(database_dir, "compile_commands.json")) as f:
+        return {os.path.basename(entry["file"]): entry for entry in json.load(f)}
+
+def test_language_follows_the_extension(store, make_file):
+    files = [make_file(name, b"") for name in ("main.c", "util.h", "lib.cpp", "lib.hpp")]
+    
+    entries = _entries(store.get_database_dir(files, ["-Iinclude"]))
+    
+    assert entries["main.c"]["arguments"][:3] == ["clang", "-x", "c"]
+    assert entries["lib.cpp"]["arguments"][:3] == ["clang++", "-x", "c++"]
+    assert entries["lib.hpp"]["arguments"][:3] == ["clang++", "-x", "c++"]
+    # With C++ sources around, .h headers are compiled as C++
+    assert entries["util.h"]["arguments"][:3] == ["clang++", "-x", "c++"]
+    assert entries["main.c"]["arguments"][3:] == ["-Iinclude", "-c", files[0]]
+    assert entries["main.c"]["directory"] == os.path.dirname(files[0])
+
+def test_headers_of_c_workspaces_are_c(store, make_file):
+    files = [make_file("main.c", b""), make_file("util.h", b"")]
+    
+    assert _entries(store.get_database_dir(files, []))["util.h"]["arguments"][:3] == ["clang", "-x", "c"]
+
+def test_standard_is_optional_and_overridden_by_options(store, make_file, monkeypatch):
+    source = make_file("main.c", b"")
+    
+    assert not any(arg.startswith("-std=") for arg in store.compile_arguments(source, [], False))
+    
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "c_standard", "c11")
+    monkeypatch.setitem(settings.CLANGTIDY_CONFIG, "cxx_standard", "c++17")
+    
+    assert "-std=c11" in store.compile_arguments(source, [], False)
+    assert "-std=c++17" in store.compile_arguments("lib.cc", [], False)
+    assert [arg for arg in store.compile_arguments(source, ["-std=c99"], False) if arg.startswith("-std=")] == ["-std=c99"]
+
+def test_database_is_reused_without_rewriting(store, make_file):
+    first = make_file("main.c", b"")
+    database_dir = store.get_database_dir([first], [])
+    database_path = os.path.join(database_dir, "compile_commands.json")
+    mtime_ns = os.stat(database_path).st_mtime_ns
+    
+    assert store.get_database_dir([first], []) == database_dir
+    assert os.stat(database_path).st_mtime_ns == mtime_ns
+    assert store.stats()["reused"] == 1
+    
+    # A new file of the same workspace is added to the same database
+    second = make_file("other.c", b"")
+    assert store.get_database_dir([second], []) == database_dir
+    assert sorted(_entries(database_dir)) == ["main.c", "other.c"]
+    
+    # Other compiler options get their own database
+    assert store.get_database_dir([first], ["-DX"]) != database_dir
+
+def test_existing_database_is_loaded_from_disk(store, make_file):
+    source = make_file("main.c", b"")
+    database_dir = store.get_database_dir([source], [])
+    
+    restarted = CompilationDatabaseStore(store.base_dir)
+    
+    assert restarted.get_database_dir([source], []) == database_dir
+    assert restarted.stats()["written"] == 0
+
+def test_headers_are_rebuilt_when_cxx_arrives(store, make_file):
+    files = [make_file("main.c", b""), make_file("util.h", b"")]
+    database_dir = store.get_database_dir(files, [])
+    
+    store.get_database_dir([make_file("lib.cpp", b"")], [])
+    entries = _entries(database_dir)
+    
+    assert entries["util.h"]["arguments"][:3] == ["clang++", "-x", "c++"]
+    assert entries["main.c"]["arguments"][:3] == ["clang", "-x", "c"]
+
+def test_removed_workspaces_are_dropped(store, tmp_path, make_file):
+    first = make_file("main.c", b"", tmp_path / "one")
+    second = make_file("main.c", b"", tmp_path / "two")
+    first_dir = store.get_database_dir([first], [])
+    second_dir = store.get_database_dir([second], [])
+    
+    store.remove_workspace(str(tmp_path / "one"))
+    
+    assert not os.path.exists(first_dir)
+    assert os.path.exists(second_dir)
+    assert store.stats()["databases"] == 1
+    
+    # A workspace deleted behind the store's back is pruned when the next database is created
+    os.unlink(second)
+    os.rmdir(tmp_path / "two")
+    store.get_database_dir([make_file("main.c", b"", tmp_path / "three")], [])
+    
+    assert not os.path.exists(second_dir)
+    assert store.stats()["pruned"] == 2
+
+def test_upload_cleanup_drops_its_database(monkeypatch, store, tmp_path, make_file):
+    monkeypatch.setattr(file_service, "compilation_databases", store)
+    upload_dir = tmp_path / "upload"
+    source = make_file("src/main.c", b"", upload_dir)
+    database_dir = store.get_database_dir([source], [])
+    
+    FileService.cleanup_analysis_files([source], str(upload_dir))
+    
+    assert not os.path.exists(database_dir)
+    assert store.stats()["databases"] == 0
\ No newline at end of file
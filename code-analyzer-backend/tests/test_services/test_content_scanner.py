@@ -0,0 +1,43 @@
+import re._parser
+
+import pytest
+
+from app.core.security import DANGEROUS_PATTERN_SET, DANGEROUS_PATTERNS, is_file_safe
+
+def _scan(content: bytes, chunk_size: int):
+    scanner = DANGEROUS_PATTERN_SET.scanner()
+    for start in range(0, len(content), chunk_size):
+        scanner.feed(content[start:start + chunk_size])
+    return scanner.finish()
+
+@pytest.mark.parametrize("pattern", DANGEROUS_PATTERNS)
+def test_patterns_fit_in_the_carried_bytes(pattern):
+    _, longest = re._parser.parse(pattern).getwidth()
+    
+    assert longest <= DANGEROUS_PATTERN_SET.max_match_length
+
+@pytest.mark.parametrize("dangerous", [
+    b"x = `" + b"a" * 1000 + b"`",
+    b"system" + b" " * 1000 + b"(cmd)",
+    b"eval\n\n\n(code)",
+])
+@pytest.mark.parametrize("chunk_size", [13, 512, 4096])
+def test_match_across_chunk_boundaries(dangerous, chunk_size):
+    prefix = b"int a;\n" * 600
+    
+    match = _scan(prefix + dangerous + b"\nint b;\n", chunk_size)
+    
+    assert match is not None
+    assert match.offset == len(prefix) + dangerous.index(match.text)
+
+def test_chunked_scan_agrees_with_whole_content():
+    content = b"// " + b"`" + b"b" * 2000 + b"\n" + b"system (x)"
+    
+    match = _scan(content, 100)
+    
+    assert match.pattern == DANGEROUS_PATTERNS[1]
+    assert is_file_safe(content) is False
+
+def test_safe_and_binary_content():
+    assert _scan(b"int main(void) { return 0; }\n" * 500, 64) is None
+    assert _scan(b"\xff\xfe system(x)", 4) is None
\ No newline at end of file
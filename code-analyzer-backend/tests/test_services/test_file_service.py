@@ -0,0 +1,121 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.errors import FileException
+from app.core.security import _extract_archive
+from app.services.file_service import FileService
+from app.utils.file_utils import get_file_name
+
+def _zip(*entries) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in entries:
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+def _tar(*entries, links=()) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for name, content in entries:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+        for name, target in links:
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.SYMTYPE
+            info.linkname = target
+            archive.addfile(info)
+    buffer.seek(0)
+    return buffer
+
+def _files(directory) -> list:
+    return sorted(
+        os.path.relpath(os.path.join(root, name), directory).replace(os.sep, "/")
+        for root, _, names in os.walk(directory) for name in names
+    )
+
+def test_archive_keeps_its_layout(tmp_path):
+    paths, report = _extract_archive(_zip(("src/main.c", b"int main;"), ("README", b"text")), "tree.zip", str(tmp_path))
+    
+    assert _files(tmp_path) == ["src/main.c"]
+    assert get_file_name(paths[0]) == "src/main.c"
+    assert report["files_extracted"] == 1
+    assert report["files_skipped"] == 1
+
+@pytest.mark.parametrize("name", ["../evil.c", "src/../../evil.c", "/etc/evil.c", "C:/evil.c", "..\\evil.c"])
+def test_entries_outside_the_upload_are_rejected(tmp_path, name):
+    with pytest.raises(FileException) as error:
+        _extract_archive(_zip(("ok.c", b"int a;"), (name, b"int b;")), "tree.zip", str(tmp_path / "upload"))
+    
+    assert error.value.details["entry"] == name.replace("\\", "/")
+    assert _files(tmp_path) == []
+    assert not (tmp_path / "evil.c").exists()
+
+def test_duplicate_entries_are_rejected(tmp_path):
+    with pytest.warns(UserWarning), pytest.raises(FileException) as error:
+        _extract_archive(_zip(("a.c", b"int a;"), ("a.c", b"int b;")), "tree.zip", str(tmp_path))
+    
+    assert "more than once" in error.value.message
+    assert _files(tmp_path) == []
+
+def test_links_are_skipped(tmp_path):
+    archive = _tar(("src/a.c", b"int a;"), links=[("src/passwd.c", "/etc/passwd")])
+    
+    paths, report = _extract_archive(archive, "tree.tar.gz", str(tmp_path))
+    
+    assert _files(tmp_path) == ["src/a.c"]
+    assert report["files_skipped"] == 1
+
+def test_oversized_entry_leaves_no_partial_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4)
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 16)
+    
+    with pytest.raises(FileException) as error:
+        _extract_archive(_tar(("a.c", b"int a;"), ("big.c", b"x" * 64)), "tree.tgz", str(tmp_path))
+    
+    assert error.value.details["entry"] == "big.c"
+    assert _files(tmp_path) == []
+
+def test_archive_content_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_MAX_BYTES", 10)
+    
+    with pytest.raises(FileException) as error:
+        _extract_archive(_zip(("a.c", b"int a;"), ("b.c", b"int b;")), "tree.zip", str(tmp_path))
+    
+    assert error.value.details["max_bytes"] == 10
+    assert _files(tmp_path) == []
+
+def test_compressed_archive_size_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_MAX_UPLOAD_SIZE", 32)
+    
+    with pytest.raises(FileException) as error:
+        _extract_archive(_zip(("a.c", b"int a;")), "tree.zip", str(tmp_path))
+    
+    assert "max_size_mb" in error.value.details
+    assert _files(tmp_path) == []
+
+def test_unsafe_entry_leaves_no_partial_file(tmp_path):
+    with pytest.raises(FileException) as error:
+        _extract_archive(_zip(("a.c", b"int a;"), ("b.c", b"system(cmd);")), "tree.zip", str(tmp_path))
+    
+    assert error.value.details["entry"] == "b.c"
+    assert _files(tmp_path) == []
+
+@pytest.mark.asyncio
+async def test_rejected_archive_removes_the_other_uploads():
+    files = [
+        UploadFile(io.BytesIO(b"int a;"), filename="a.c"),
+        UploadFile(_zip(("../evil.c", b"int b;")), filename="tree.zip"),
+    ]
+    
+    with pytest.raises(FileException):
+        await FileService.save_uploaded_files(files)
+    
+    assert _files(settings.UPLOAD_DIR) == []
\ No newline at end of file
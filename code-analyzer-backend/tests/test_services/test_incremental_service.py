@@ -0,0 +1,126 @@
+import hashlib
+import os
+import re
+
+import pytest
+
+from app.core.errors import FileException
+from app.services import incremental_service
+from app.services.incremental_service import IncrementalScanService
+from app.services.tool_registry import tool_registry
+from app.utils.file_utils import remember_file_name
+
+CONFIG = {"checks": ["bugprone-*"], "options": None}
+
+SOURCES = {
+    "src/main.c": b'#include "util.h"\nint main(void) { return 0; }\n',
+    "src/util.c": b'#include "util.h"\nint twice(int x) { return 2 * x; }\n',
+    "src/util.h": b"int twice(int x);\n",
+}
+
+def _hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+MANIFEST = {name: _hash(content) for name, content in SOURCES.items()}
+
+@pytest.fixture
+def runs(monkeypatch, cache):
+    """Record the files of each analysis run by a fake ClangTidy"""
+    runs = []
+    
+    async def get_version(tool):
+        return "17.0.0"
+    
+    async def run_clangtidy(file_paths, config):
+        runs.append(sorted(os.path.basename(path) for path in file_paths))
+        issues = []
+        for path in file_paths:
+            with open(path, 'r') as f:
+                source = f.read()
+            for header in re.findall(r'#include "([^"]+)"', source):
+                if not os.path.exists(os.path.join(os.path.dirname(path), header)):
+                    issues.append({
+                        "file": path, "line": 1, "column": 10, "severity": "ERROR",
+                        "check": "clang-diagnostic-error", "message": f"'{header}' file not found"
+                    })
+            issues.append({
+                "file": path, "line": 2, "column": 1, "severity": "WARNING",
+                "check": "bugprone-example", "message": "example"
+            })
+        return {"issues": issues, "stats": {"total_issues": len(issues)}}
+    
+    monkeypatch.setattr(tool_registry, "get_version", get_version)
+    monkeypatch.setattr(incremental_service, "result_cache", cache)
+    monkeypatch.setattr(IncrementalScanService, "get_runners", staticmethod(lambda: {"clangtidy": run_clangtidy}))
+    return runs
+
+def _upload(make_file, tmp_path, *names: str) -> list:
+    """Save files under random names, remembering their relative paths"""
+    paths = []
+    for index, name in enumerate(names):
+        path = make_file(f"upload{index}{os.path.splitext(name)[1]}", SOURCES[name], tmp_path / "uploads" / "scan")
+        remember_file_name(path, name)
+        paths.append(path)
+    return paths
+
+@pytest.mark.parametrize("manifest", [
+    {"..": "0" * 64},
+    {"": "0" * 64},
+    {"src/main.c": "not-a-hash"},
+])
+def test_invalid_manifest_entries_are_rejected(manifest):
+    with pytest.raises(FileException) as error:
+        IncrementalScanService.normalize_manifest("clangtidy", manifest)
+    
+    assert error.value.status_code == 400
+    assert error.value.details["invalid_paths"] == list(manifest)
+
+def test_manifest_keeps_files_the_tool_analyzes():
+    manifest = {"README.md": "0" * 64, "..\\src\\main.c": "A" * 64, "/src/util.c": "b" * 64}
+    
+    assert IncrementalScanService.normalize_manifest("clangtidy", manifest) == {
+        "src/main.c": "a" * 64,
+        "src/util.c": "b" * 64
+    }
+
+@pytest.mark.asyncio
+async def test_headers_are_required_with_changed_files(runs, make_file, tmp_path):
+    result = await IncrementalScanService.check_manifest("clangtidy", CONFIG, MANIFEST)
+    assert result["missing"] == ["src/main.c", "src/util.c", "src/util.h"]
+    
+    await IncrementalScanService.analyze_files("clangtidy", CONFIG, MANIFEST, _upload(make_file, tmp_path, *SOURCES))
+    assert (await IncrementalScanService.check_manifest("clangtidy", CONFIG, MANIFEST))["missing"] == []
+    
+    # One changed source needs the headers again, but not the other sources
+    changed = {**MANIFEST, "src/main.c": _hash(b"changed")}
+    assert (await IncrementalScanService.check_manifest("clangtidy", CONFIG, changed))["missing"] == ["src/main.c", "src/util.h"]
+
+@pytest.mark.asyncio
+async def test_missing_uploads_are_a_conflict(runs, make_file, tmp_path):
+    with pytest.raises(FileException) as error:
+        await IncrementalScanService.analyze_files("clangtidy", CONFIG, MANIFEST, _upload(make_file, tmp_path, "src/main.c", "src/util.c"))
+    
+    assert error.value.status_code == 409
+    assert error.value.details["missing"] == ["src/util.h"]
+    assert runs == []
+
+@pytest.mark.asyncio
+async def test_unchanged_files_come_from_the_store(runs, make_file, tmp_path):
+    first = await IncrementalScanService.analyze_files("clangtidy", CONFIG, MANIFEST, _upload(make_file, tmp_path, *SOURCES))
+    second = await IncrementalScanService.analyze_files("clangtidy", CONFIG, MANIFEST, [])
+    
+    assert runs == [["main.c", "util.c", "util.h"]]
+    assert first["issues"] == second["issues"]
+    assert {issue["file"] for issue in second["issues"]} == set(SOURCES)
+    assert second["stats"]["incremental"]["cached"] == 3
+
+@pytest.mark.asyncio
+async def test_results_with_unresolved_includes_are_not_stored(runs, make_file, tmp_path):
+    # A manifest leaving out the header cannot resolve the includes
+    sources = {name: MANIFEST[name] for name in ("src/main.c", "src/util.c")}
+    
+    results = await IncrementalScanService.analyze_files("clangtidy", CONFIG, sources, _upload(make_file, tmp_path, *sources))
+    
+    assert results["stats"]["incremental"]["stored"] == 0
+    assert any("file not found" in issue["message"] for issue in results["issues"])
+    assert (await IncrementalScanService.check_manifest("clangtidy", CONFIG, sources))["missing"] == list(sources)
\ No newline at end of file
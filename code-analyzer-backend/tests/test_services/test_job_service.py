@@ -0,0 +1,119 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.errors import AdmissionRejected, JobException
+from app.services import job_service
+from app.services.job_service import Job, JobManager, check_callback_url, JOB_COMPLETED, JOB_FAILED
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1:8000/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/hook",
+    "http://[::1]/hook",
+    "http://0.0.0.0/hook",
+])
+async def test_private_callback_addresses_are_refused(url):
+    with pytest.raises(JobException) as error:
+        await check_callback_url(url)
+    
+    assert error.value.status_code == 400
+    assert error.value.details["addresses"]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", ["ftp://8.8.8.8/hook", "file:///etc/passwd", "8.8.8.8/hook"])
+async def test_callback_scheme_must_be_allowed(url):
+    with pytest.raises(JobException) as error:
+        await check_callback_url(url)
+    
+    assert "allowed_schemes" in error.value.details
+
+@pytest.mark.asyncio
+async def test_public_callback_address_is_accepted():
+    assert await check_callback_url("https://8.8.8.8/hook") == ["8.8.8.8"]
+
+@pytest.mark.asyncio
+async def test_callback_host_allowlist(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_CALLBACK_ALLOWED_HOSTS", "8.8.4.4")
+    
+    with pytest.raises(JobException) as error:
+        await check_callback_url("https://8.8.8.8/hook")
+    
+    assert error.value.details["host"] == "8.8.8.8"
+    await check_callback_url("https://8.8.4.4/hook")
+
+@pytest.mark.asyncio
+async def test_private_callbacks_can_be_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_CALLBACK_ALLOW_PRIVATE", True)
+    
+    await check_callback_url("http://127.0.0.1:8000/hook")
+
+async def _run_job(monkeypatch, runner):
+    """Submit a job to a fresh manager and wait for it to finish"""
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF", 0.01)
+    manager = JobManager(workers=1, queue_size=10, result_ttl=60)
+    monkeypatch.setattr(manager, "get_runners", lambda: {"semgrep": runner})
+    
+    job = await manager.submit("semgrep", [], None, {})
+    try:
+        for _ in range(200):
+            if job.finished:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await manager.stop()
+    
+    return job
+
+@pytest.mark.asyncio
+async def test_job_rejected_by_admission_control_is_requeued(monkeypatch):
+    calls = []
+    
+    async def runner(file_paths, config):
+        calls.append(config)
+        if len(calls) < 3:
+            raise AdmissionRejected(retry_after=0)
+        return {"findings": [], "stats": {}}
+    
+    job = await _run_job(monkeypatch, runner)
+    
+    assert job.status == JOB_COMPLETED
+    assert job.attempts == 3
+
+@pytest.mark.asyncio
+async def test_job_fails_after_max_retries(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_MAX_RETRIES", 1)
+    
+    async def runner(file_paths, config):
+        raise AdmissionRejected(retry_after=0)
+    
+    job = await _run_job(monkeypatch, runner)
+    
+    assert job.status == JOB_FAILED
+    assert job.attempts == 2
+
+@pytest.mark.asyncio
+async def test_callback_is_sent_to_the_checked_address(monkeypatch):
+    requests = []
+    
+    async def check(url):
+        return ["93.184.216.34"]
+    
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(204)
+    
+    client = httpx.AsyncClient
+    monkeypatch.setattr(job_service, "check_callback_url", check)
+    monkeypatch.setattr(job_service.httpx, "AsyncClient", lambda **kwargs: client(transport=httpx.MockTransport(handler), **kwargs))
+    
+    job = Job("semgrep", [], None, {}, callback_url="https://hooks.example.com:8443/done")
+    await JobManager(workers=1, queue_size=1, result_ttl=60)._send_callback(job)
+    
+    assert job.callback_status == "delivered"
+    assert requests[0].url.host == "93.184.216.34"
+    assert requests[0].headers["Host"] == "hooks.example.com:8443"
+    assert requests[0].extensions["sni_hostname"] == "hooks.example.com"
@@ -0,0 +1,51 @@
+import json
+import re
+
+from app.api.models.response_models import ClangTidyAnalysisResponse
+from app.core.config import settings
+from app.services import clangtidy_service
+from app.services.clangtidy_service import ClangTidyService
+from app.services.tool_registry import tool_registry
+from app.utils.command_executor import CommandResult
+from app.utils.json_response import FastJSONResponse
+
+def test_body_is_compact_utf8_json():
+    response = FastJSONResponse({"message": "déjà vu", "count": 2})
+    
+    assert json.loads(response.body) == {"message": "déjà vu", "count": 2}
+    assert "déjà".encode("utf-8") in response.body
+    assert b", " not in response.body
+    assert re.fullmatch(r"serialize;dur=\d+\.\d{3}", response.headers["Server-Timing"])
+
+def test_analysis_body_matches_the_response_model(client, monkeypatch):
+    async def available():
+        return True
+    
+    async def get_version(tool):
+        return "17.0.0"
+    
+    async def run_command(command, **kwargs):
+        stdout = "".join(
+            f"{path}:2:5: warning: use of strcpy [bugprone-unsafe-functions]\n{path}:3:1: error: bad cast [cppcoreguidelines-pro-type-cstyle-cast]\n"
+            for path in command[command.index("-p") + 2:]
+        )
+        return CommandResult(returncode=1, stdout=stdout, stderr="", command=" ".join(command))
+    
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(ClangTidyService, "check_availability", staticmethod(available))
+    monkeypatch.setattr(tool_registry, "get_version", get_version)
+    monkeypatch.setattr(tool_registry, "get_binary", lambda tool: tool)
+    monkeypatch.setattr(clangtidy_service, "run_command_async", run_command)
+    
+    response = client.post(
+        "/api/clangtidy/analyze",
+        data={"config": json.dumps({"checks": ["bugprone-*"]})},
+        files=[("files", ("main.c", b"int main(void) {\n  strcpy(a, b);\n  return (int)x;\n}\n"))]
+    )
+    body = response.json()
+    
+    assert response.status_code == 200
+    assert "serialize;dur=" in response.headers["Server-Timing"]
+    assert len(body["issues"]) == 2
+    # Skipping validation must not change what clients receive
+    assert body == json.loads(ClangTidyAnalysisResponse(**body).model_dump_json())
\ No newline at end of file
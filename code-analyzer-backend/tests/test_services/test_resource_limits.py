@@ -0,0 +1,68 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+from app.utils.command_executor import run_command_async
+from app.utils.resource_limits import ResourceMonitor, ResourceProfile, parse_cpu_list, parse_size
+
+def test_profile_is_parsed_from_config():
+    profile = ResourceProfile.from_config("semgrep", {"max_memory": "1.5G", "max_rss": "512M", "nice": "5", "cpu_affinity": "0-2,5"})
+    
+    assert profile.to_dict() == {
+        "max_memory": int(1.5 * 1024 ** 3),
+        "max_rss": 512 * 1024 ** 2,
+        "nice": 5,
+        "cpu_affinity": [0, 1, 2, 5],
+    }
+
+def test_unset_limits_apply_nothing():
+    profile = ResourceProfile.from_config("semgrep", {"max_memory": "", "nice": 0})
+    
+    assert profile.max_memory is None
+    assert profile.cpu_affinity is None
+    assert profile.preexec_fn() is None
+
+def test_negative_nice_is_ignored():
+    assert ResourceProfile.from_config("semgrep", {"nice": -5}).nice == 0
+
+@pytest.mark.parametrize("value", ["lots", "4X", "-1G"])
+def test_invalid_size_is_rejected(value):
+    with pytest.raises(ValueError):
+        parse_size(value)
+
+def test_cpu_list_accepts_lists():
+    assert parse_cpu_list([3, 1]) == [1, 3]
+    assert parse_cpu_list(" , ") is None
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not hasattr(os, "sched_getaffinity"), reason="needs Linux process limits")
+async def test_limits_are_applied_to_the_child():
+    cpu = min(os.sched_getaffinity(0))
+    profile = ResourceProfile("test", max_memory=4 * 1024 ** 3, nice=3, cpu_affinity=[cpu])
+    code = "import os, resource; print(os.nice(0), resource.getrlimit(resource.RLIMIT_AS)[0], sorted(os.sched_getaffinity(0)))"
+    
+    result = await run_command_async([sys.executable, "-c", code], resource_profile=profile)
+    
+    parent_nice = os.nice(0)
+    assert result.stdout.split() == [str(parent_nice + 3), str(4 * 1024 ** 3), f"[{cpu}]"]
+    assert result.resource_usage["limits"] == profile.to_dict()
+
+@pytest.mark.asyncio
+async def test_monitor_samples_off_the_event_loop(monkeypatch):
+    threads = []
+    monitor = ResourceMonitor(os.getpid(), ResourceProfile("test"), interval=60)
+    monkeypatch.setattr(monitor, "sample", lambda: threads.append(threading.current_thread()))
+    
+    monitor.start()
+    for _ in range(100):
+        if threads:
+            break
+        await asyncio.sleep(0.01)
+    await monitor.stop()
+    
+    # The first sample is taken at once, without waiting for the interval
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
\ No newline at end of file
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from app.services import result_cache as result_cache_module
+from app.services.result_cache import ResultCache
+from app.utils.file_utils import get_content_keys, remember_file_name
+
+def test_entries_survive_a_restart(cache):
+    key = ResultCache.make_key("semgrep", "1.0", {"rules": ["a"]}, ["0" * 64])
+    cache.put(key, "semgrep", {"items": [1, 2]})
+    
+    reloaded = ResultCache(cache.disk_dir, memory_limit=1024, disk_limit=1024 * 1024)
+    
+    assert reloaded.get(key) == {"items": [1, 2]}
+    assert reloaded.stats()["disk_hits"] == 1
+
+def test_key_depends_on_version_and_config():
+    base = ResultCache.make_key("semgrep", "1.0", {"rules": ["a"]}, ["0" * 64])
+    
+    assert ResultCache.make_key("semgrep", "1.1", {"rules": ["a"]}, ["0" * 64]) != base
+    assert ResultCache.make_key("semgrep", "1.0", {"rules": ["b"]}, ["0" * 64]) != base
+    assert ResultCache.make_key("semgrep", "1.0", {"rules": ["a"]}, ["0" * 64]) == base
+
+def test_same_content_with_other_extension_gets_other_key(make_file):
+    js = make_file("tmpa.js", b"eval(x)")
+    ts = make_file("tmpb.ts", b"eval(x)")
+    
+    js_key = ResultCache.make_key("semgrep", "1.0", {}, get_content_keys([js]))
+    ts_key = ResultCache.make_key("semgrep", "1.0", {}, get_content_keys([ts]))
+    
+    assert js_key != ts_key
+
+def test_random_upload_names_share_a_key(make_file):
+    first = make_file("tmpa.c", b"int a;")
+    second = make_file("tmpb.c", b"int a;")
+    
+    assert get_content_keys([first]) == get_content_keys([second])
+
+def test_archive_files_are_keyed_by_relative_path(tmp_path, make_file):
+    first = make_file("src/a.c", b"int a;", tmp_path / "one")
+    second = make_file("test/a.c", b"int a;", tmp_path / "two")
+    remember_file_name(first, "src/a.c")
+    remember_file_name(second, "test/a.c")
+    
+    assert get_content_keys([first])[0][0] == "src/a.c"
+    assert get_content_keys([first]) != get_content_keys([second])
+
+def test_invalidate_tool_drops_only_its_entries(cache):
+    semgrep_key = ResultCache.make_key("semgrep", "1.0", {}, [])
+    clangtidy_key = ResultCache.make_key("clangtidy", "1.0", {}, [])
+    cache.put(semgrep_key, "semgrep", {"items": []})
+    cache.put(clangtidy_key, "clangtidy", {"items": []})
+    
+    assert cache.invalidate_tool("semgrep") == 1
+    assert cache.get(semgrep_key) is None
+    assert cache.get(clangtidy_key) == {"items": []}
+def test_disk_tier_is_indexed_on_first_use(cache):
+    key = ResultCache.make_key("semgrep", "1.0", {}, [])
+    cache.put(key, "semgrep", {"items": []})
+    
+    reloaded = ResultCache(cache.disk_dir, memory_limit=1024, disk_limit=1024 * 1024)
+    assert reloaded.stats()["disk_indexed"] is False
+    
+    assert reloaded.contains(key)
+    assert reloaded.stats()["disk_entries"] == 1
+
+@pytest.mark.asyncio
+async def test_version_change_invalidates_off_the_event_loop(cache, monkeypatch):
+    key = ResultCache.make_key("clangtidy", "16", {}, [])
+    cache.put(key, "clangtidy", {"items": []})
+    monkeypatch.setattr(result_cache_module, "result_cache", cache)
+    threads = []
+    invalidate_tool = cache.invalidate_tool
+    monkeypatch.setattr(cache, "invalidate_tool", lambda tool: threads.append(threading.current_thread()) or invalidate_tool(tool))
+    
+    result_cache_module._on_version_change("clangtidy", "16", "17")
+    await asyncio.gather(*result_cache_module._invalidations)
+    
+    assert threads and threads[0] is not threading.main_thread()
+    assert cache.get(key) is None
+    assert os.listdir(os.path.join(cache.disk_dir, key[:2])) == []
@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services import rule_catalog
+from app.services.rule_catalog import SemgrepRuleCatalog, get_rule_catalog
+
+RULE = """rules:
+  - id: {rule_id}
+    message: Avoid {rule_id}
+    severity: ERROR
+    languages: [c]
+    pattern: {rule_id}(...)
+"""
+
+def _rewrite(path, rule_id: str) -> None:
+    """Change a rule file, moving its mtime on even with a coarse clock"""
+    mtime_ns = path.stat().st_mtime_ns
+    path.write_text(RULE.format(rule_id=rule_id))
+    os.utime(path, ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+
+@pytest.fixture
+def rules_dir(tmp_path):
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    (rules / "a.yaml").write_text(RULE.format(rule_id="strcpy"))
+    (rules / "b.yml").write_text(RULE.format(rule_id="gets"))
+    return rules
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Record the rule files parsed by any catalog"""
+    parsed = []
+    parse_entry = SemgrepRuleCatalog._parse_entry
+    
+    def record(self, rule_file, mtime_ns, size):
+        parsed.append(os.path.basename(rule_file))
+        return parse_entry(self, rule_file, mtime_ns, size)
+    
+    monkeypatch.setattr(SemgrepRuleCatalog, "_parse_entry", record)
+    return parsed
+
+def test_only_changed_files_are_parsed_again(rules_dir, parsed):
+    catalog = SemgrepRuleCatalog(str(rules_dir))
+    catalog.refresh(force=True)
+    version = catalog.version
+    
+    assert sorted(parsed) == ["a.yaml", "b.yml"]
+    assert catalog.refresh(force=True) is False
+    assert len(parsed) == 2
+    
+    _rewrite(rules_dir / "a.yaml", "strcat")
+    
+    assert catalog.refresh(force=True) is True
+    assert parsed[2:] == ["a.yaml"]
+    assert catalog.get_rule("strcat") is not None
+    assert catalog.get_rule("strcpy") is None
+    assert catalog.version != version
+
+def test_removed_files_leave_the_catalog(rules_dir, parsed):
+    catalog = SemgrepRuleCatalog(str(rules_dir))
+    catalog.refresh(force=True)
+    
+    (rules_dir / "b.yml").unlink()
+    
+    assert catalog.refresh(force=True) is True
+    assert [rule["id"] for rule in catalog.list_rules()] == ["strcpy"]
+
+def test_snapshot_spares_parsing_after_a_restart(rules_dir, parsed, tmp_path):
+    snapshot = str(tmp_path / "snapshot.json")
+    SemgrepRuleCatalog(str(rules_dir), snapshot).refresh(force=True)
+    
+    restarted = SemgrepRuleCatalog(str(rules_dir), snapshot)
+    restarted.refresh(force=True)
+    
+    assert len(parsed) == 2
+    assert sorted(rule["id"] for rule in restarted.list_rules(language="c")) == ["gets", "strcpy"]
+
+def test_refresh_interval_throttles_rescans(rules_dir, parsed, monkeypatch):
+    monkeypatch.setattr(settings, "SEMGREP_RULES_REFRESH_INTERVAL", 3600)
+    catalog = SemgrepRuleCatalog(str(rules_dir))
+    catalog.refresh()
+    
+    _rewrite(rules_dir / "a.yaml", "strcat")
+    
+    assert catalog.refresh() is False
+    assert catalog.refresh(force=True) is True
+
+def test_least_recently_used_catalog_is_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(rule_catalog, "_catalogs", type(rule_catalog._catalogs)())
+    monkeypatch.setattr(settings, "SEMGREP_MAX_RULE_CATALOGS", 2)
+    
+    first = get_rule_catalog(str(tmp_path / "one"))
+    second = get_rule_catalog(str(tmp_path / "two"))
+    first._save_snapshot()
+    second._save_snapshot()
+    
+    assert get_rule_catalog(str(tmp_path / "one")) is first
+    get_rule_catalog(str(tmp_path / "three"))
+    
+    assert list(rule_catalog._catalogs) == [str(tmp_path / "one"), str(tmp_path / "three")]
+    assert os.path.exists(first.snapshot_path)
+    assert not os.path.exists(second.snapshot_path)
\ No newline at end of file
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.core.errors import SemgrepException
+from app.services.semgrep_batcher import SemgrepBatcher
+
+def _batcher(runs, window=0.05, max_files=100, fail_on=None):
+    async def runner(rules_path, selected_rules, file_paths):
+        runs.append(list(file_paths))
+        if fail_on in file_paths:
+            raise SemgrepException(message="bad file")
+        results = [{"path": path, "check_id": rule} for path in file_paths for rule in selected_rules]
+        return {"results": results, "errors": [{"message": "rule warning"}]}, {"max_rss_kb": 1}
+    
+    return SemgrepBatcher(runner, window=window, max_files=max_files)
+
+@pytest.mark.asyncio
+async def test_requests_with_one_ruleset_share_a_run(tmp_path):
+    runs = []
+    batcher = _batcher(runs)
+    
+    (first, first_info), (second, _) = await asyncio.gather(
+        batcher.submit(str(tmp_path), ["b", "a"], ["/x/a.py"]),
+        batcher.submit(str(tmp_path), ["a", "b"], ["/x/b.py"]),
+    )
+    
+    assert runs == [["/x/a.py", "/x/b.py"]]
+    assert {item["path"] for item in first["results"]} == {"/x/a.py"}
+    assert {item["path"] for item in second["results"]} == {"/x/b.py"}
+    assert first["errors"] == [{"message": "rule warning"}]
+    assert first_info["batch"] == {"requests": 2, "files": 2}
+
+@pytest.mark.asyncio
+async def test_other_rulesets_run_separately(tmp_path):
+    runs = []
+    batcher = _batcher(runs)
+    
+    await asyncio.gather(
+        batcher.submit(str(tmp_path), ["a"], ["/x/a.py"]),
+        batcher.submit(str(tmp_path), ["b"], ["/x/b.py"]),
+    )
+    
+    assert sorted(runs) == [["/x/a.py"], ["/x/b.py"]]
+
+@pytest.mark.asyncio
+async def test_full_batch_runs_before_the_window_ends(tmp_path):
+    runs = []
+    batcher = _batcher(runs, window=60, max_files=2)
+    
+    await asyncio.wait_for(asyncio.gather(
+        batcher.submit(str(tmp_path), ["a"], ["/x/a.py"]),
+        batcher.submit(str(tmp_path), ["a"], ["/x/b.py"]),
+    ), timeout=1)
+    
+    assert runs == [["/x/a.py", "/x/b.py"]]
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_per_request(tmp_path):
+    runs = []
+    batcher = _batcher(runs, fail_on="/x/bad.py")
+    
+    good, bad = await asyncio.gather(
+        batcher.submit(str(tmp_path), ["a"], ["/x/good.py"]),
+        batcher.submit(str(tmp_path), ["a"], ["/x/bad.py"]),
+        return_exceptions=True
+    )
+    
+    assert good[0]["results"] == [{"path": "/x/good.py", "check_id": "a"}]
+    assert isinstance(bad, SemgrepException)
+    assert batcher.stats()["fallbacks"] == 1
\ No newline at end of file
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from app.core.errors import SemgrepException
+from app.services import semgrep_config_cache as config_cache_module
+from app.services.rule_catalog import SemgrepRuleCatalog
+from app.services.semgrep_config_cache import SemgrepConfigCache
+
+RULE = """rules:
+  - id: {rule_id}
+    message: Avoid {rule_id}
+    severity: ERROR
+    languages: [c]
+    pattern: {rule_id}(...)
+"""
+
+@pytest.fixture
+def catalog(tmp_path):
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    (rules / "a.yaml").write_text(RULE.format(rule_id="strcpy"))
+    (rules / "b.yaml").write_text(RULE.format(rule_id="gets"))
+    catalog = SemgrepRuleCatalog(str(rules))
+    catalog.refresh(force=True)
+    return catalog
+
+@pytest.fixture
+def config_cache(tmp_path):
+    return SemgrepConfigCache(str(tmp_path / "configs"))
+
+def test_same_selection_reuses_the_merged_config(catalog, config_cache, monkeypatch):
+    written = []
+    serialize_yaml = config_cache_module.serialize_yaml
+    monkeypatch.setattr(config_cache_module, "serialize_yaml", lambda data: written.append(data) or serialize_yaml(data))
+    
+    path = config_cache.get_config_path(catalog, ["strcpy", "gets"])
+    
+    # Order and duplicates do not change the selection
+    assert config_cache.get_config_path(catalog, ["gets", "strcpy", "gets"]) == path
+    assert len(written) == 1
+    assert config_cache.stats()["materialized"] == 1
+    assert config_cache.stats()["hits"] == 1
+    
+    with open(path) as f:
+        content = f.read()
+    assert "id: strcpy" in content and "id: gets" in content
+
+def test_existing_file_is_reused_by_a_new_cache(catalog, config_cache):
+    path = config_cache.get_config_path(catalog, ["strcpy"])
+    restarted = SemgrepConfigCache(config_cache.config_dir)
+    
+    assert restarted.get_config_path(catalog, ["strcpy"]) == path
+    assert restarted.stats()["materialized"] == 0
+
+def test_editing_a_rule_replaces_stale_configs(catalog, config_cache, tmp_path):
+    old_path = config_cache.get_config_path(catalog, ["strcpy"])
+    other_path = config_cache.get_config_path(catalog, ["gets"])
+    
+    rule_file = tmp_path / "rules" / "a.yaml"
+    mtime_ns = rule_file.stat().st_mtime_ns
+    rule_file.write_text(RULE.format(rule_id="strcpy").replace("ERROR", "WARNING"))
+    os.utime(rule_file, ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+    catalog.refresh(force=True)
+    
+    new_path = config_cache.get_config_path(catalog, ["strcpy"])
+    
+    assert new_path != old_path
+    assert not os.path.exists(old_path)
+    # Other selections keep their configs
+    assert os.path.exists(other_path)
+    with open(new_path) as f:
+        assert "WARNING" in f.read()
+
+def test_unknown_rules_are_a_client_error(catalog, config_cache):
+    with pytest.raises(SemgrepException) as error:
+        config_cache.get_config_path(catalog, ["strcpy", "nope", "missing"])
+    
+    assert error.value.status_code == 400
+    assert error.value.details["unknown_rules"] == ["missing", "nope"]
+    assert not os.path.exists(config_cache.config_dir)
+
+def test_analysis_with_unknown_rules_is_400(client, catalog):
+    response = client.post(
+        "/api/semgrep/analyze",
+        data={"config": json.dumps({"rules_path": catalog.rules_dir, "selected_rules": ["strcpy", "nope"]})},
+        files=[("files", ("main.c", b"int main(void) { return 0; }\n"))]
+    )
+    
+    assert response.status_code == 400
+    assert response.json()["detail"]["details"]["unknown_rules"] == ["nope"]
\ No newline at end of file
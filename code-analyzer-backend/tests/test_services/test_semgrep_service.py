@@ -0,0 +1,42 @@
+from app.utils.file_utils import remember_file_name
+from app.utils.result_formatter import fingerprint_items
+
+def _finding(file_path: str, line: int = 1, rule: str = "eval-use") -> dict:
+    return {"rule": rule, "file": file_path, "line": line, "column": 1}
+
+def _fingerprint(file_path: str, **kwargs) -> str:
+    items = [_finding(file_path, **kwargs)]
+    fingerprint_items(items, "findings", [file_path])
+    return items[0]["id"]
+
+def test_fingerprint_ignores_the_saved_name(tmp_path, make_file):
+    first = make_file("tmp1.js", b"eval(x)\n", tmp_path / "one")
+    second = make_file("tmp2.js", b"eval(x)\n", tmp_path / "two")
+    remember_file_name(first, "src/app.js")
+    remember_file_name(second, "src/app.js")
+    
+    assert _fingerprint(first) == _fingerprint(second)
+
+def test_fingerprint_ignores_indentation(make_file):
+    flat = make_file("flat/app.js", b"eval(x)\n")
+    indented = make_file("indented/app.js", b"\t  eval(x)  \n")
+    remember_file_name(flat, "app.js")
+    remember_file_name(indented, "app.js")
+    
+    assert _fingerprint(flat) == _fingerprint(indented)
+
+def test_fingerprint_changes_with_code_and_rule(make_file):
+    path = make_file("app.js", b"eval(x)\n")
+    original = _fingerprint(path)
+    
+    assert _fingerprint(path, rule="other-rule") != original
+    make_file("app.js", b"eval(y)\n")
+    assert _fingerprint(path) != original
+
+def test_duplicate_fingerprints_get_ordinals(make_file):
+    path = make_file("app.js", b"eval(x)\n")
+    items = [_finding(path), _finding(path)]
+    
+    fingerprint_items(items, "findings", [path])
+    
+    assert items[1]["id"] == f"{items[0]['id']}-2"
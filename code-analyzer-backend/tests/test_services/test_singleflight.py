@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_identical_calls_run_once():
+    flights = SingleFlight()
+    calls = []
+    
+    async def analyze():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"items": [1]}
+    
+    (first, first_shared), (second, second_shared) = await asyncio.gather(
+        flights.do("key", analyze),
+        flights.do("key", analyze),
+    )
+    
+    assert len(calls) == 1
+    assert (first_shared, second_shared) == (False, True)
+    
+    # Each caller gets its own copy
+    assert first is not second
+    first["items"].append(2)
+    assert second == {"items": [1]}
+
+@pytest.mark.asyncio
+async def test_single_caller_gets_the_value_itself():
+    flights = SingleFlight()
+    result = {"items": [1]}
+    
+    async def analyze():
+        return result
+    
+    value, shared = await flights.do("key", analyze)
+    
+    assert value is result
+    assert not shared
+
+@pytest.mark.asyncio
+async def test_finished_calls_are_not_reused():
+    flights = SingleFlight()
+    calls = []
+    
+    async def analyze():
+        calls.append(1)
+        return len(calls)
+    
+    assert await flights.do("key", analyze) == (1, False)
+    assert await flights.do("key", analyze) == (2, False)
+
+@pytest.mark.asyncio
+async def test_call_survives_until_its_last_waiter_leaves():
+    flights = SingleFlight()
+    started = asyncio.Event()
+    
+    async def analyze():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "done"
+    
+    first = asyncio.ensure_future(flights.do("key", analyze))
+    await started.wait()
+    second = asyncio.ensure_future(flights.do("key", analyze))
+    await asyncio.sleep(0)
+    
+    first.cancel()
+    assert await second == ("done", True)
+    assert flights.stats()["abandoned"] == 0
+    
+    # Once nobody waits any more the shared call is cancelled
+    third = asyncio.ensure_future(flights.do("other", analyze))
+    await asyncio.sleep(0.01)
+    third.cancel()
+    await asyncio.sleep(0)
+    assert flights.stats()["abandoned"] == 1
\ No newline at end of file
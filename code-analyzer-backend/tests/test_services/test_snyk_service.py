@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from app.core.errors import SnykException
+from app.services import snyk_service
+from app.services.snyk_service import SnykService
+from app.services.tool_registry import tool_registry
+from app.utils.command_executor import CommandResult
+from app.utils.file_utils import remember_file_name
+
+def test_files_keep_their_relative_paths(tmp_path, make_file):
+    manifest = make_file("tmp1", b"{}")
+    lock = make_file("tmp2", b"{}")
+    remember_file_name(manifest, "web/package.json")
+    remember_file_name(lock, "web/package-lock.json")
+    plain = make_file("requirements.txt", b"flask\n")
+    
+    names = SnykService._get_relative_names([manifest, lock, plain])
+    
+    assert names == ["web/package.json", "web/package-lock.json", "requirements.txt"]
+
+def test_duplicate_relative_paths_are_rejected(tmp_path, make_file):
+    first = make_file("tmp1", b"{}")
+    second = make_file("tmp2", b"{}")
+    remember_file_name(first, "package.json")
+    remember_file_name(second, "package.json")
+    
+    with pytest.raises(SnykException) as error:
+        SnykService._get_relative_names([first, second])
+    
+    assert error.value.status_code == 400
+    assert error.value.details["duplicate_paths"] == ["package.json"]
+
+@pytest.mark.asyncio
+async def test_project_is_laid_out_by_relative_path(monkeypatch, make_file):
+    manifest = make_file("tmp1", b'{"name": "web"}')
+    remember_file_name(manifest, "web/package.json")
+    layout = []
+    
+    async def run_command(command, cwd, **kwargs):
+        for root, _, files in os.walk(cwd):
+            layout.extend(os.path.relpath(os.path.join(root, name), cwd) for name in files)
+        return CommandResult(returncode=0, stdout="{}", stderr="", command=" ".join(command))
+    
+    async def get_version(tool):
+        return "1.0"
+    
+    monkeypatch.setattr(snyk_service, "run_command_async", run_command)
+    monkeypatch.setattr(tool_registry, "get_version", get_version)
+    monkeypatch.setattr(tool_registry, "get_binary", lambda tool: tool)
+    
+    await SnykService.analyze_files([manifest], {"options": {}})
+    
+    assert layout == [os.path.join("web", "package.json")]
+
+@pytest.mark.asyncio
+async def test_output_that_is_not_json_is_reported(monkeypatch, make_file):
+    manifest = make_file("requirements.txt", b"flask\n")
+    
+    async def run_command(command, cwd, **kwargs):
+        return CommandResult(returncode=2, stdout="Authentication failed", stderr="x" * 5000 + "run snyk auth", command=" ".join(command))
+    
+    async def get_version(tool):
+        return "1.0"
+    
+    monkeypatch.setattr(snyk_service, "run_command_async", run_command)
+    monkeypatch.setattr(tool_registry, "get_version", get_version)
+    monkeypatch.setattr(tool_registry, "get_binary", lambda tool: tool)
+    
+    with pytest.raises(SnykException) as error:
+        await SnykService.analyze_files([manifest], {"options": {}})
+    
+    assert error.value.details["returncode"] == 2
+    assert len(error.value.details["stderr"]) == snyk_service.STDERR_TAIL_LENGTH
+    assert error.value.details["stderr"].endswith("run snyk auth")
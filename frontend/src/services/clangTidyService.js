@@ -7,6 +7,7 @@ const CLANGTIDY_ENDPOINTS = {
   ANALYZE: '/clangtidy/analyze',
   CONFIG: '/clangtidy/config',
   CHECKS: '/clangtidy/checks',
+  SEARCH: '/clangtidy/checks/search',
 };
 
 /**
@@ -21,6 +22,19 @@ const clangTidyService = {
     return apiService.get(CLANGTIDY_ENDPOINTS.CHECKS);
   },
   
+  /**
+   * Searches ClangTidy checks on the server, one page at a time
+   * @param {Object} params - Search parameters
+   * @param {string} params.q - Words to search for
+   * @param {string} params.category - Only checks of this category
+   * @param {number} params.limit - Checks per page
+   * @param {string} params.cursor - Cursor returned with the previous page
+   * @returns {Promise<Object>} - Page of checks with total, next_cursor and facets
+   */
+  searchChecks: async (params) => {
+    return apiService.get(CLANGTIDY_ENDPOINTS.SEARCH, params);
+  },
+  
   /**
    * Submits files for ClangTidy analysis
    * @param {FileList|File[]} files - Files to analyze
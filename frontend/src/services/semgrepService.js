@@ -5,6 +5,7 @@ import apiService from './api';
 
 const SEMGREP_ENDPOINTS = {
   RULES: '/semgrep/rules',
+  SEARCH: '/semgrep/rules/search',
   ANALYZE: '/semgrep/analyze',
   CONFIG: '/semgrep/config',
 };
@@ -22,6 +23,21 @@ const semgrepService = {
     return apiService.get(SEMGREP_ENDPOINTS.RULES, { path: rulesPath });
   },
   
+  /**
+   * Searches Semgrep rules on the server, one page at a time
+   * @param {Object} params - Search parameters
+   * @param {string} params.q - Words to search for
+   * @param {string} params.language - Only rules targeting this language
+   * @param {string} params.severity - Only rules with this severity
+   * @param {number} params.limit - Rules per page
+   * @param {string} params.cursor - Cursor returned with the previous page
+   * @param {string} params.path - Path to the rules directory
+   * @returns {Promise<Object>} - Page of rules with total, next_cursor and facets
+   */
+  searchRules: async (params) => {
+    return apiService.get(SEMGREP_ENDPOINTS.SEARCH, params);
+  },
+  
   /**
    * Submits files for Semgrep analysis
    * @param {FileList|File[]} files - Files to analyze